@@ -0,0 +1,131 @@
+"""Compares the row by row DataGroup/Category converters with the vectorized ones on the full EVDS
+datagroup listing saved in EVDS.xlsx.
+
+Run from the repository root:
+    python -m benchmarks.bench_dataGroup_converters [scale]
+scale (default 1) repeats the listing to see how both versions grow with the number of rows.
+"""
+
+import sys
+import timeit
+
+import pandas as pd
+
+from features.Tcmb import Category, DataGroup, Tcmb
+
+
+def rowwise_format_dataGroup_dataFrame(data):
+    for i in range(0, len(data)):
+        if "." not in data.loc[i, "CATEGORY_ID"]:
+            data.loc[i, "CATEGORY_ID"] = data.loc[i, "CATEGORY_ID"] + ".0"
+
+
+def rowwise_dataFrame_into_dataGroup_list(data, columns):
+    dataGroupList = list()
+    for i in range(0, len(data)):
+        dataGroupList.append(
+            DataGroup(*[str(data[column].iloc[i]) for column in columns])
+        )
+    return dataGroupList
+
+
+def rowwise_dataFrame_into_category_list(data, columns):
+    categoryList = list()
+    for i in range(0, len(data)):
+        categoryList.append(
+            Category(*[str(data[column].iloc[i]) for column in columns])
+        )
+    return categoryList
+
+
+def load_listings(scale):
+    groupData = pd.read_excel("EVDS.xlsx", sheet_name="Data Groups", dtype=str)
+    groupData = groupData.drop("Unnamed: 0", axis="columns")
+    # EVDS returns datagroup category ids without the '.0' suffix
+    groupData["CATEGORY_ID"] = groupData["CATEGORY_ID"].str.replace(
+        ".0", "", regex=False
+    )
+    categoryData = pd.read_excel("EVDS.xlsx", sheet_name="Categories")
+    categoryData = categoryData.drop("Unnamed: 0", axis="columns")
+    groupData = pd.concat([groupData] * scale, ignore_index=True)
+    categoryData = pd.concat([categoryData] * scale, ignore_index=True)
+    return groupData, categoryData
+
+
+def measure(function, number=3):
+    return min(timeit.repeat(function, number=1, repeat=number))
+
+
+def main(scale=1):
+    groupData, categoryData = load_listings(scale)
+    groupColumns = [
+        "CATEGORY_ID",
+        "DATAGROUP_CODE",
+        "DATAGROUP_NAME",
+        "DATAGROUP_NAME_ENG",
+        "FREQUENCY_STR",
+        "FREQUENCY",
+        "START_DATE",
+        "END_DATE",
+    ]
+    groupArguments = [
+        "CATEGORY_ID",
+        "DATAGROUP_NAME_ENG",
+        "END_DATE",
+        "START_DATE",
+        "DATAGROUP_NAME",
+        "DATAGROUP_CODE",
+        "FREQUENCY",
+        "FREQUENCY_STR",
+    ]
+    categoryColumns = ["CATEGORY_ID", "TOPIC_TITLE_ENG", "TOPIC_TITLE_TR"]
+
+    rowwiseFormatted = groupData.copy()
+    rowwise_format_dataGroup_dataFrame(rowwiseFormatted)
+    vectorFormatted = groupData.copy()
+    DataGroup.format_dataGroup_dataFrame(vectorFormatted)
+    if not rowwiseFormatted.equals(vectorFormatted):
+        raise Exception("format_dataGroup_dataFrame results differ!")
+
+    cases = [
+        (
+            "format_dataGroup_dataFrame",
+            lambda: rowwise_format_dataGroup_dataFrame(groupData.copy()),
+            lambda: DataGroup.format_dataGroup_dataFrame(groupData.copy()),
+        ),
+        (
+            "return_dataFrame_into_dataGroup_list",
+            lambda: rowwise_dataFrame_into_dataGroup_list(
+                vectorFormatted, groupColumns
+            ),
+            lambda: DataGroup.return_dataFrame_into_dataGroup_list(
+                vectorFormatted, *groupArguments
+            ),
+        ),
+        (
+            "return_dataFrame_into_category_list",
+            lambda: rowwise_dataFrame_into_category_list(categoryData, categoryColumns),
+            lambda: Category.return_dataFrame_into_category_list(
+                categoryData, *categoryColumns
+            ),
+        ),
+    ]
+    print("{0} data groups, {1} categories".format(len(groupData), len(categoryData)))
+    print(
+        "{0:40} {1:>12} {2:>12} {3:>8}".format(
+            "", "row by row", "vectorized", "speedup"
+        )
+    )
+    for name, rowwise, vectorized in cases:
+        rowwiseTime = measure(rowwise)
+        vectorizedTime = measure(vectorized)
+        Tcmb.clear_registries()
+        print(
+            "{0:40} {1:>10.4f} s {2:>10.4f} s {3:>7.1f}x".format(
+                name, rowwiseTime, vectorizedTime, rowwiseTime / vectorizedTime
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1)
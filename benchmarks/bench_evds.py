@@ -0,0 +1,157 @@
+"""Benchmarks of the EVDS ingestion paths, run against the local EVDS stand-in (see environment.py).
+
+Run from the repository root with the other benchmarks:
+    python -m benchmarks.run -k bench_evds
+"""
+
+import glob
+import os
+import random
+
+import pandas as pd
+
+from benchmarks.environment import REPOSITORY_FOLDER, BenchmarkEnvironment
+from dataGetter import DataGetter
+from features.Tcmb import DataGroup, DataSerie, Tcmb
+
+
+class UpdateEvdsData:
+    repeat = 3
+
+    def setup(self):
+        self.environment = BenchmarkEnvironment.get_environment()
+        self.environment.enter("update_evds_data")
+        self.environment.write_series_file()
+
+    def teardown(self):
+        self.environment.leave()
+
+    def time_update_evds_data(self):
+        Tcmb.update_evds_data("benchmark")
+
+    def time_update_evds_data_streaming(self):
+        Tcmb.update_evds_data("benchmark", streaming=True)
+
+
+class GetDataSerieInfosFromEvds:
+    repeat = 3
+
+    def setup(self):
+        self.environment = BenchmarkEnvironment.get_environment()
+        self.environment.enter("get_dataSerie_infos_from_evds")
+        for fileName in ("Series.txt", "seriesList.txt", "Series.txt.journal"):
+            if os.path.exists(fileName):
+                os.remove(fileName)
+        groupData, columnLabelList = DataGroup.get_dataGroup_infos_from_evds(
+            "benchmark"
+        )
+        self.dataGroupList = DataGroup.return_dataFrame_into_dataGroup_list(
+            groupData, *columnLabelList
+        )
+
+    def teardown(self):
+        Tcmb.clear_registries()
+        self.environment.leave()
+
+    def time_get_dataSerie_infos_from_evds(self):
+        DataSerie.get_dataSerie_infos_from_evds("benchmark", self.dataGroupList)
+
+
+class GetDataSerieInfosFromEvdsUnderLoad(GetDataSerieInfosFromEvds):
+    """Same crawl with 20 ms answers and 5% of the requests failing with 503 (retried by EvdsClient)"""
+
+    def setup(self):
+        super().setup()
+        server = self.environment.server
+        server.latency = 0.02
+        server.errorRate = 0.05
+        server.random.seed(0)
+
+    def teardown(self):
+        self.environment.server.latency = 0.0
+        self.environment.server.errorRate = 0.0
+        super().teardown()
+
+
+class GetDataSerieWithCode:
+    repeat = 5
+
+    def setup(self):
+        self.environment = BenchmarkEnvironment.get_environment()
+        self.environment.enter("getDataSerie_with_code")
+        if not os.path.exists("Series.txt"):
+            self.environment.write_series_file()
+        codeList = self.environment.serieData["SERIE_CODE"].to_list()
+        self.codeList = random.Random(0).sample(codeList, 1000)
+
+    def teardown(self):
+        self.environment.leave()
+
+    def time_getDataSerie_with_code_1000(self):
+        for code in self.codeList:
+            DataSerie.getDataSerie_with_code(code)
+
+
+class InitalizeDataSerie:
+    repeat = 3
+
+    def setup(self):
+        self.environment = BenchmarkEnvironment.get_environment()
+        self.environment.enter("initalizeDataSerie")
+        for filePath in glob.glob("TP.*.txt") + glob.glob("annual/TP.*.txt"):
+            os.remove(filePath)
+        self.environment.copy_fixture("initialSeries.txt")
+        # downloads look up the dates and frequency of each serie in Series.txt
+        if not os.path.exists("Series.txt"):
+            self.environment.write_series_file()
+
+    def teardown(self):
+        self.environment.leave()
+
+    def time_initalizeDataSerie(self):
+        DataGetter.initalizeDataSerie(
+            Tcmb("benchmark"), workerCount=8, requestsPerSecond=10000
+        )
+
+    def time_initalizeDataSerie_batched(self):
+        DataGetter.initalizeDataSerie(
+            Tcmb("benchmark"),
+            workerCount=8,
+            requestsPerSecond=10000,
+            maxSeriesPerRequest=25,
+        )
+
+    def time_initalizeDataSerie_annual(self):
+        DataGetter.initalizeDataSerie(
+            Tcmb("benchmark"),
+            workerCount=8,
+            requestsPerSecond=10000,
+            maxSeriesPerRequest=25,
+            frequency="annual",
+        )
+
+
+class WriteDataIntoExcelFile:
+    repeat = 3
+
+    def setup(self):
+        self.environment = BenchmarkEnvironment.get_environment()
+        self.environment.enter("write_data_into_excel_file")
+        sheets = pd.read_excel(
+            os.path.join(REPOSITORY_FOLDER, "EVDS.xlsx"), sheet_name=None
+        )
+        self.sheetNameList = list(sheets)
+        self.dataList = [
+            data.drop("Unnamed: 0", axis="columns") for data in sheets.values()
+        ]
+
+    def teardown(self):
+        self.environment.leave()
+
+    def time_write_data_into_excel_file(self):
+        Tcmb.write_data_into_excel_file("EVDS", self.sheetNameList, self.dataList)
+
+    def time_write_data_into_excel_file_streaming(self):
+        Tcmb.write_data_into_excel_file(
+            "EVDS", self.sheetNameList, self.dataList, streaming=True
+        )
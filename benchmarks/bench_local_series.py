@@ -0,0 +1,94 @@
+"""Benchmarks of bulk loading the 743 local TP.*.txt data serie files and their binary copies.
+
+Run from the repository root with the other benchmarks:
+    python -m benchmarks.run -k bench_local_series
+"""
+
+import os
+
+from benchmarks.environment import REPOSITORY_FOLDER, BenchmarkEnvironment
+from features.seriesAnalytics import SeriesAnalytics
+from features.seriesCatalog import SeriesCatalog
+from features.seriesFiles import get_data_file_path, read_data_file
+from features.seriesMmap import MmapSeriesStore
+from features.seriesPanel import SeriesPanel
+from features.seriesStore import ColumnarSeriesStore
+
+CATALOG_FILE = os.path.join(REPOSITORY_FOLDER, "initialSeries.txt")
+
+
+def get_local_codes():
+    return [
+        code
+        for code in SeriesCatalog.get_catalog(CATALOG_FILE).get_codes()
+        if os.path.isfile(get_data_file_path(code, REPOSITORY_FOLDER))
+    ]
+
+
+class LoadTxtFiles:
+    repeat = 3
+
+    def setup(self):
+        self.codeList = get_local_codes()
+
+    def time_read_data_files(self):
+        for code in self.codeList:
+            read_data_file(get_data_file_path(code, REPOSITORY_FOLDER))
+
+    def time_series_panel_to_frame(self):
+        SeriesPanel(CATALOG_FILE, REPOSITORY_FOLDER).to_frame(self.codeList)
+
+
+class LoadColumnarStore:
+    repeat = 5
+
+    def setup(self):
+        environment = BenchmarkEnvironment.get_environment()
+        self.storeFolder = os.path.join(environment.workFolder, "Series Store")
+        if not os.path.exists(self.storeFolder):
+            ColumnarSeriesStore(self.storeFolder).migrate_from_txt(
+                CATALOG_FILE, REPOSITORY_FOLDER
+            )
+
+    def time_load_all(self):
+        ColumnarSeriesStore(self.storeFolder).load_all()
+
+
+class LoadMmapStore:
+    repeat = 5
+
+    def setup(self):
+        environment = BenchmarkEnvironment.get_environment()
+        self.storeFolder = os.path.join(environment.workFolder, "Series Mmap")
+        if not os.path.exists(self.storeFolder):
+            MmapSeriesStore(
+                self.storeFolder, CATALOG_FILE, REPOSITORY_FOLDER, checkFiles=False
+            ).build()
+        self.codeList = get_local_codes()
+
+    def time_read_all_series(self):
+        store = MmapSeriesStore(
+            self.storeFolder, CATALOG_FILE, REPOSITORY_FOLDER, checkFiles=False
+        )
+        for code in self.codeList:
+            store.read_serie(code)
+
+
+class RunSeriesAnalytics:
+    repeat = 3
+
+    def setup(self):
+        environment = BenchmarkEnvironment.get_environment()
+        self.storeFolder = os.path.join(environment.workFolder, "Series Mmap")
+        if not os.path.exists(self.storeFolder):
+            MmapSeriesStore(
+                self.storeFolder, CATALOG_FILE, REPOSITORY_FOLDER, checkFiles=False
+            ).build()
+
+    def time_builtin_functions_single_process(self):
+        SeriesAnalytics(
+            self.storeFolder, CATALOG_FILE, REPOSITORY_FOLDER, workerCount=1
+        ).run()
+
+    def time_builtin_functions_process_pool(self):
+        SeriesAnalytics(self.storeFolder, CATALOG_FILE, REPOSITORY_FOLDER).run()
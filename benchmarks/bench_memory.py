@@ -0,0 +1,144 @@
+"""Memory used by the EVDS hierarchy objects, before and after __slots__ and clearable registries.
+
+Builds one Category, DataGroup and DataSerie object per row of EVDS.xlsx (41 categories, 443 data groups,
+36240 data series) and measures with tracemalloc:
+  1) the size of the objects with a per-instance __dict__ (the old layout) and with __slots__
+  2) the memory still held after several update runs, without and with Tcmb.clear_registries between them
+
+Run from the repository root:
+    python -m benchmarks.bench_memory [runs]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+import pandas as pd
+
+from features.Tcmb import Category, DataGroup, DataSerie, Tcmb, evdsHierarchy
+
+
+# subclasses without __slots__ get a __dict__ again, same layout as before
+class DictCategory(Category):
+    pass
+
+
+class DictDataGroup(DataGroup):
+    pass
+
+
+class DictDataSerie(DataSerie):
+    pass
+
+
+def load_rows():
+    sheets = pd.read_excel("EVDS.xlsx", sheet_name=None, dtype=str)
+    categoryRows = list(
+        sheets["Categories"][["CATEGORY_ID", "TOPIC_TITLE_ENG", "TOPIC_TITLE_TR"]]
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    groupRows = list(
+        sheets["Data Groups"][
+            [
+                "CATEGORY_ID",
+                "DATAGROUP_CODE",
+                "DATAGROUP_NAME",
+                "DATAGROUP_NAME_ENG",
+                "FREQUENCY_STR",
+                "FREQUENCY",
+                "START_DATE",
+                "END_DATE",
+            ]
+        ]
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    serieRows = list(
+        sheets["Data Series"][
+            [
+                "SERIE_CODE",
+                "DATAGROUP_CODE",
+                "SERIE_NAME",
+                "SERIE_NAME_ENG",
+                "FREQUENCY_STR",
+                "DEFAULT_AGG_METHOD",
+                "START_DATE",
+                "END_DATE",
+            ]
+        ]
+        .astype(str)
+        .itertuples(index=False, name=None)
+    )
+    return categoryRows, groupRows, serieRows
+
+
+def build_objects(rows, categoryClass, dataGroupClass, dataSerieClass):
+    categoryRows, groupRows, serieRows = rows
+    categoryList = [categoryClass(*row) for row in categoryRows]
+    dataGroupList = [dataGroupClass(*row) for row in groupRows]
+    dataSerieList = list()
+    for row in serieRows:
+        dataSerie = dataSerieClass(*row)
+        evdsHierarchy.add_dataSerie(dataSerie)
+        dataSerieList.append(dataSerie)
+    return categoryList, dataGroupList, dataSerieList
+
+
+def measure_objects(rows, classes):
+    """Returns the bytes allocated for one set of hierarchy objects (the row strings are allocated before)"""
+    Tcmb.clear_registries()
+    gc.collect()
+    tracemalloc.start()
+    objects = build_objects(rows, *classes)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    Tcmb.clear_registries()
+    return size
+
+
+def measure_runs(rows, runs, clear):
+    """Returns the bytes still held after the given number of runs which each rebuild the hierarchy"""
+    Tcmb.clear_registries()
+    gc.collect()
+    tracemalloc.start()
+    for i in range(runs):
+        if clear:
+            Tcmb.clear_registries()
+        build_objects(rows, Category, DataGroup, DataSerie)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    Tcmb.clear_registries()
+    return size
+
+
+def main(runs=3):
+    rows = load_rows()
+    print(
+        "{0} categories, {1} data groups, {2} data series".format(
+            *[len(part) for part in rows]
+        )
+    )
+    dictSize = measure_objects(rows, (DictCategory, DictDataGroup, DictDataSerie))
+    slotSize = measure_objects(rows, (Category, DataGroup, DataSerie))
+    print("{0:40} {1:>10.2f} MB".format("objects with __dict__", dictSize / 2**20))
+    print("{0:40} {1:>10.2f} MB".format("objects with __slots__", slotSize / 2**20))
+    keptSize = measure_runs(rows, runs, False)
+    clearedSize = measure_runs(rows, runs, True)
+    print(
+        "{0:40} {1:>10.2f} MB".format(
+            "held after {0} runs, registries kept".format(runs), keptSize / 2**20
+        )
+    )
+    print(
+        "{0:40} {1:>10.2f} MB".format(
+            "held after {0} runs, registries cleared".format(runs),
+            clearedSize / 2**20,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
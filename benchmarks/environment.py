@@ -0,0 +1,67 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+from features.evdsClient import EvdsClient
+from features.evdsMockServer import EvdsMockServer
+
+REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BenchmarkEnvironment:
+    """Temporary working folder and local EVDS stand-in shared by the benchmarks.
+
+    The recorded fixtures are the files of the repository: EVDS.xlsx (categories, data groups and data serie
+    listings), initialSeries.txt and the TP.*.txt data serie files. An EvdsMockServer answers from them and
+    the shared EvdsClient is pointed at it without a disk cache, so the benchmarks measure the full request,
+    parse and write path without touching the network. Everything is removed when the process exits.
+    """
+
+    sharedEnvironment = None
+
+    def get_environment():
+        """Returns the environment of the process, starts it on first use"""
+        if BenchmarkEnvironment.sharedEnvironment is None:
+            BenchmarkEnvironment.sharedEnvironment = BenchmarkEnvironment()
+            atexit.register(BenchmarkEnvironment.sharedEnvironment.close)
+        return BenchmarkEnvironment.sharedEnvironment
+
+    def __init__(self) -> None:
+        self.workFolder = tempfile.mkdtemp(prefix="fonAnaliz-benchmarks-")
+        self.previousFolder = os.getcwd()
+        self.server = EvdsMockServer(
+            os.path.join(REPOSITORY_FOLDER, "EVDS.xlsx"), dataFolder=REPOSITORY_FOLDER
+        )
+        self.server.start()
+        EvdsClient.set_client(EvdsClient(baseUrl=self.server.baseUrl, legacySSL=False))
+        self.serieData = pd.read_excel(
+            os.path.join(REPOSITORY_FOLDER, "EVDS.xlsx"),
+            sheet_name="Data Series",
+            dtype=str,
+        ).drop("Unnamed: 0", axis="columns")
+
+    def enter(self, folderName):
+        """Makes a sub folder of the working folder the current working directory and returns its path"""
+        folder = os.path.join(self.workFolder, folderName)
+        os.makedirs(folder, exist_ok=True)
+        os.chdir(folder)
+        return folder
+
+    def leave(self):
+        os.chdir(self.previousFolder)
+
+    def write_series_file(self, fileName="Series.txt"):
+        """Writes the recorded data serie listing in the layout of Series.txt into the current folder"""
+        self.serieData.to_csv(fileName, sep=";", index=False)
+
+    def copy_fixture(self, fileName):
+        """Copies a file of the repository into the current folder"""
+        shutil.copyfile(os.path.join(REPOSITORY_FOLDER, fileName), fileName)
+
+    def close(self):
+        self.server.stop()
+        os.chdir(self.previousFolder)
+        shutil.rmtree(self.workFolder, ignore_errors=True)
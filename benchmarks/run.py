@@ -0,0 +1,170 @@
+"""Runs the benchmark suite and keeps its results over time.
+
+Benchmarks are written in the asv style: a class with optional setup/teardown methods (called around every
+measurement) and time_* methods which are timed. A class can set repeat (number of measurements, default 3).
+Every run is appended to benchmarks/results/history.jsonl with the date, the git commit and the machine name.
+Each result is compared with the previous run on the same machine; a benchmark slower than threshold times its
+previous minimum is reported as a regression and the runner exits with status 1.
+
+Run from the repository root:
+    python -m benchmarks.run [-k filter] [--repeat N] [--threshold 1.25] [--no-save]
+"""
+
+import argparse
+import contextlib
+import datetime
+import importlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+BENCHMARK_MODULES = ["benchmarks.bench_evds", "benchmarks.bench_local_series"]
+HISTORY_FILE = os.path.join(os.path.dirname(__file__), "results", "history.jsonl")
+
+
+def discover(nameFilter=None):
+    """Returns (benchmark name, class, method name) of every time_* method of the benchmark modules"""
+    benchmarkList = list()
+    for moduleName in BENCHMARK_MODULES:
+        module = importlib.import_module(moduleName)
+        for className, benchmarkClass in vars(module).items():
+            if (
+                not isinstance(benchmarkClass, type)
+                or benchmarkClass.__module__ != moduleName
+            ):
+                continue
+            for methodName in dir(benchmarkClass):
+                if not methodName.startswith("time_"):
+                    continue
+                name = "{0}.{1}.{2}".format(
+                    moduleName.split(".")[-1], className, methodName
+                )
+                if nameFilter is None or nameFilter in name:
+                    benchmarkList.append((name, benchmarkClass, methodName))
+    return benchmarkList
+
+
+def measure(benchmarkClass, methodName, repeat):
+    """Returns the durations in seconds of repeat calls of a benchmark method, setup and teardown excluded"""
+    benchmark = benchmarkClass()
+    durations = list()
+    if repeat is None:
+        repeat = getattr(benchmarkClass, "repeat", 3)
+    for i in range(repeat):
+        # the code under test prints progress, it would distort the timings
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if hasattr(benchmark, "setup"):
+                benchmark.setup()
+            try:
+                start = time.perf_counter()
+                getattr(benchmark, methodName)()
+                durations.append(time.perf_counter() - start)
+            finally:
+                if hasattr(benchmark, "teardown"):
+                    benchmark.teardown()
+    return durations
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except OSError:
+        return ""
+
+
+def load_previous_results(machine):
+    """Returns the results of the last saved run on the given machine, empty dict if there is none"""
+    previous = dict()
+    if os.path.exists(HISTORY_FILE):
+        with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record["machine"] == machine:
+                    previous = record["results"]
+    return previous
+
+
+def save_results(record):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the benchmark suite")
+    parser.add_argument(
+        "-k", dest="nameFilter", help="only benchmarks whose name contains this text"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        help="measurements per benchmark (default is set by each benchmark)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.25,
+        help="slowdown reported as a regression (default is 1.25)",
+    )
+    parser.add_argument(
+        "--no-save",
+        dest="save",
+        action="store_false",
+        help="don't append the results to the history",
+    )
+    args = parser.parse_args(argv)
+
+    machine = platform.node()
+    previous = load_previous_results(machine)
+    results = dict()
+    regressions = list()
+    print("{0:70} {1:>10} {2:>10} {3:>8}".format("", "min", "median", "change"))
+    for name, benchmarkClass, methodName in discover(args.nameFilter):
+        durations = measure(benchmarkClass, methodName, args.repeat)
+        results[name] = {
+            "min": min(durations),
+            "median": statistics.median(durations),
+            "repeat": len(durations),
+        }
+        change = ""
+        if name in previous:
+            ratio = results[name]["min"] / previous[name]["min"]
+            change = "{0:.2f}x".format(ratio)
+            if ratio > args.threshold:
+                regressions.append(name)
+                change += " !"
+        print(
+            "{0:70} {1:>8.3f} s {2:>8.3f} s {3:>8}".format(
+                name, results[name]["min"], results[name]["median"], change
+            )
+        )
+
+    if args.save and len(results) > 0:
+        save_results(
+            {
+                "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                "commit": get_commit(),
+                "machine": machine,
+                "python": platform.python_version(),
+                "results": results,
+            }
+        )
+    if len(regressions) > 0:
+        print("Regressions (slower than {0}x the previous run):".format(args.threshold))
+        for name in regressions:
+            print("    " + name)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,19 @@ from functools import total_ordering
 import pandas as pd
 from evds import evdsAPI
 
+from features.downloader import BulkDownloader, DownloadReport
+from features.seriesCatalog import SeriesCatalog
+from features.seriesPanel import is_finer
+from features.seriesFiles import (
+    append_rows,
+    get_data_file_path,
+    get_frequency_key,
+    next_period_start,
+    parse_evds_date,
+    parse_tarih,
+    read_header,
+    read_last_row,
+)
 from features.Tcmb import *
 
 
@@ -13,28 +26,367 @@ class DataGetter:
     def __init__(self) -> None:
         pass
 
-    def initalizeDataSerie(TcmbObject):
-        """ """
+    def initalizeDataSerie(
+        TcmbObject,
+        workerCount=4,
+        requestsPerSecond=5.0,
+        maxRetries=3,
+        backoffFactor=1.0,
+        maxSeriesPerRequest=1,
+        frequency=None,
+        aggregation=None,
+        codeList=None,
+        catalogFileName="Series.txt",
+    ):
+        """Downloads every data serie listed in initialSeries.txt which doesn't have a local .txt file yet.
+        Downloads run concurrently, files are written exactly as a serial run would write them.
+        With a frequency, series are aggregated by EVDS before the download (see get_data_from_evds_with_dataSerie_code)
+        and their files are written into a sub folder named after the frequency, read them with
+        SeriesPanel(dataFolder=<frequency folder>, frequency=<frequency>).
+        Parameters
+        ----------
+        TcmbObject : Tcmb
+            Tcmb object holding the personal api key
+        workerCount : int
+            number of concurrent downloads (default is 4)
+        requestsPerSecond : float
+            maximum number of requests sent to EVDS per second (default is 5.0)
+        maxRetries : int
+            number of retries for a failed download (default is 3)
+        backoffFactor : float
+            base waiting time in seconds between retries, doubled on each retry (default is 1.0)
+        maxSeriesPerRequest : int
+            when bigger than 1, series with the same frequency and date range are downloaded together,
+            up to this many in one request (default is 1). Report still counts series
+        frequency : str
+            daily, business, weekly, biweekly, monthly, quarterly, semiannual or annual (default is None, the
+            frequency of each serie). Series whose own frequency is coarser are downloaded at their own frequency
+        aggregation : str
+            avg, min, max, first, last or sum (default is None, the DEFAULT_AGG_METHOD of each serie)
+        codeList : list of str
+            data serie codes to download instead of the ones of initialSeries.txt (default is None)
+        catalogFileName : str
+            data serie catalog giving the date ranges, frequencies and batches of the requests (default is Series.txt)
+
+        Returns
+        -------
+        report : DownloadReport
+            summary of downloaded, skipped, empty and failed series
+        """
         currentPath = os.getcwd()
 
-        initialDataSerieCodeList = pd.read_csv(
-            currentPath + "\initialSeries.txt", sep=";", dtype=str
-        )
-        codeList = initialDataSerieCodeList["SERIE_CODE"].to_list()
+        if codeList is None:
+            initialDataSerieCodeList = pd.read_csv(
+                os.path.join(currentPath, "initialSeries.txt"), sep=";", dtype=str
+            )
+            codeList = initialDataSerieCodeList["SERIE_CODE"].to_list()
+        dataFolder = currentPath
+        if frequency is not None:
+            dataFolder = os.path.join(currentPath, frequency)
+            os.makedirs(dataFolder, exist_ok=True)
+
+        def dataFilePath(code):
+            return get_data_file_path(code, dataFolder)
+
+        def fetch(code):
+            return DataSerie.get_data_from_evds_with_dataSerie_code(
+                TcmbObject.apiKey,
+                code,
+                frequency=requestFrequency(code),
+                aggregation=aggregation,
+                fileName=catalogFileName,
+            )
+
+        def requestFrequency(code):
+            # a coarser serie is kept at its own frequency, EVDS can't split its periods
+            if frequency is None:
+                return None
+            dataSerie = DataSerie.getDataSerie_with_code(code, catalogFileName)
+            if dataSerie is None:
+                return frequency
+            serieFrequency = get_frequency_key(dataSerie.frqStr)
+            if serieFrequency is not None and is_finer(frequency, serieFrequency):
+                return None
+            return frequency
+
+        def write(code, data):
+            data.to_csv(dataFilePath(code), sep=";")
+
+        if maxSeriesPerRequest > 1:
+            # the report counts series, batches are only the unit of the requests
+            report = DownloadReport(len(codeList))
+            missingCodeList = list()
+            for code in codeList:
+                if os.path.isfile(dataFilePath(code)):
+                    report.skipped.append(code)
+                else:
+                    missingCodeList.append(code)
+            print("{0} series already exist, skipped".format(len(report.skipped)))
+            batches = dict()
+            for batch in DataSerie.group_dataSerie_codes_into_batches(
+                missingCodeList, maxSeriesPerRequest, fileName=catalogFileName
+            ):
+                batches[batch[0].code + " (+{0})".format(len(batch) - 1)] = batch
+
+            def fetch_batch(batchName):
+                batch = batches[batchName]
+                return DataSerie.get_data_of_dataSerie_batch(
+                    TcmbObject.apiKey,
+                    batch,
+                    frequency=requestFrequency(batch[0].code),
+                    aggregation=aggregation,
+                )
+
+            writtenCodes = set()
+
+            def write_batch(batchName, dataDict):
+                for code, data in dataDict.items():
+                    if data.empty == False:
+                        try:
+                            write(code, data)
+                        except Exception as e:
+                            report.failed[code] = repr(e)
+                            continue
+                        writtenCodes.add(code)
+
+            downloader = BulkDownloader(
+                fetch_batch,
+                workerCount=workerCount,
+                requestsPerSecond=requestsPerSecond,
+                maxRetries=maxRetries,
+                backoffFactor=backoffFactor,
+            )
+            batchReport = downloader.download(list(batches), write_batch)
+            batchedCodes = set()
+            for batchName, batch in batches.items():
+                for dataSerie in batch:
+                    batchedCodes.add(dataSerie.code)
+                    if batchName in batchReport.failed:
+                        report.failed[dataSerie.code] = batchReport.failed[batchName]
+                    elif dataSerie.code in writtenCodes:
+                        report.downloaded.append(dataSerie.code)
+                    elif dataSerie.code not in report.failed:
+                        report.empty.append(dataSerie.code)
+            # codes missing from the catalog are not put in any batch
+            report.empty.extend(
+                code for code in missingCodeList if code not in batchedCodes
+            )
+            report.retries = batchReport.retries
+            report.elapsed = batchReport.elapsed
+        else:
+            downloader = BulkDownloader(
+                fetch,
+                workerCount=workerCount,
+                requestsPerSecond=requestsPerSecond,
+                maxRetries=maxRetries,
+                backoffFactor=backoffFactor,
+            )
+            report = downloader.download(
+                codeList, write, lambda code: os.path.isfile(dataFilePath(code))
+            )
+        print(report)
+        print("Series initialization Completed")
+        return report
+
+    def updateDataSerie(
+        TcmbObject,
+        catalogFileName="Series.txt",
+        workerCount=4,
+        requestsPerSecond=5.0,
+        maxRetries=3,
+        backoffFactor=1.0,
+        codeList=None,
+    ):
+        """Brings the local data serie files of initialSeries.txt up to date without downloading their whole history.
+        For each local file, the last Tarih in the file is read and only the observations after it are fetched
+        from EVDS and appended to the file. Series whose END_DATE in the catalog is not later than the last local
+        observation are skipped without any request. Codes without a local file are left to initalizeDataSerie.
+        Parameters
+        ----------
+        TcmbObject : Tcmb
+            Tcmb object holding the personal api key
+        catalogFileName : str
+            data serie catalog used for END_DATE checks and for the date ranges of the requests (default is Series.txt)
+        workerCount : int
+            number of concurrent downloads (default is 4)
+        requestsPerSecond : float
+            maximum number of requests sent to EVDS per second (default is 5.0)
+        maxRetries : int
+            number of retries for a failed download (default is 3)
+        backoffFactor : float
+            base waiting time in seconds between retries, doubled on each retry (default is 1.0)
+        codeList : list of str
+            data serie codes to update instead of the ones of initialSeries.txt (default is None)
+
+        Returns
+        -------
+        report : DownloadReport
+            summary of updated, skipped, empty and failed series
+        """
+        currentPath = os.getcwd()
+
+        if codeList is None:
+            initialDataSerieCodeList = pd.read_csv(
+                os.path.join(currentPath, "initialSeries.txt"), sep=";", dtype=str
+            )
+            codeList = initialDataSerieCodeList["SERIE_CODE"].to_list()
+        catalog = SeriesCatalog.get_catalog(catalogFileName)
+
+        def last_tarih(code):
+            dataFilePath = get_data_file_path(code, currentPath)
+            lastRow = read_last_row(dataFilePath)
+            if lastRow is None:
+                return None
+            return lastRow[read_header(dataFilePath).index("Tarih")]
+
+        def is_up_to_date(code):
+            if not os.path.isfile(get_data_file_path(code, currentPath)):
+                return True
+            row = catalog.get_row(code)
+            if row is None:
+                return True
+            lastTarih = last_tarih(code)
+            if lastTarih is None:
+                return False
+            return parse_tarih(lastTarih) >= parse_evds_date(row["END_DATE"])
 
-        for code in codeList:
-            dataFilePath = currentPath + "\\" + code + ".txt"
-            if os.path.isfile(dataFilePath):
-                print(code + ".txt already exist, skipped")
+        def fetch(code):
+            lastTarih = last_tarih(code)
+            if lastTarih is None:
+                data = DataSerie.get_data_from_evds_with_dataSerie_code(
+                    TcmbObject.apiKey, code, fileName=catalogFileName
+                )
             else:
+                startDate = next_period_start(lastTarih)
                 data = DataSerie.get_data_from_evds_with_dataSerie_code(
-                    TcmbObject.apiKey, code
+                    TcmbObject.apiKey,
+                    code,
+                    startDay="{0:02d}".format(startDate.day),
+                    startMonth="{0:02d}".format(startDate.month),
+                    startYear=str(startDate.year),
+                    fileName=catalogFileName,
                 )
-                if data.empty == False:
+                if data is not None and not data.empty:
+                    # EVDS may return the period which is already in the file, keep only later ones
+                    lastDate = parse_tarih(lastTarih)
+                    data = data[data["Tarih"].map(parse_tarih) > lastDate]
+            return data
 
-                    data.to_csv(dataFilePath, sep=";")
-        print("Series initialization Completed")
+        def write(code, data):
+            append_rows(get_data_file_path(code, currentPath), data)
+
+        downloader = BulkDownloader(
+            fetch,
+            workerCount=workerCount,
+            requestsPerSecond=requestsPerSecond,
+            maxRetries=maxRetries,
+            backoffFactor=backoffFactor,
+        )
+        report = downloader.download(
+            codeList, write, is_up_to_date, skipMessage=" is up to date, skipped"
+        )
+        print(report)
+        print("Series update Completed")
+        return report
+
+    def updateChangedSeries(
+        TcmbObject, catalogDiff, catalogFileName="Series.txt", **downloadOptions
+    ):
+        """Downloads only the data series of initialSeries.txt which a catalog update reported as added or changed
+        (see Tcmb.update_evds_data with snapshotFileName), instead of checking every local file.
+        A local serie whose START_DATE changed may have a revised history, it is downloaded again from scratch
+        into a temporary file which replaces the local file only when the download succeeded and is not empty,
+        otherwise the local file is kept. Other changed series (ex: a new END_DATE) get their new observations
+        appended (see updateDataSerie). Finally the snapshot of the catalog update is saved with catalogDiff.commit,
+        series which failed (or came back empty from a download from scratch) are left pending for the next run.
+        Parameters
+        ----------
+        TcmbObject : Tcmb
+            Tcmb object holding the personal api key
+        catalogDiff : CatalogDiff
+            metrics.catalogDiff of Tcmb.update_evds_data
+        catalogFileName : str
+            data serie catalog of the downloads, see initalizeDataSerie and updateDataSerie (default is Series.txt)
+        downloadOptions :
+            workerCount, requestsPerSecond, maxRetries and backoffFactor, see updateDataSerie
+
+        Returns
+        -------
+        reports : tuple of DownloadReport
+            report of the downloads of new series, of the revised series and of the incremental updates
+        """
+        currentPath = os.getcwd()
+        initialDataSerieCodeList = pd.read_csv(
+            os.path.join(currentPath, "initialSeries.txt"), sep=";", dtype=str
+        )
+        localCodes = set(initialDataSerieCodeList["SERIE_CODE"])
+        codeList = [
+            code for code in catalogDiff.get_codes_to_download() if code in localCodes
+        ]
+        missingCodes = [
+            code
+            for code in codeList
+            if not os.path.isfile(get_data_file_path(code, currentPath))
+        ]
+        startDateChanges = set(
+            catalogDiff.get_codes_with_changed_columns(["START_DATE"])
+        )
+        revisedCodes = [
+            code
+            for code in codeList
+            if code in startDateChanges and code not in missingCodes
+        ]
+
+        initializeReport = DataGetter.initalizeDataSerie(
+            TcmbObject,
+            codeList=missingCodes,
+            catalogFileName=catalogFileName,
+            **downloadOptions
+        )
+
+        def fetch(code):
+            return DataSerie.get_data_from_evds_with_dataSerie_code(
+                TcmbObject.apiKey, code, fileName=catalogFileName
+            )
 
+        def replace(code, data):
+            # the local file is replaced only by a complete download
+            dataFilePath = get_data_file_path(code, currentPath)
+            data.to_csv(dataFilePath + ".tmp", sep=";")
+            os.replace(dataFilePath + ".tmp", dataFilePath)
+
+        downloader = BulkDownloader(fetch, **downloadOptions)
+        revisedReport = downloader.download(revisedCodes, replace)
+        print(revisedReport)
+        for code in revisedReport.empty:
+            print(code + " came back empty, its local file is kept")
+
+        updateReport = DataGetter.updateDataSerie(
+            TcmbObject,
+            catalogFileName,
+            codeList=[
+                code
+                for code in codeList
+                if code not in missingCodes and code not in revisedCodes
+            ],
+            **downloadOptions
+        )
+        pendingCodes = (
+            list(initializeReport.failed)
+            + initializeReport.empty
+            + list(revisedReport.failed)
+            + revisedReport.empty
+            + list(updateReport.failed)
+        )
+        catalogDiff.commit(pendingCodes)
+        if len(pendingCodes) > 0:
+            print(
+                "{0} series left pending for the next update: {1}".format(
+                    len(pendingCodes), ", ".join(pendingCodes)
+                )
+            )
+        return initializeReport, revisedReport, updateReport
 
-myTcmb = Tcmb(apiKey="xyh5URAL0e")
-DataGetter.initalizeDataSerie(myTcmb)
+if __name__ == "__main__":
+    myTcmb = Tcmb(apiKey="xyh5URAL0e")
+    DataGetter.initalizeDataSerie(myTcmb)
@@ -1,11 +1,33 @@
+import csv
+import itertools
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from functools import total_ordering
 
 import pandas as pd
-from evds import evdsAPI
+from pandas.tseries.frequencies import to_offset
+
+from features.evdsClient import EvdsClient
+from features.hierarchy import HierarchyRegistry
+from features.catalogSnapshot import CatalogSnapshot
+from features.pipelineMetrics import PipelineMetrics
+from features.seriesCatalog import SeriesCatalog
+from features.seriesPanel import PANDAS_FREQUENCIES, is_finer, resample_data
+from features.seriesFiles import (
+    EVDS_AGGREGATION_METHODS,
+    EVDS_FREQUENCY_CODES,
+    get_frequency_key,
+    infer_frequency_key,
+    parse_evds_date,
+    parse_tarih_column,
+)
 
 pd.options.mode.copy_on_write = True
 
+# dictionary indexes of every Category, DataGroup and DataSerie registered in this process
+evdsHierarchy = HierarchyRegistry()
+
 
 class Tcmb:
     def __init__(self, apiKey, categoryList=list()) -> None:
@@ -32,8 +54,18 @@ class Tcmb:
         self.apiKey = apiKey
         self.categoryList = categoryList
 
-    def write_data_into_excel_file(fileName, sheetNameList, dataList, writingMode="w"):
-        """Writes list of data into excel sheets with given sheet names list
+    def write_data_into_excel_file(
+        fileName,
+        sheetNameList,
+        dataList,
+        writingMode="w",
+        engine=None,
+        streaming=False,
+        exportFormat="xlsx",
+        ifSheetExists="overlay",
+    ):
+        """Writes list of data into excel sheets with given sheet names list.
+        The file is opened and closed only once for all the sheets.
         Parameters
         ----------
         fileName : str
@@ -41,72 +73,344 @@ class Tcmb:
         sheetsheetNameListName : list of str
             name of the sheet to write on in the excel file
         dataList : list of pandas.dataFrame
-            data to be written on excel file
+            data to be written on excel file. An item can also be an iterable of pandas.dataFrame chunks
+            (ex: DataSerie.iter_dataSerie_infos_from_file), the streaming writer and csv / parquet exports then
+            hold only one chunk in memory, the other writers put the chunks together first
         writingMode : str
-            default is 'w' for write mode, can be set equal to 'a' for append mode
+            default is 'w' for write mode, can be set equal to 'a' for append mode.
+            Write mode makes a new file, other sheets of an existing file are dropped.
+            In append mode the sheets are written over the existing sheets of the file (other sheets are kept)
+        engine : str
+            excel writer engine used in write mode ('openpyxl' or 'xlsxwriter'), default is pandas' choice
+        streaming : boolean
+            Not mandatory. Default value is False. If True (write mode only) the sheets are written row by row
+            into a write-only openpyxl workbook, which keeps memory low for big sheets like "Data Series"
+            (header cells are not styled)
+        exportFormat : str
+            'xlsx' (default), or 'parquet', 'feather', 'csv' to skip excel and write each sheet into
+            fileName/<sheet name>.<exportFormat>
+        ifSheetExists : str
+            'overlay' (default) or 'replace', how an existing sheet is written over in append mode.
+            'replace' removes the old rows of a sheet which got shorter
         Returns
         -------
 
         """
         if len(dataList) == len(sheetNameList):
-            for i in range(0, len(dataList)):
-                if os.path.exists(fileName + ".xlsx"):
-                    with pd.ExcelWriter(
-                        fileName + ".xlsx",
-                        mode="a",
-                        engine="openpyxl",
-                        if_sheet_exists="overlay",
-                    ) as writer:
-                        dataList[i].to_excel(writer, sheet_name=sheetNameList[i])
-                else:
-                    with pd.ExcelWriter(fileName + ".xlsx") as writer:
-                        dataList[i].to_excel(writer, sheet_name=sheetNameList[i])
+            if exportFormat != "xlsx":
+                Tcmb.export_data_into_files(
+                    fileName, sheetNameList, dataList, exportFormat
+                )
+            elif writingMode == "a" and os.path.exists(fileName + ".xlsx"):
+                with pd.ExcelWriter(
+                    fileName + ".xlsx",
+                    mode="a",
+                    engine="openpyxl",
+                    if_sheet_exists=ifSheetExists,
+                ) as writer:
+                    for sheetName, data in zip(sheetNameList, dataList):
+                        Tcmb.collect_chunks(data).to_excel(
+                            writer, sheet_name=sheetName
+                        )
+            elif streaming:
+                Tcmb.write_data_into_excel_file_streaming(
+                    fileName, sheetNameList, dataList
+                )
+            else:
+                with pd.ExcelWriter(fileName + ".xlsx", engine=engine) as writer:
+                    for sheetName, data in zip(sheetNameList, dataList):
+                        Tcmb.collect_chunks(data).to_excel(
+                            writer, sheet_name=sheetName
+                        )
         else:
             raise Exception(
                 "Element numbers in sheetNamesList and dataList should be equal!"
             )
 
-    def update_evds_data(apiKey):
+    def write_data_into_excel_file_streaming(fileName, sheetNameList, dataList):
+        """Writes list of data into a new excel file row by row with a write-only openpyxl workbook.
+        Layout is the same as pandas.DataFrame.to_excel (index in the first column, column labels in the first row)
+        Parameters
+        ----------
+        fileName : str
+            filename without extension
+        sheetNameList : list of str
+            names of the sheets
+        dataList : list of pandas.dataFrame
+            data to be written on excel file, or iterables of pandas.dataFrame chunks
+        """
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        for sheetName, data in zip(sheetNameList, dataList):
+            sheet = workbook.create_sheet(title=sheetName)
+            headerWriting = True
+            for chunk in Tcmb.iter_chunks(data):
+                if headerWriting:
+                    sheet.append([None] + [str(column) for column in chunk.columns])
+                    headerWriting = False
+                for row in chunk.itertuples(name=None):
+                    sheet.append([None if pd.isna(value) else value for value in row])
+        workbook.save(fileName + ".xlsx")
+
+    def iter_chunks(data):
+        """Yields the chunks of data, which is a pandas.dataFrame (one chunk) or an iterable of pandas.dataFrame"""
+        if isinstance(data, pd.DataFrame):
+            yield data
+        else:
+            yield from data
+
+    def collect_chunks(data):
+        """Puts the chunks of data (see iter_chunks) into one pandas.dataFrame"""
+        if isinstance(data, pd.DataFrame):
+            return data
+        return pd.concat(list(data))
+
+    def export_data_into_files(folderName, nameList, dataList, exportFormat="parquet"):
+        """Writes each data in dataList into its own file (folderName/<name>.<exportFormat>) as a faster alternative to excel
+        Parameters
+        ----------
+        folderName : str
+            folder of the files, created if it doesn't exist
+        nameList : list of str
+            file names without extension
+        dataList : list of pandas.dataFrame
+            data to be written, or iterables of pandas.dataFrame chunks. csv and parquet files are written
+            chunk by chunk, the chunks of a feather file are put together first
+        exportFormat : str
+            'parquet' (default), 'feather' or 'csv' (semicolon separated). parquet and feather need pyarrow
+        """
+        if exportFormat not in ("parquet", "feather", "csv"):
+            raise Exception("exportFormat should be 'parquet', 'feather' or 'csv'!")
+        os.makedirs(folderName, exist_ok=True)
+        for name, data in zip(nameList, dataList):
+            filePath = os.path.join(folderName, name + "." + exportFormat)
+            if exportFormat == "feather":
+                data = Tcmb.collect_chunks(data)
+            parquetWriter = None
+            headerWriting = True
+            for chunk in Tcmb.iter_chunks(data):
+                if exportFormat == "csv":
+                    chunk.to_csv(
+                        filePath,
+                        sep=";",
+                        index=False,
+                        encoding="utf-8",
+                        mode="w" if headerWriting else "a",
+                        header=headerWriting,
+                    )
+                    headerWriting = False
+                    continue
+                # columns mixing str and float values (ex: CATEGORY_ID) can't be stored as typed columns
+                chunk = chunk.reset_index(drop=True)
+                for column in chunk.columns[chunk.dtypes == object]:
+                    chunk[column] = chunk[column].astype("string")
+                if exportFormat == "feather":
+                    chunk.to_feather(filePath)
+                    continue
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if parquetWriter is None:
+                    parquetWriter = pq.ParquetWriter(filePath, table.schema)
+                parquetWriter.write_table(table.cast(parquetWriter.schema))
+            if parquetWriter is not None:
+                parquetWriter.close()
+
+    def write_changed_tables(
+        fileName,
+        sheetNameList,
+        dataList,
+        snapshotFileName,
+        metrics,
+        streaming=False,
+        exportFormat="xlsx",
+    ):
+        """Compares the tables with the snapshot of the previous run and writes only the changed ones
+        (see write_data_into_excel_file). The CatalogDiff is put in metrics.catalogDiff, the new snapshot is
+        saved into snapshotFileName only when catalogDiff.commit is called, after the changes were handled.
+        A table given as a function without arguments returning its pandas.dataFrame chunks is called twice,
+        once to fingerprint the chunks and once to write them, so it is never in memory at once."""
+        with metrics.stage("fingerprint"):
+            snapshot = CatalogSnapshot()
+            for sheetName, data in zip(sheetNameList, dataList):
+                for chunk in Tcmb.iter_chunks(data() if callable(data) else data):
+                    snapshot.add_rows(sheetName, chunk)
+            diff = snapshot.compare(CatalogSnapshot.load(snapshotFileName))
+        diff.snapshotFileName = snapshotFileName
+        metrics.catalogDiff = diff
+        for tableName in sheetNameList:
+            metrics.count(tableName + " added", len(diff.added.get(tableName, list())))
+            metrics.count(
+                tableName + " removed", len(diff.removed.get(tableName, list()))
+            )
+            metrics.count(
+                tableName + " changed", len(diff.changed.get(tableName, dict()))
+            )
+
+        changedTables = diff.get_changed_tables()
+        if exportFormat == "xlsx":
+            filePath = fileName + ".xlsx"
+            if not os.path.exists(filePath) or (streaming and len(changedTables) > 0):
+                changedTables = list(sheetNameList)
+            # other sheets of an existing file are kept, except by the streaming writer which makes a new file
+            writingMode = "w" if streaming else "a"
+        else:
+            writingMode = "w"
+            for sheetName in sheetNameList:
+                if not os.path.exists(
+                    os.path.join(fileName, sheetName + "." + exportFormat)
+                ):
+                    changedTables.append(sheetName)
+        if len(changedTables) > 0:
+            with metrics.stage("write"):
+                Tcmb.write_data_into_excel_file(
+                    fileName,
+                    [name for name in sheetNameList if name in changedTables],
+                    [
+                        data() if callable(data) else data
+                        for name, data in zip(sheetNameList, dataList)
+                        if name in changedTables
+                    ],
+                    writingMode=writingMode,
+                    streaming=streaming,
+                    exportFormat=exportFormat,
+                    ifSheetExists="replace",
+                )
+        return diff
+
+    def clear_registries():
+        """Releases every Category, DataGroup and DataSerie object kept by Category.categoryList,
+        DataGroup.dataGroupList and evdsHierarchy"""
+        Category.categoryList.clear()
+        DataGroup.dataGroupList.clear()
+        evdsHierarchy.clear()
+
+    def update_evds_data(
+        apiKey,
+        streaming=False,
+        exportFormat="xlsx",
+        metricsFileName=None,
+        profileFileName=None,
+        snapshotFileName=None,
+        serieFileName="Series.txt",
+    ):
         """Updates the excel file and sheets of the excel file according to the current EVDS data
         Parameters
         ----------
         apiKey : str
             Personal Api Key
+        streaming : boolean
+            Not mandatory. Default value is False. Writes the excel file row by row (see write_data_into_excel_file)
+            and reads Series.txt chunk by chunk while writing it. The streaming writer makes a new EVDS.xlsx, sheets
+            added to the file by the user are dropped. Without streaming only the three sheets are replaced
+        exportFormat : str
+            Not mandatory. Default value is 'xlsx'. 'parquet', 'feather' or 'csv' writes the three tables into the EVDS folder instead.
+            Series.txt is read chunk by chunk for 'parquet' and 'csv'
+        metricsFileName : str
+            Not mandatory. Default value is None. Writes the stage timings, row counts, requests, bytes and cache hit rate
+            of the run into this file, in the Prometheus text format if it ends with .prom, as json otherwise
+        profileFileName : str
+            Not mandatory. Default value is None. Profiles the run with cProfile and tracemalloc and dumps the
+            profile into this file (see PipelineMetrics)
+        snapshotFileName : str
+            Not mandatory. Default value is None. Fingerprints of the rows written by the previous run (see CatalogSnapshot).
+            Only the tables which changed since then are written again (the whole excel file when streaming) and
+            metrics.catalogDiff tells which rows were added, removed or changed. The new snapshot is saved only by
+            metrics.catalogDiff.commit(), call it once the changes were handled (DataGetter.updateChangedSeries does)
+        serieFileName : str
+            Not mandatory. Default value is Series.txt. Data serie info file written into the Data Series table
 
         Returns
         -------
-
+        metrics : PipelineMetrics
+            timings and counters of the run
         """
-
-        categoryData, columnLabelList = Category.get_category_infos_from_evds(
-            "xyh5URAL0e"
-        )
-        groupData, columnLabelList2 = DataGroup.get_dataGroup_infos_from_evds(
-            "xyh5URAL0e"
-        )
-        serieData, columnLabelList3 = DataSerie.turn_csv_to_dataSeries_dataframe(
-            "Series.txt"
-        )
-        myCategoryList = Category.return_dataFrame_into_category_list(
-            categoryData, columnLabelList[0], columnLabelList[1], columnLabelList[2]
-        )
-        myDataGroupList = DataGroup.return_dataFrame_into_dataGroup_list(
-            groupData,
-            columnLabelList2[0],
-            columnLabelList2[1],
-            columnLabelList2[2],
-            columnLabelList2[3],
-            columnLabelList2[4],
-            columnLabelList2[5],
-            columnLabelList2[6],
-            columnLabelList2[7],
-        )
-        updatedCategoryData = DataGroup.match_dataGroupList_items_with_Categories(
-            myDataGroupList, categoryData
-        )
-        dataList = [updatedCategoryData, groupData, serieData]
-        sheets = ["Categories", "Data Groups", "Data Series"]
-        Tcmb.write_data_into_excel_file("EVDS", sheets, dataList)
+        metrics = PipelineMetrics(profileFileName)
+        with metrics.run():
+            # objects of a previous run would otherwise stay referenced by the registries for the life of the process
+            Tcmb.clear_registries()
+            with metrics.stage("download categories"):
+                categoryData, columnLabelList = Category.get_category_infos_from_evds(
+                    "xyh5URAL0e"
+                )
+            with metrics.stage("download data groups"):
+                groupData, columnLabelList2 = DataGroup.get_dataGroup_infos_from_evds(
+                    "xyh5URAL0e"
+                )
+            if streaming or exportFormat in ("csv", "parquet"):
+                # the serie file is read chunk by chunk each time it is fingerprinted or written, never at once
+                def serieData():
+                    return DataSerie.iter_dataSerie_infos_from_file(serieFileName)
+
+                if snapshotFileName is None:
+                    serieData = DataSerie.count_chunk_rows(
+                        serieData(), metrics, "data serie rows"
+                    )
+            else:
+                with metrics.stage("read data series"):
+                    serieData = DataSerie.turn_csv_to_dataSeries_dataframe(
+                        serieFileName
+                    )[0]
+                metrics.count("data serie rows", len(serieData))
+            metrics.count("category rows", len(categoryData))
+            metrics.count("data group rows", len(groupData))
+            with metrics.stage("build objects"):
+                myCategoryList = Category.return_dataFrame_into_category_list(
+                    categoryData,
+                    columnLabelList[0],
+                    columnLabelList[1],
+                    columnLabelList[2],
+                )
+                myDataGroupList = DataGroup.return_dataFrame_into_dataGroup_list(
+                    groupData,
+                    columnLabelList2[0],
+                    columnLabelList2[1],
+                    columnLabelList2[2],
+                    columnLabelList2[3],
+                    columnLabelList2[4],
+                    columnLabelList2[5],
+                    columnLabelList2[6],
+                    columnLabelList2[7],
+                )
+            with metrics.stage("match"):
+                updatedCategoryData = (
+                    DataGroup.match_dataGroupList_items_with_Categories(
+                        myDataGroupList, categoryData
+                    )
+                )
+            dataList = [updatedCategoryData, groupData, serieData]
+            sheets = ["Categories", "Data Groups", "Data Series"]
+            if snapshotFileName is None:
+                with metrics.stage("write"):
+                    # the sheets are replaced in an existing EVDS.xlsx, other sheets of the file are kept
+                    Tcmb.write_data_into_excel_file(
+                        "EVDS",
+                        sheets,
+                        dataList,
+                        writingMode="w" if streaming else "a",
+                        streaming=streaming,
+                        exportFormat=exportFormat,
+                        ifSheetExists="replace",
+                    )
+            else:
+                diff = Tcmb.write_changed_tables(
+                    "EVDS",
+                    sheets,
+                    dataList,
+                    snapshotFileName,
+                    metrics,
+                    streaming,
+                    exportFormat,
+                )
+                if callable(serieData):
+                    metrics.count(
+                        "data serie rows", diff.snapshot.rowCounts.get("Data Series", 0)
+                    )
+        if metricsFileName is not None:
+            metrics.write(metricsFileName)
+        return metrics
 
 
 @total_ordering
@@ -137,6 +441,8 @@ class Category:
     3) TOPIC_TITLE_TR (ex: PİYASA VERİLERİ (TCMB))
     """
 
+    __slots__ = ("dataGroupList", "id", "englishTitle", "turkishTitle")
+
     categoryList = list()
 
     def __init__(self, evdsCategoryId, topicEng=None, topicTur=None) -> None:
@@ -166,6 +472,7 @@ class Category:
         self.englishTitle = topicEng
         self.turkishTitle = topicTur
         Category.categoryList.append(self)
+        evdsHierarchy.add_category(self)
 
     def __lt__(self, other):
         return self.id < other.id
@@ -195,11 +502,7 @@ class Category:
         columnLabelList : list()
             list of the column labels
         """
-        data = pd.read_csv(
-            "https://evds2.tcmb.gov.tr/service/evds/categories/key="
-            + apiKey
-            + "&type=csv"
-        )
+        data = EvdsClient.get_client().read_csv("categories", {"type": "csv"}, apiKey)
         columnLabelList = data.columns.values.tolist()
         return data, columnLabelList
 
@@ -227,13 +530,12 @@ class Category:
         """
         categoryList = list()
 
-        for i in range(0, len(categoriesDataFrame)):
-            newCategory = Category(
-                str(categoriesDataFrame[idColumnName].iloc[i]),
-                str(categoriesDataFrame[engTitleColumnName].iloc[i]),
-                str(categoriesDataFrame[turTitleColumnName].iloc[i]),
-            )
-            categoryList.append(newCategory)
+        for categoryId, engTitle, turTitle in zip(
+            categoriesDataFrame[idColumnName].astype(str),
+            categoriesDataFrame[engTitleColumnName].astype(str),
+            categoriesDataFrame[turTitleColumnName].astype(str),
+        ):
+            categoryList.append(Category(categoryId, engTitle, turTitle))
 
         return categoryList
 
@@ -313,6 +615,18 @@ class DataGroup:
      8) END_DATE (ex: 01-08-2020 day-month-year)
     """
 
+    __slots__ = (
+        "categoryId",
+        "code",
+        "nameTr",
+        "nameEng",
+        "frqStr",
+        "frq",
+        "startDate",
+        "endDate",
+        "dataSerieList",
+    )
+
     dataGroupList = list()
 
     def __init__(
@@ -351,6 +665,7 @@ class DataGroup:
         self.endDate = endDate
         self.dataSerieList = list()
         DataGroup.dataGroupList.append(self)
+        evdsHierarchy.add_dataGroup(self)
 
     def format_dataGroup_dataFrame(data):
         """Formats given dataFrame of DataGroup infos in order it to have compatible Category ids' with Category class objects.
@@ -359,16 +674,12 @@ class DataGroup:
         But when you get the Category Info from EVDS category ids' come as "1.0, 2.0 etc"
         In order to get standard category ids with both classes this method does following steps:
 
-        1.1) loops through data and checks each row of 'CATEGORY_ID' column if it contains '.'
-        1.2) if not adds '.0' at the end of the CATEGORY_ID string
+        1.1) finds the rows whose 'CATEGORY_ID' doesn't contain '.'
+        1.2) adds '.0' at the end of the CATEGORY_ID string of those rows (whole column at once, data is updated in place)
         """
-        for i in range(0, len(data)):
-
-            if "." not in data.loc[i, "CATEGORY_ID"]:  # step 1.1
-
-                dataString = data.loc[i, "CATEGORY_ID"] + ".0"
-
-                data.loc[i, "CATEGORY_ID"] = dataString  # step 1.2
+        categoryIds = data["CATEGORY_ID"]
+        withoutDot = ~categoryIds.str.contains(".", regex=False, na=True)  # step 1.1
+        data.loc[withoutDot, "CATEGORY_ID"] = categoryIds[withoutDot] + ".0"  # step 1.2
 
     def get_dataGroup_infos_from_evds(apiKey, dropLabels=True):
         """Gets infos of all the Data Groups listed in EVDS
@@ -386,11 +697,8 @@ class DataGroup:
         columnLabelList : list()
             list of the column labels
         """
-        data = pd.read_csv(
-            "https://evds2.tcmb.gov.tr/service/evds/datagroups/key="
-            + apiKey
-            + "&mode=0&code=0&type=csv",
-            dtype=str,
+        data = EvdsClient.get_client().read_csv(
+            "datagroups", {"mode": 0, "code": 0, "type": "csv"}, apiKey, dtype=str
         )
         if dropLabels:
             labelsToDrop = [
@@ -448,18 +756,19 @@ class DataGroup:
             list of created dataGroups
         """
         dataGroupList = list()
-        for i in range(0, len(dataGroupDataFrame)):
-            newDataGroup = DataGroup(
-                str(dataGroupDataFrame[catIdColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[codeColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[nameTrColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[nameEngColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[frqStrColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[frqColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[startDateColumnLabel].iloc[i]),
-                str(dataGroupDataFrame[endDateColumnLabel].iloc[i]),
-            )
-            dataGroupList.append(newDataGroup)
+        columns = [
+            catIdColumnLabel,
+            codeColumnLabel,
+            nameTrColumnLabel,
+            nameEngColumnLabel,
+            frqStrColumnLabel,
+            frqColumnLabel,
+            startDateColumnLabel,
+            endDateColumnLabel,
+        ]
+        # columns are turned into str once, then each row is read as a plain tuple
+        for row in zip(*[dataGroupDataFrame[column].astype(str) for column in columns]):
+            dataGroupList.append(DataGroup(*row))
         return dataGroupList
 
     def get_data_groups_by_categoryId(evdsCategoryId, dataGroupList):
@@ -475,6 +784,9 @@ class DataGroup:
         foundDataGorups : list()
             list of found dataGroups which belong to the Category interested
         """
+        if dataGroupList is DataGroup.dataGroupList:
+            # every created DataGroup is in the registry, no need to scan the list
+            return list(evdsHierarchy.get_dataGroups_by_category(evdsCategoryId))
         foundDataGorups = list()
         for grp in dataGroupList:
             if grp.categoryId == evdsCategoryId:
@@ -515,22 +827,18 @@ class DataGroup:
         But when you request all the Category infos from EVDS as .csv you don't get any category with id = 0. But the data in category id is important.
         So this category with id = 0 or any category which is not in the EVDS category list are created with this function.
         """
-        categoryIdsToCreate = list()
+        categoryIdsToCreate = dict()  # used as an ordered set
 
         for grp in dataGroupList:
-            cat, index = Category.get_category_by_id_in_a_list(
-                grp.categoryId, Category.categoryList
-            )
+            cat = evdsHierarchy.get_category(grp.categoryId)
             if cat is not None:
                 cat.dataGroupList.append(grp)
             else:
-                foundCategory = grp.categoryId.replace(".0", "")
-                if foundCategory not in categoryIdsToCreate:
-                    categoryIdsToCreate.append(foundCategory)
+                categoryIdsToCreate[grp.categoryId.replace(".0", "")] = None
         categoryList = list()
         if len(categoryIdsToCreate) > 0:
             categoryList = DataGroup.create_unnamed_categories_for_given_data_groups(
-                categoryIdsToCreate
+                list(categoryIdsToCreate)
             )
             newlyCreatedCategoryDataFrame = (
                 Category.return_category_list_into_dataFrame(categoryList)
@@ -562,6 +870,17 @@ class DataSerie:
     8) END_DATE (ex: 01-10-2023)
     """
 
+    __slots__ = (
+        "code",
+        "dataGroupCode",
+        "titleTr",
+        "titleEng",
+        "frqStr",
+        "aggMethod",
+        "startDate",
+        "endDate",
+    )
+
     id = 0
 
     def __init__(
@@ -630,18 +949,20 @@ class DataSerie:
             list of the column labels
         """
         try:
-            data = pd.read_csv(
-                "https://evds2.tcmb.gov.tr/service/evds/serieList/key="
-                + apiKey
-                + "&type=csv&code="
-                + dataGroupCode
+            data = EvdsClient.get_client().read_csv(
+                "serieList", {"type": "csv", "code": dataGroupCode}, apiKey
             )
         except pd.errors.EmptyDataError:
             data = "No DATA"
         return data
 
-    def get_dataSerie_infos_from_evds(apiKey, dataGroupList, dropLabels=True):
+    def get_dataSerie_infos_from_evds(
+        apiKey, dataGroupList, dropLabels=True, workerCount=8, metrics=None
+    ):
         """Gets infos of all the Data Series listed in EVDS
+        Serie lists of the data groups are downloaded concurrently and appended to Series.txt in the order of dataGroupList.
+        Each finished data group is recorded in seriesList.txt, so an interrupted run resumes from where it stopped.
+        Every serie list is kept in the returned list, use iter_dataSerie_infos_from_evds to handle them one by one.
         Parameters
         ----------
         apiKey : str
@@ -652,79 +973,290 @@ class DataSerie:
             Not mandatory. Default value is True.
             drops following columns from the data recieved from EVDS:
             ["DEFAULT_AGG_METHOD_STR", "TAG", "TAG_ENG", "DATASOURCE", "DATASOURCE_ENG", "METADATA_LINK", "METADATA_LINK_ENG", "REV_POL_LINK", "REV_POL_LINK_ENG", "APP_CHA_LINK", "APP_CHA_LINK_ENG"]
+        workerCount : int
+            Not mandatory. Default value is 8. Number of concurrent downloads
+        metrics : PipelineMetrics
+            Not mandatory. Default value is None. Download and commit timings and data group / row counts are added to it
         Returns
         -------
         data : pandas.DataFrame
             dataFrame includes all the dat Serie infos in EVDS
         """
-        headerWriting = True
-        dataList = list()
-        fileName = "Series.txt"
+        return [
+            groupData
+            for groupCode, groupData in DataSerie.iter_dataSerie_infos_from_evds(
+                apiKey, dataGroupList, dropLabels, workerCount, metrics
+            )
+        ]
 
+    def iter_dataSerie_infos_from_evds(
+        apiKey, dataGroupList, dropLabels=True, workerCount=8, metrics=None
+    ):
+        """Generator version of get_dataSerie_infos_from_evds, yields (data group code, serie infos) of each
+        data group right after it is committed to Series.txt.
+        At most 2 * workerCount serie lists are downloaded ahead of the consumer, so memory use doesn't grow
+        with the number of data groups. Parameters are the same as get_dataSerie_infos_from_evds.
+        """
+        if metrics is None:
+            metrics = PipelineMetrics()
+        fileName = "Series.txt"
         listFileName = "seriesList.txt"
-        if os.path.exists(listFileName):
-            f = open(listFileName, "r")
-            serieReadLines = f.readlines()
-            serieList = [line.rstrip() for line in serieReadLines]
-            print("initially len serieList  = {0}".format(str(len(serieList))))
-            f.close()
-        else:
-            serieList = list()
-        for group in dataGroupList:
-            print("len serieList = {0}".format(str(len(serieList))))
 
-            if group.code not in serieList:
+        serieList = DataSerie.recover_dataSerie_crawl(fileName, listFileName)
+        print("initially len serieList  = {0}".format(str(len(serieList))))
+        # dict keeps the order of dataGroupList and drops repeated codes without a linear scan
+        groupCodesToGet = list(
+            dict.fromkeys(
+                group.code for group in dataGroupList if group.code not in serieList
+            )
+        )
+
+        def get_group_data(groupCode):
+            with metrics.stage("download serie lists"):
                 groupData = DataSerie.get_dataSerie_infos_of_dataGroup(
-                    apiKey, group.code
+                    apiKey, groupCode
                 )
-                if not isinstance(groupData, str):
-                    if dropLabels:
-                        groupData = groupData.drop(
-                            [
-                                "DEFAULT_AGG_METHOD_STR",
-                                "TAG",
-                                "TAG_ENG",
-                                "DATASOURCE",
-                                "DATASOURCE_ENG",
-                                "METADATA_LINK",
-                                "METADATA_LINK_ENG",
-                                "REV_POL_LINK",
-                                "REV_POL_LINK_ENG",
-                                "APP_CHA_LINK",
-                                "APP_CHA_LINK_ENG",
-                            ],
-                            axis="columns",
-                        )
-                    if os.path.exists(fileName):
-                        headerWriting = False
-                    groupData.to_csv(
-                        fileName,
-                        sep=";",
-                        header=headerWriting,
-                        index=False,
-                        mode="a",
-                        encoding="utf-8",
+            if not isinstance(groupData, str) and dropLabels:
+                groupData = groupData.drop(
+                    [
+                        "DEFAULT_AGG_METHOD_STR",
+                        "TAG",
+                        "TAG_ENG",
+                        "DATASOURCE",
+                        "DATASOURCE_ENG",
+                        "METADATA_LINK",
+                        "METADATA_LINK_ENG",
+                        "REV_POL_LINK",
+                        "REV_POL_LINK_ENG",
+                        "APP_CHA_LINK",
+                        "APP_CHA_LINK_ENG",
+                    ],
+                    axis="columns",
+                )
+            return groupData
+
+        workerCount = max(1, workerCount)
+        with ThreadPoolExecutor(max_workers=workerCount) as executor:
+            pending = deque()
+            groupCodes = iter(groupCodesToGet)
+            for groupCode in itertools.islice(groupCodes, 2 * workerCount):
+                pending.append((groupCode, executor.submit(get_group_data, groupCode)))
+            # results are written in submission order, so Series.txt doesn't depend on download timing
+            while pending:
+                groupCode, future = pending.popleft()
+                for nextCode in itertools.islice(groupCodes, 1):
+                    pending.append(
+                        (nextCode, executor.submit(get_group_data, nextCode))
                     )
-                    serieList.append(group.code)
-                    f = open(listFileName, "a")
-                    f.write(group.code + "\n")
-                    f.close()
-                    dataList.append(groupData)
-        return dataList
+                try:
+                    groupData = future.result()
+                except Exception as e:
+                    print(
+                        groupCode
+                        + " failed, will be retried on the next run: "
+                        + repr(e)
+                    )
+                    metrics.count("data groups failed")
+                    continue
+                if isinstance(groupData, str):
+                    metrics.count("data groups empty")
+                    continue
+                with metrics.stage("commit serie lists"):
+                    DataSerie.commit_dataGroup_series(
+                        fileName, listFileName, groupCode, groupData
+                    )
+                serieList.add(groupCode)
+                metrics.count("data groups downloaded")
+                metrics.count("data serie rows", len(groupData))
+                yield groupCode, groupData
+        print("len serieList = {0}".format(str(len(serieList))))
+
+    def count_chunk_rows(chunks, metrics, counterName):
+        """Yields the given pandas.DataFrame chunks and adds their row counts to a counter of metrics"""
+        for chunk in chunks:
+            metrics.count(counterName, len(chunk))
+            yield chunk
+
+    def iter_dataSerie_infos_from_file(fileName="Series.txt", chunkSize=10000):
+        """Yields the rows of a data serie info file (ex: Series.txt) as pandas.DataFrame chunks of chunkSize rows.
+        Values are kept as str, so every chunk has the same column types. The row index continues from one chunk
+        to the next, as if the file was read at once."""
+        yield from pd.read_csv(fileName, sep=";", dtype=str, chunksize=chunkSize)
+
+    def recover_dataSerie_crawl(fileName, listFileName):
+        """Brings Series.txt and seriesList.txt back into a consistent state after an interrupted crawl and returns
+        the set of data group codes which are already in Series.txt.
+
+        fileName + ".journal" holds the size of fileName and the data group code of the last committed data group.
+        Bytes after that size were appended by an unfinished commit and are cut, a committed code missing from
+        listFileName is added, and a half written last line of listFileName is dropped.
+        A journal which can't be read, or which doesn't belong to fileName (fileName is missing or smaller than
+        the committed size, ex: it was deleted or made again), is deleted and handled like a missing journal.
+        Without a journal (a crash during the first commit, or a fileName left by a crawl without journal),
+        fileName is cut after its last complete line of a data group recorded in listFileName, the codes of data
+        groups which are not in the kept lines are removed from listFileName and the journal is written from the
+        last kept line. Without a journal and listFileName, fileName is emptied.
+        """
+        journalFileName = fileName + ".journal"
+        if os.path.exists(listFileName):
+            with open(listFileName, "r") as f:
+                content = f.read()
+            if content and not content.endswith("\n"):
+                content = content[: content.rfind("\n") + 1]
+                with open(listFileName, "w") as f:
+                    f.write(content)
+            listedCodes = [line.rstrip() for line in content.splitlines()]
+        else:
+            listedCodes = list()
+        serieList = set(listedCodes)
+
+        journal = DataSerie.read_dataSerie_journal(fileName)
+        if journal is not None and (
+            not os.path.exists(fileName) or os.path.getsize(fileName) < journal[0]
+        ):
+            journal = None
+        if journal is not None:
+            committedSize, committedCode = journal
+            if os.path.getsize(fileName) > committedSize:
+                with open(fileName, "r+b") as f:
+                    f.truncate(committedSize)
+            if committedCode not in serieList:
+                with open(listFileName, "a") as f:
+                    f.write(committedCode + "\n")
+                serieList.add(committedCode)
+            return serieList
+
+        if os.path.exists(journalFileName):
+            os.remove(journalFileName)
+        if os.path.exists(fileName):
+            committedSize, committedCode, groupCodes = (
+                DataSerie.find_last_committed_line(fileName, serieList)
+            )
+            with open(fileName, "r+b") as f:
+                f.truncate(committedSize)
+            if committedCode is not None:
+                DataSerie.write_dataSerie_journal(
+                    fileName, committedSize, committedCode
+                )
+        else:
+            groupCodes = set()
+        if len(serieList - groupCodes) > 0:
+            # listed data groups whose series are not in fileName are downloaded again
+            with open(listFileName, "w") as f:
+                f.writelines(code + "\n" for code in listedCodes if code in groupCodes)
+            serieList = serieList & groupCodes
+        return serieList
+
+    def read_dataSerie_journal(fileName):
+        """Returns (committed size, data group code) of the journal of fileName, None if it is missing or
+        can't be read (ex: a truncated journal)"""
+        try:
+            with open(fileName + ".journal", "r") as f:
+                committedSize, committedCode = f.read().split(";")
+            return int(committedSize), committedCode
+        except (OSError, ValueError):
+            return None
+
+    def find_last_committed_line(fileName, serieList):
+        """Returns the size of fileName up to the end of its last complete line whose DATAGROUP_CODE is in
+        serieList, with that data group code and the set of the data group codes of the lines before it.
+        (0, None, empty set) if there is no such line, the header is then dropped too.
+        The file is read line by line, it is never in memory at once."""
+        committedSize, committedCode = 0, None
+        groupCodes = set()
+        lineCodes = set()
+        groupColumn = None
+        position = 0
+        with open(fileName, "rb") as f:
+            for line in f:
+                position += len(line)
+                if not line.endswith(b"\n"):
+                    break
+                values = next(csv.reader([line.decode("utf-8")], delimiter=";"))
+                if groupColumn is None:
+                    if "DATAGROUP_CODE" not in values:
+                        break
+                    groupColumn = values.index("DATAGROUP_CODE")
+                    continue
+                if len(values) <= groupColumn:
+                    continue
+                lineCodes.add(values[groupColumn])
+                if values[groupColumn] in serieList:
+                    committedSize, committedCode = position, values[groupColumn]
+                    groupCodes.update(lineCodes)
+        return committedSize, committedCode, groupCodes & serieList
+
+    def write_dataSerie_journal(fileName, committedSize, groupCode):
+        """Atomically replaces the journal of fileName (see recover_dataSerie_crawl)"""
+        journalFileName = fileName + ".journal"
+        with open(journalFileName + ".tmp", "w") as f:
+            f.write(str(committedSize) + ";" + groupCode)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(journalFileName + ".tmp", journalFileName)
+
+    def commit_dataGroup_series(fileName, listFileName, groupCode, groupData):
+        """Appends the serie infos of a data group to fileName and records the data group in listFileName.
+        The journal (fileName + ".journal") is replaced atomically between the two writes, it is the commit point
+        used by recover_dataSerie_crawl."""
+        headerWriting = not os.path.exists(fileName) or os.path.getsize(fileName) == 0
+        content = groupData.to_csv(sep=";", header=headerWriting, index=False)
+        with open(fileName, "ab") as f:
+            f.write(content.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+            committedSize = f.tell()
+        DataSerie.write_dataSerie_journal(fileName, committedSize, groupCode)
+        with open(listFileName, "a") as f:
+            f.write(groupCode + "\n")
+
+    def return_dataFrame_into_dataSerie_list(dataSerieDataFrame):
+        """Turns given dataFrame object which hold the data serie information (columns of Series.txt) into a list of DataSeries.
+        Each DataSerie is registered in evdsHierarchy, so it is also appended to the dataSerieList of its DataGroup.
+
+        Parameters
+        ----------
+        dataSerieDataFrame : pandas.dataFrame
+            dataFrame with SERIE_CODE, DATAGROUP_CODE, SERIE_NAME, SERIE_NAME_ENG, FREQUENCY_STR, DEFAULT_AGG_METHOD, START_DATE, END_DATE columns
+
+        Returns
+        -------
+        dataSerieList : list()
+            list of created dataSeries
+        """
+        dataSerieList = list()
+        columns = [
+            "SERIE_CODE",
+            "DATAGROUP_CODE",
+            "SERIE_NAME",
+            "SERIE_NAME_ENG",
+            "FREQUENCY_STR",
+            "DEFAULT_AGG_METHOD",
+            "START_DATE",
+            "END_DATE",
+        ]
+        for row in zip(*[dataSerieDataFrame[column].astype(str) for column in columns]):
+            newDataSerie = DataSerie(*row)
+            evdsHierarchy.add_dataSerie(newDataSerie)
+            dataSerieList.append(newDataSerie)
+        return dataSerieList
 
     def turn_csv_to_dataSeries_dataframe(filename):
         data = pd.read_csv(filename, sep=";")
         columnLabelList = data.columns.values.tolist()
         return data, columnLabelList
 
-    def getDataSerie_with_code(dataSerieCode):
+    def getDataSerie_with_code(dataSerieCode, fileName="Series.txt"):
         """
         Gets a unique code to find the data Serie which this code belongs to
         for example if you want to Find the data serie called '(USD) US Dollar (Buying)' dataSerieCode should be: 'TP.DK.USD.A.YTL'
+        Lookup is done through the shared SeriesCatalog of fileName, so the file is parsed only once (and again when it changes).
         Parameters
         ----------
         dataSerieCode : str
             unique data serie code (ex: TP.DK.USD.A.YTL)
+        fileName : str
+            csv file which holds the data serie infos (default is Series.txt)
 
 
         Returns
@@ -733,21 +1265,19 @@ class DataSerie:
             if no data Serie object is found it returns none
 
         """
-        data = pd.read_csv("Series.txt", sep=";")
-        for i in range(0, len(data)):
-
-            if data.loc[i, "SERIE_CODE"] == dataSerieCode:
-                dataSerie = DataSerie(
-                    data.loc[i, "SERIE_CODE"],
-                    data.loc[i, "DATAGROUP_CODE"],
-                    data.loc[i, "SERIE_NAME"],
-                    data.loc[i, "SERIE_NAME_ENG"],
-                    data.loc[i, "FREQUENCY_STR"],
-                    data.loc[i, "DEFAULT_AGG_METHOD"],
-                    data.loc[i, "START_DATE"],
-                    data.loc[i, "END_DATE"],
-                )
-                return dataSerie
+        row = SeriesCatalog.get_catalog(fileName).get_row(dataSerieCode)
+        if row is not None:
+            dataSerie = DataSerie(
+                row["SERIE_CODE"],
+                row["DATAGROUP_CODE"],
+                row["SERIE_NAME"],
+                row["SERIE_NAME_ENG"],
+                row["FREQUENCY_STR"],
+                row["DEFAULT_AGG_METHOD"],
+                row["START_DATE"],
+                row["END_DATE"],
+            )
+            return dataSerie
 
     def get_data_from_evds_with_dataSerie_code(
         apiKey,
@@ -758,9 +1288,15 @@ class DataSerie:
         endDay=None,
         endMonth=None,
         endYear=None,
+        frequency=None,
+        aggregation=None,
+        fileName="Series.txt",
     ):
         """
         Gets a DataSerie object, and returns it's data as pandas.Dataframe object between given start date and end date.
+        With a frequency coarser than the one of the serie, EVDS aggregates the observations on the server and only
+        the requested resolution is downloaded. A finer frequency can't be produced by EVDS, the serie is then
+        downloaded at its own frequency and converted locally (see seriesPanel.resample_data).
         Parameters
         ----------
         apiKey : str
@@ -779,13 +1315,21 @@ class DataSerie:
             month
         endYear : str
             year
+        frequency : str
+            Not mandatory. Default value is None, the frequency of the serie (FREQUENCY_STR).
+            daily, business, weekly, biweekly, monthly, quarterly, semiannual or annual
+        aggregation : str
+            Not mandatory. Default value is None, the DEFAULT_AGG_METHOD of the serie.
+            avg, min, max, first, last or sum, used when frequency is coarser than the one of the serie
+        fileName : str
+            Not mandatory. Default value is Series.txt. csv file which holds the data serie infos (dates, frequency)
 
         Returns
         -------
         data : pandas.DataFrame
 
         """
-        dataSerie = DataSerie.getDataSerie_with_code(dataSerieCode)
+        dataSerie = DataSerie.getDataSerie_with_code(dataSerieCode, fileName)
 
         if dataSerie != None:
 
@@ -812,8 +1356,232 @@ class DataSerie:
 
             sDate = startDay + "-" + startMonth + "-" + startYear
             eDate = endDay + "-" + endMonth + "-" + endYear
-            evds = evdsAPI(apiKey)
-            data = evds.get_data([dataSerie.code], startdate=sDate, enddate=eDate)
+            frequencyParam, aggregationParam, localFrequency = (
+                DataSerie.get_request_frequency([dataSerie], frequency, aggregation)
+            )
+            data = EvdsClient.get_client().get_data(
+                apiKey,
+                [dataSerie.code],
+                startdate=sDate,
+                enddate=eDate,
+                aggregation_types=aggregationParam,
+                frequency=frequencyParam,
+            )
+            if localFrequency is not None:
+                data = resample_data(
+                    data,
+                    get_frequency_key(dataSerie.frqStr),
+                    localFrequency,
+                    DataSerie.get_aggregation_method(dataSerie, aggregation),
+                )
             return data
         else:
             return None
+
+    def get_aggregation_method(dataSerie, aggregation=None):
+        """Returns the given EVDS aggregation method, or the DEFAULT_AGG_METHOD of dataSerie (avg if it has none)"""
+        if aggregation is None:
+            aggregation = dataSerie.aggMethod
+        if aggregation not in EVDS_AGGREGATION_METHODS:
+            if aggregation != dataSerie.aggMethod:
+                raise Exception(
+                    "aggregation should be one of "
+                    + ", ".join(EVDS_AGGREGATION_METHODS)
+                )
+            aggregation = "avg"
+        return aggregation
+
+    def get_request_frequency(dataSerieList, frequency=None, aggregation=None):
+        """Returns the frequency and aggregationTypes parameters of an EVDS data request for data series of the same
+        frequency, and the frequency they should be converted into locally when EVDS can't produce it.
+        Parameters
+        ----------
+        dataSerieList : list of DataSerie
+            data series with the same FREQUENCY_STR
+        frequency : str
+            frequency key asked for, None for the frequency of the series
+        aggregation : str
+            EVDS aggregation method, None for the DEFAULT_AGG_METHOD of each serie
+
+        Returns
+        -------
+        frequencyParam : str
+            EVDS frequency code, empty string to get the series at their own frequency
+        aggregationParam : list of str
+            one aggregation method per serie, empty string when frequencyParam is empty
+        localFrequency : str
+            frequency key to convert the answer into, None if no conversion is needed
+        """
+        if frequency is None:
+            return "", "", None
+        if frequency not in EVDS_FREQUENCY_CODES:
+            raise Exception(
+                "frequency should be one of " + ", ".join(EVDS_FREQUENCY_CODES)
+            )
+        serieFrequency = get_frequency_key(dataSerieList[0].frqStr)
+        if serieFrequency == frequency:
+            return "", "", None
+        if serieFrequency is not None and is_finer(frequency, serieFrequency):
+            return "", "", frequency
+        aggregationParam = [
+            DataSerie.get_aggregation_method(dataSerie, aggregation)
+            for dataSerie in dataSerieList
+        ]
+        return str(EVDS_FREQUENCY_CODES[frequency]), aggregationParam, None
+
+    def group_dataSerie_codes_into_batches(
+        dataSerieCodeList,
+        maxSeriesPerRequest=25,
+        mergeDateRanges=False,
+        fileName="Series.txt",
+    ):
+        """Groups data serie codes into batches which can be downloaded with a single EVDS request.
+        Series of a batch have the same FREQUENCY_STR, and also the same START_DATE and END_DATE unless mergeDateRanges is True.
+        Parameters
+        ----------
+        dataSerieCodeList : list of str
+            unique data serie codes (ex: TP.DK.USD.A.YTL)
+        maxSeriesPerRequest : int
+            Not mandatory. Default value is 25. Maximum number of series in a batch
+        mergeDateRanges : boolean
+            Not mandatory. Default value is False. If True, series with different date ranges are put in the same batch
+            and the batch is downloaded between the earliest start date and the latest end date
+        fileName : str
+            csv file which holds the data serie infos (default is Series.txt)
+
+        Returns
+        -------
+        batchList : list of list of DataSerie
+            codes which are not found in fileName are left out
+        """
+        batches = dict()
+        for dataSerieCode in dict.fromkeys(dataSerieCodeList):
+            dataSerie = DataSerie.getDataSerie_with_code(dataSerieCode, fileName)
+            if dataSerie is None:
+                continue
+            if mergeDateRanges:
+                key = dataSerie.frqStr
+            else:
+                key = (dataSerie.frqStr, dataSerie.startDate, dataSerie.endDate)
+            batches.setdefault(key, list()).append(dataSerie)
+        batchList = list()
+        for dataSerieList in batches.values():
+            for i in range(0, len(dataSerieList), maxSeriesPerRequest):
+                batchList.append(dataSerieList[i : i + maxSeriesPerRequest])
+        return batchList
+
+    def get_data_of_dataSerie_batch(
+        apiKey, dataSerieBatch, frequency=None, aggregation=None
+    ):
+        """Downloads a batch of data series (see group_dataSerie_codes_into_batches) with a single EVDS request
+        and splits the answer into one DataFrame per serie, in the same layout as get_data_from_evds_with_dataSerie_code.
+        If the series have different date ranges, rows outside the range of a serie are dropped from its DataFrame.
+        Parameters
+        ----------
+        apiKey : str
+            Personal Api Key
+        dataSerieBatch : list of DataSerie
+            data series with the same frequency
+        frequency : str
+            Not mandatory. Default value is None. See get_data_from_evds_with_dataSerie_code
+        aggregation : str
+            Not mandatory. Default value is None. See get_data_from_evds_with_dataSerie_code
+
+        Returns
+        -------
+        dataDict : dict
+            data serie code -> pandas.DataFrame
+        """
+        startDates = [parse_evds_date(serie.startDate) for serie in dataSerieBatch]
+        endDates = [parse_evds_date(serie.endDate) for serie in dataSerieBatch]
+        codeList = [serie.code for serie in dataSerieBatch]
+        frequencyParam, aggregationParam, localFrequency = (
+            DataSerie.get_request_frequency(dataSerieBatch, frequency, aggregation)
+        )
+        data = EvdsClient.get_client().get_data(
+            apiKey,
+            codeList,
+            startdate=min(startDates).strftime("%d-%m-%Y"),
+            enddate=max(endDates).strftime("%d-%m-%Y"),
+            aggregation_types=aggregationParam,
+            frequency=frequencyParam,
+        )
+        valueColumns = [code.replace(".", "_") for code in codeList]
+        dateColumns = [column for column in data.columns if column not in valueColumns]
+        sameRange = len(set(startDates)) == 1 and len(set(endDates)) == 1
+        if not sameRange and len(data) > 0:
+            frequencyKey = get_frequency_key(dataSerieBatch[0].frqStr)
+            if frequencyParam != "":
+                frequencyKey = frequency
+            if frequencyKey is None:
+                frequencyKey = infer_frequency_key(data["Tarih"].iloc[0])
+            dates = parse_tarih_column(data["Tarih"], frequencyKey)
+            # aggregated periods are labelled by their first day, which can be before START_DATE
+            periodStart = to_offset(PANDAS_FREQUENCIES[frequencyKey]).rollback
+
+        dataDict = dict()
+        for serie, valueColumn, startDate, endDate in zip(
+            dataSerieBatch, valueColumns, startDates, endDates
+        ):
+            if valueColumn not in data.columns:
+                dataDict[serie.code] = data.iloc[0:0][dateColumns]
+                continue
+            serieData = data[dateColumns + [valueColumn]]
+            if not sameRange and len(data) > 0:
+                inRange = (dates >= periodStart(pd.Timestamp(startDate))) & (
+                    dates <= pd.Timestamp(endDate)
+                )
+                serieData = serieData[inRange].reset_index(drop=True)
+            if localFrequency is not None:
+                serieData = resample_data(
+                    serieData,
+                    get_frequency_key(serie.frqStr),
+                    localFrequency,
+                    DataSerie.get_aggregation_method(serie, aggregation),
+                )
+            dataDict[serie.code] = serieData
+        return dataDict
+
+    def get_data_from_evds_with_dataSerie_codes(
+        apiKey,
+        dataSerieCodeList,
+        maxSeriesPerRequest=25,
+        mergeDateRanges=False,
+        fileName="Series.txt",
+        frequency=None,
+        aggregation=None,
+    ):
+        """Batched version of get_data_from_evds_with_dataSerie_code. Series are grouped by frequency and date range
+        and each group is downloaded with as few requests as possible, between the START_DATE and END_DATE of the series.
+        Parameters
+        ----------
+        apiKey : str
+            Personal Api Key
+        dataSerieCodeList : list of str
+            unique data serie codes (ex: TP.DK.USD.A.YTL)
+        maxSeriesPerRequest : int
+            Not mandatory. Default value is 25. Maximum number of series in a request
+        mergeDateRanges : boolean
+            Not mandatory. Default value is False. See group_dataSerie_codes_into_batches
+        fileName : str
+            csv file which holds the data serie infos (default is Series.txt)
+        frequency : str
+            Not mandatory. Default value is None. See get_data_from_evds_with_dataSerie_code
+        aggregation : str
+            Not mandatory. Default value is None. See get_data_from_evds_with_dataSerie_code
+
+        Returns
+        -------
+        dataDict : dict
+            data serie code -> pandas.DataFrame, codes which are not found in fileName are left out
+        """
+        dataDict = dict()
+        for dataSerieBatch in DataSerie.group_dataSerie_codes_into_batches(
+            dataSerieCodeList, maxSeriesPerRequest, mergeDateRanges, fileName
+        ):
+            dataDict.update(
+                DataSerie.get_data_of_dataSerie_batch(
+                    apiKey, dataSerieBatch, frequency, aggregation
+                )
+            )
+        return dataDict
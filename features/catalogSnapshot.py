@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+# key column of each table written by Tcmb.update_evds_data
+TABLE_KEYS = {
+    "Categories": "CATEGORY_ID",
+    "Data Groups": "DATAGROUP_CODE",
+    "Data Series": "SERIE_CODE",
+}
+
+
+def fingerprint_rows(data, keyColumn):
+    """Returns key -> list of column fingerprints of each row of data, with the column labels.
+    A fingerprint is the 64 bit pandas hash of the value as str, written in hex. Rows with an already seen key
+    are left out, the first occurrence wins like in SeriesCatalog.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+    keyColumn : str
+        column holding the unique key of a row (ex: SERIE_CODE)
+
+    Returns
+    -------
+    columns : list of str
+    rows : dict
+        key -> list of str, one fingerprint per column
+    """
+    columns = [str(column) for column in data.columns]
+    data = data.astype(str)
+    hashes = [
+        pd.util.hash_pandas_object(data[column], index=False).to_numpy()
+        for column in data.columns
+    ]
+    rows = dict()
+    for key, rowHashes in zip(data[keyColumn], zip(*hashes)):
+        if key not in rows:
+            rows[key] = ["{0:016x}".format(value) for value in rowHashes]
+    return columns, rows
+
+
+class CatalogDiff:
+    """Added, removed and changed rows of each table between two CatalogSnapshots.
+
+    The new snapshot is not saved when the diff is made: commit saves it once the changes were handled
+    (ex: the changed series were downloaded, see DataGetter.updateChangedSeries), so a failed or interrupted
+    run reports the same changes again.
+    """
+
+    def __init__(self, snapshot=None, previous=None) -> None:
+        self.added = dict()  # table -> list of keys
+        self.removed = dict()  # table -> list of keys
+        self.changed = dict()  # table -> key -> list of changed column labels
+        self.snapshot = snapshot
+        self.previous = previous
+        self.snapshotFileName = None  # file commit saves the snapshot into, see Tcmb.write_changed_tables
+
+    def is_table_changed(self, tableName):
+        return (
+            len(self.added.get(tableName, list())) > 0
+            or len(self.removed.get(tableName, list())) > 0
+            or len(self.changed.get(tableName, dict())) > 0
+        )
+
+    def get_changed_tables(self):
+        tableNameList = list(self.added) + list(self.removed) + list(self.changed)
+        return [
+            tableName
+            for tableName in dict.fromkeys(tableNameList)
+            if self.is_table_changed(tableName)
+        ]
+
+    def get_codes_to_download(self, tableName="Data Series"):
+        """Returns the keys of the added rows and of the changed rows of a table (ex: series with a new END_DATE)"""
+        return list(self.added.get(tableName, list())) + list(
+            self.changed.get(tableName, dict())
+        )
+
+    def get_codes_with_changed_columns(self, columnList, tableName="Data Series"):
+        """Returns the keys of the changed rows of a table where one of the given columns changed"""
+        return [
+            key
+            for key, changedColumns in self.changed.get(tableName, dict()).items()
+            if any(column in changedColumns for column in columnList)
+        ]
+
+    def commit(self, pendingKeys=(), tableName="Data Series", fileName=None):
+        """Saves the new snapshot as the baseline of the next comparison.
+        Rows of pendingKeys (ex: series whose download failed) keep their previous fingerprints, or are left out
+        if they were added, so the next comparison reports them again.
+
+        Parameters
+        ----------
+        pendingKeys : list of str
+            keys of tableName whose changes were not handled
+        tableName : str
+            table of pendingKeys (default is Data Series)
+        fileName : str
+            snapshot file (default is snapshotFileName)
+        """
+        if fileName is None:
+            fileName = self.snapshotFileName
+        snapshot = CatalogSnapshot()
+        snapshot.tables = {
+            name: {"columns": table["columns"], "rows": dict(table["rows"])}
+            for name, table in self.snapshot.tables.items()
+        }
+        if tableName in snapshot.tables:
+            rows = snapshot.tables[tableName]["rows"]
+            previousTable = self.previous.tables.get(tableName, {"rows": dict()})
+            previousRows = previousTable["rows"]
+            for key in pendingKeys:
+                if key in previousRows:
+                    rows[key] = previousRows[key]
+                else:
+                    rows.pop(key, None)
+        snapshot.save(fileName)
+
+    def to_dict(self):
+        return {"added": self.added, "removed": self.removed, "changed": self.changed}
+
+    def __str__(self):
+        lines = list()
+        for tableName in dict.fromkeys(
+            list(self.added) + list(self.removed) + list(self.changed)
+        ):
+            lines.append(
+                "{0}: {1} added, {2} removed, {3} changed".format(
+                    tableName,
+                    len(self.added.get(tableName, list())),
+                    len(self.removed.get(tableName, list())),
+                    len(self.changed.get(tableName, dict())),
+                )
+            )
+        return "\n".join(lines)
+
+
+class CatalogSnapshot:
+    """Fingerprints of the rows of the EVDS catalog tables (Categories, Data Groups, Data Series), kept in a json file.
+
+    Each row is stored as one 64 bit hash per column under its key (CATEGORY_ID, DATAGROUP_CODE, SERIE_CODE),
+    so the snapshot is much smaller than the tables and comparing two snapshots tells which rows were added,
+    removed or changed and which columns of a changed row (ex: END_DATE) have a new value.
+    Rows can be added chunk by chunk (see DataSerie.iter_dataSerie_infos_from_file).
+    """
+
+    def __init__(self) -> None:
+        self.tables = dict()  # table -> {"columns": list of str, "rows": key -> list of str}
+        self.rowCounts = dict()  # table -> number of rows added, repeated keys included (not saved)
+        self.lock = threading.Lock()
+
+    def add_rows(self, tableName, data, keyColumn=None):
+        """Fingerprints the rows of data and adds them to a table of the snapshot
+
+        Parameters
+        ----------
+        tableName : str
+            ex: Data Series
+        data : pandas.DataFrame
+            rows of the table, or a chunk of them
+        keyColumn : str
+            column holding the key of a row (default is the key of tableName in TABLE_KEYS)
+        """
+        if keyColumn is None:
+            keyColumn = TABLE_KEYS[tableName]
+        columns, rows = fingerprint_rows(data, keyColumn)
+        with self.lock:
+            table = self.tables.setdefault(
+                tableName, {"columns": columns, "rows": dict()}
+            )
+            for key, rowHashes in rows.items():
+                table["rows"].setdefault(key, rowHashes)
+            self.rowCounts[tableName] = self.rowCounts.get(tableName, 0) + len(data)
+
+    def load(fileName):
+        """Returns the snapshot saved in fileName, an empty snapshot if the file doesn't exist"""
+        snapshot = CatalogSnapshot()
+        if os.path.exists(fileName):
+            with open(fileName, "r", encoding="utf-8") as f:
+                snapshot.tables = json.load(f)
+        return snapshot
+
+    def save(self, fileName):
+        tempPath = fileName + "." + str(threading.get_ident()) + ".tmp"
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(self.tables, f)
+        os.replace(tempPath, fileName)
+
+    def compare(self, previous):
+        """Returns the CatalogDiff from a previous snapshot to this one.
+        A table missing from the previous snapshot counts as fully added."""
+        diff = CatalogDiff(self, previous)
+        for tableName, table in self.tables.items():
+            previousTable = previous.tables.get(
+                tableName, {"columns": table["columns"], "rows": dict()}
+            )
+            rows = table["rows"]
+            previousRows = previousTable["rows"]
+            diff.added[tableName] = [key for key in rows if key not in previousRows]
+            diff.removed[tableName] = [key for key in previousRows if key not in rows]
+            previousIndexes = {
+                column: i for i, column in enumerate(previousTable["columns"])
+            }
+            changed = dict()
+            for key, rowHashes in rows.items():
+                previousHashes = previousRows.get(key)
+                if previousHashes is None or previousHashes == rowHashes:
+                    continue
+                changedColumns = list()
+                for column, value in zip(table["columns"], rowHashes):
+                    i = previousIndexes.get(column)
+                    if i is None or previousHashes[i] != value:
+                        changedColumns.append(column)
+                # same values in another column order are not a change
+                if len(changedColumns) > 0:
+                    changed[key] = changedColumns
+            diff.changed[tableName] = changed
+        for tableName, previousTable in previous.tables.items():
+            if tableName not in self.tables:
+                diff.removed[tableName] = list(previousTable["rows"])
+        return diff
@@ -0,0 +1,213 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class RateLimiter:
+    """Spreads requests sent to the same host evenly in time.
+    Each host gets its own schedule, so a slow host does not block requests to another one.
+    """
+
+    def __init__(self, requestsPerSecond=5.0) -> None:
+        """
+        Parameters
+        ----------
+        requestsPerSecond : float
+            maximum number of requests allowed per host in one second.
+            None or 0 disables rate limiting
+        """
+        if requestsPerSecond:
+            self.interval = 1.0 / requestsPerSecond
+        else:
+            self.interval = 0.0
+        self.nextSlot = dict()
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        """Blocks the calling thread until a request to the given host is allowed
+
+        Parameters
+        ----------
+        host : str
+            host name the request will be sent to (ex: evds2.tcmb.gov.tr)
+        """
+        if self.interval == 0.0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.nextSlot.get(host, now))
+            self.nextSlot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class DownloadReport:
+    """Summary of a bulk download run"""
+
+    def __init__(self, total) -> None:
+        self.total = total
+        self.downloaded = list()
+        self.skipped = list()
+        self.empty = list()
+        self.failed = dict()
+        self.retries = 0
+        self.lock = threading.Lock()
+        self.startTime = time.monotonic()
+        self.elapsed = 0.0
+
+    def finished(self):
+        return (
+            len(self.downloaded)
+            + len(self.skipped)
+            + len(self.empty)
+            + len(self.failed)
+        )
+
+    def __str__(self):
+        lines = [
+            "Downloaded: {0}, Skipped: {1}, Empty: {2}, Failed: {3}, Retries: {4} ({5:.1f} s)".format(
+                len(self.downloaded),
+                len(self.skipped),
+                len(self.empty),
+                len(self.failed),
+                self.retries,
+                self.elapsed,
+            )
+        ]
+        for code, error in self.failed.items():
+            lines.append("    " + code + " failed: " + error)
+        return "\n".join(lines)
+
+
+class BulkDownloader:
+    """Downloads many data series concurrently with a bounded pool of worker threads.
+
+    Every request passes through a per-host RateLimiter and failed requests are retried
+    with exponential backoff. Downloaded data is handed back to the calling thread, so
+    files are written one by one exactly as they would be written in a serial run.
+    """
+
+    def __init__(
+        self,
+        fetchFunction,
+        workerCount=4,
+        requestsPerSecond=5.0,
+        maxRetries=3,
+        backoffFactor=1.0,
+        host="evds2.tcmb.gov.tr",
+        verbose=True,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        fetchFunction : callable
+            function which takes a data serie code and returns its data as pandas.DataFrame (or None).
+            Any result with a length can be returned (ex: a dict of DataFrames for a batch of series)
+        workerCount : int
+            number of worker threads (default is 4)
+        requestsPerSecond : float
+            maximum number of requests per second sent to host (default is 5.0)
+        maxRetries : int
+            number of retries after the first failed attempt (default is 3)
+        backoffFactor : float
+            waiting time before the n'th retry is backoffFactor * 2 ** (n - 1) seconds
+        host : str
+            host name used for rate limiting
+        verbose : boolean
+            prints progress lines when True (default is True)
+        """
+        self.fetchFunction = fetchFunction
+        self.workerCount = max(1, int(workerCount))
+        self.rateLimiter = RateLimiter(requestsPerSecond)
+        self.maxRetries = maxRetries
+        self.backoffFactor = backoffFactor
+        self.host = host
+        self.verbose = verbose
+
+    def fetch_with_retry(self, code, report):
+        """Fetches a single data serie, retrying on any exception
+
+        Returns
+        -------
+        data : pandas.DataFrame or None
+        """
+        attempt = 0
+        while True:
+            self.rateLimiter.wait(self.host)
+            try:
+                return self.fetchFunction(code)
+            except Exception:
+                if attempt >= self.maxRetries:
+                    raise
+                attempt += 1
+                with report.lock:
+                    report.retries += 1
+                time.sleep(self.backoffFactor * 2 ** (attempt - 1))
+
+    def download(
+        self,
+        codeList,
+        writeFunction,
+        skipFunction=None,
+        skipMessage=" already exist, skipped",
+    ):
+        """Downloads all the data series in codeList and passes the non-empty ones to writeFunction
+
+        Parameters
+        ----------
+        codeList : list of str
+            data serie codes to download
+        writeFunction : callable
+            called as writeFunction(code, data) in the calling thread for each downloaded serie.
+            A code whose write raises is reported as failed like a failed download
+        skipFunction : callable, optional
+            called as skipFunction(code), codes returning True are not downloaded
+        skipMessage : str
+            progress message printed after the code of a skipped serie
+
+        Returns
+        -------
+        report : DownloadReport
+        """
+        report = DownloadReport(len(codeList))
+        codesToFetch = list()
+        for code in codeList:
+            if skipFunction is not None and skipFunction(code):
+                report.skipped.append(code)
+                self.print_progress(report, code + skipMessage)
+            else:
+                codesToFetch.append(code)
+
+        with ThreadPoolExecutor(max_workers=self.workerCount) as executor:
+            futures = {
+                executor.submit(self.fetch_with_retry, code, report): code
+                for code in codesToFetch
+            }
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    data = future.result()
+                except Exception as e:
+                    report.failed[code] = repr(e)
+                    self.print_progress(report, code + " failed")
+                    continue
+                if data is None or len(data) == 0:
+                    report.empty.append(code)
+                    self.print_progress(report, code + " has no data")
+                else:
+                    try:
+                        writeFunction(code, data)
+                    except Exception as e:
+                        # a failed write (ex: a full disk) doesn't stop the other downloads
+                        report.failed[code] = repr(e)
+                        self.print_progress(report, code + " could not be written")
+                        continue
+                    report.downloaded.append(code)
+                    self.print_progress(report, code + " downloaded")
+
+        report.elapsed = time.monotonic() - report.startTime
+        return report
+
+    def print_progress(self, report, message):
+        if self.verbose:
+            print("[{0}/{1}] {2}".format(report.finished(), report.total, message))
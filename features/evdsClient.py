@@ -0,0 +1,286 @@
+import io
+import json
+import os
+import ssl
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from features.responseCache import ResponseCache
+
+EVDS_BASE_URL = "https://evds2.tcmb.gov.tr/service/evds/"
+
+
+class EvdsHttpAdapter(HTTPAdapter):
+    """HTTPAdapter which can pass a custom ssl context to its connection pools.
+    EVDS servers need legacy TLS renegotiation, which is disabled by default in OpenSSL 3.
+    """
+
+    def __init__(self, sslContext=None, **kwargs):
+        self.sslContext = sslContext
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.sslContext is not None:
+            kwargs["ssl_context"] = self.sslContext
+        return super().init_poolmanager(*args, **kwargs)
+
+
+class EvdsClient:
+    """Shared HTTP client for every EVDS web service call.
+
+    One requests.Session with a connection pool is reused for all the calls, so consecutive requests
+    (ex: ~440 serieList requests) reuse the same TLS connections instead of opening a new one each time.
+    Responses are gzip compressed on the wire, requests have timeouts, failed requests (connection errors,
+    429 and 5xx answers) are retried with exponential backoff, and ETag / Last-Modified validators are sent
+    back to the server so unchanged responses are answered with 304 and served from memory.
+    With a ResponseCache, answers are also kept on disk and served without any request while they are fresh.
+    """
+
+    sharedClient = None
+    sharedClientLock = threading.Lock()
+
+    def __init__(
+        self,
+        baseUrl=EVDS_BASE_URL,
+        timeout=(10, 60),
+        maxRetries=3,
+        backoffFactor=0.5,
+        poolSize=16,
+        legacySSL=True,
+        maxValidatorEntries=1024,
+        cache=None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        baseUrl : str
+            root url of the EVDS web services (default is https://evds2.tcmb.gov.tr/service/evds/)
+        timeout : tuple of float
+            (connect timeout, read timeout) in seconds (default is (10, 60))
+        maxRetries : int
+            number of retries of a failed request (default is 3)
+        backoffFactor : float
+            base waiting time in seconds between retries (default is 0.5)
+        poolSize : int
+            maximum number of kept-alive connections per host (default is 16)
+        legacySSL : boolean
+            allows legacy TLS renegotiation required by EVDS servers (default is True)
+        maxValidatorEntries : int
+            maximum number of responses kept in memory for conditional requests (default is 1024)
+        cache : ResponseCache
+            on-disk cache of the answers (default is None, no disk cache)
+        """
+        self.baseUrl = baseUrl
+        self.timeout = timeout
+        self.maxValidatorEntries = maxValidatorEntries
+        self.cache = cache
+        self.validators = OrderedDict()  # url -> (etag, lastModified, content)
+        self.lock = threading.Lock()
+        self.requestCount = 0
+        self.notModifiedCount = 0
+        self.bytesReceived = 0
+
+        sslContext = None
+        if legacySSL:
+            sslContext = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+            sslContext.options |= getattr(ssl, "OP_LEGACY_SERVER_CONNECT", 0x4)
+        retry = Retry(
+            total=maxRetries,
+            backoff_factor=backoffFactor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        adapter = EvdsHttpAdapter(
+            sslContext=sslContext,
+            pool_connections=4,
+            pool_maxsize=poolSize,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount(
+            "http://", EvdsHttpAdapter(pool_maxsize=poolSize, max_retries=retry)
+        )
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+
+    def get_client():
+        """Returns the EvdsClient shared by the whole process, creates it on first use
+        with an on-disk ResponseCache in the 'EVDS Cache' folder.
+        The EVDS_BASE_URL environment variable replaces the base url (ex: a local EvdsMockServer), the client
+        then has no disk cache, so answers of different servers are never mixed"""
+        with EvdsClient.sharedClientLock:
+            if EvdsClient.sharedClient is None:
+                baseUrl = os.environ.get("EVDS_BASE_URL")
+                if baseUrl:
+                    EvdsClient.sharedClient = EvdsClient(baseUrl=baseUrl)
+                else:
+                    EvdsClient.sharedClient = EvdsClient(cache=ResponseCache())
+            return EvdsClient.sharedClient
+
+    def set_client(client):
+        """Replaces the shared EvdsClient (ex: to use another base url, timeout or pool size)"""
+        with EvdsClient.sharedClientLock:
+            EvdsClient.sharedClient = client
+
+    def build_url(self, endpoint, params, apiKey):
+        """Builds an EVDS url in the path style the web services expect, ex:
+        https://evds2.tcmb.gov.tr/service/evds/categories/key=XXX&type=csv"""
+        query = "&".join(
+            ["key=" + apiKey]
+            + [str(key) + "=" + str(value) for key, value in params.items()]
+        )
+        if endpoint:
+            return self.baseUrl + endpoint + "/" + query
+        return self.baseUrl + query
+
+    def get(self, endpoint, params, apiKey):
+        """Sends a GET request to an EVDS web service and returns the response body
+
+        Parameters
+        ----------
+        endpoint : str
+            web service name (ex: categories, datagroups, serieList). Empty string for the data service
+        params : dict
+            request parameters, except the api key
+        apiKey : str
+            Personal Api Key
+
+        Returns
+        -------
+        content : bytes
+            uncompressed response body
+        """
+        if self.cache is not None:
+            content = self.cache.get(endpoint, params)
+            if content is not None:
+                return content
+
+        url = self.build_url(endpoint, params, apiKey)
+        headers = {"key": apiKey}
+        with self.lock:
+            cached = self.validators.get(url)
+        if cached is not None:
+            etag, lastModified, content = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if lastModified:
+                headers["If-Modified-Since"] = lastModified
+
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        with self.lock:
+            self.requestCount += 1
+            self.bytesReceived += len(response.content)
+        if response.status_code == 304 and cached is not None:
+            with self.lock:
+                self.notModifiedCount += 1
+                self.validators.move_to_end(url)
+            if self.cache is not None and self.cache.is_stored(endpoint):
+                self.cache.put(endpoint, params, cached[2])
+            return cached[2]
+        response.raise_for_status()
+
+        etag = response.headers.get("ETag")
+        lastModified = response.headers.get("Last-Modified")
+        if etag or lastModified:
+            with self.lock:
+                self.validators[url] = (etag, lastModified, response.content)
+                self.validators.move_to_end(url)
+                while len(self.validators) > self.maxValidatorEntries:
+                    self.validators.popitem(last=False)
+        if self.cache is not None and self.cache.is_stored(endpoint):
+            self.cache.put(endpoint, params, response.content)
+        return response.content
+
+    def read_csv(self, endpoint, params, apiKey, **kwargs):
+        """Gets a csv answer from an EVDS web service and reads it with pandas.read_csv.
+        Raises pandas.errors.EmptyDataError if the answer is empty.
+
+        Parameters
+        ----------
+        endpoint : str
+            web service name (ex: categories, datagroups, serieList)
+        params : dict
+            request parameters, except the api key
+        apiKey : str
+            Personal Api Key
+        kwargs :
+            passed to pandas.read_csv
+
+        Returns
+        -------
+        data : pandas.DataFrame
+        """
+        content = self.get(endpoint, params, apiKey)
+        return pd.read_csv(io.BytesIO(content), **kwargs)
+
+    def get_data(
+        self,
+        apiKey,
+        series,
+        startdate,
+        enddate="",
+        aggregation_types="",
+        formulas="",
+        frequency="",
+    ):
+        """Gets the observations of the given data series, same answer as evds.evdsAPI.get_data
+        (Tarih column, YEARWEEK for weekly series, one float column per serie named like TP_DK_USD_A_YTL)
+
+        Parameters
+        ----------
+        apiKey : str
+            Personal Api Key
+        series : list of str
+            data serie codes
+        startdate : str
+            day-month-year (ex: 01-01-2019)
+        enddate : str
+            day-month-year, equal to startdate if not given
+        aggregation_types : str or list of str
+            avg, min, max, first, last, sum. One for all the series or one per serie
+        formulas : str or list of str
+            1 to 8 (see EVDS documentation). One for all the series or one per serie
+        frequency : str
+            1 to 8 (daily to yearly, see EVDS documentation)
+
+        Returns
+        -------
+        data : pandas.DataFrame
+        """
+        if enddate == "":
+            enddate = startdate
+        if isinstance(aggregation_types, list):
+            aggregation_types = "-".join([str(i) for i in aggregation_types])
+        elif aggregation_types != "":
+            aggregation_types = "-".join([str(aggregation_types)] * len(series))
+        if isinstance(formulas, list):
+            formulas = "-".join([str(i) for i in formulas])
+        elif formulas != "":
+            formulas = "-".join([str(formulas)] * len(series))
+
+        content = self.get(
+            "",
+            {
+                "series": "-".join(series),
+                "startDate": startdate,
+                "endDate": enddate,
+                "type": "json",
+                "formulas": formulas,
+                "frequency": str(frequency),
+                "aggregationTypes": aggregation_types,
+            },
+            apiKey,
+        )
+        data = pd.DataFrame(json.loads(content)["items"])
+        for serieColumn in [code.replace(".", "_") for code in series]:
+            if serieColumn in data.columns:
+                data[serieColumn] = data[serieColumn].astype("float")
+        if "UNIXTIME" in data.columns:
+            data = data.drop(columns=["UNIXTIME"])
+        return data
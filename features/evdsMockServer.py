@@ -0,0 +1,353 @@
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pandas as pd
+
+from features.seriesFiles import (
+    EVDS_FREQUENCY_CODES,
+    format_tarih_column,
+    get_data_file_path,
+    infer_frequency_key,
+    parse_evds_date,
+    parse_tarih_column,
+    read_data_file,
+)
+from features.seriesPanel import is_finer, resample_serie
+
+# columns EVDS sends along with the listings, they are dropped by the readers
+DATAGROUP_EXTRA_COLUMNS = [
+    "DATASOURCE",
+    "DATASOURCE_ENG",
+    "METADATA_LINK",
+    "METADATA_LINK_ENG",
+    "REV_POL_LINK",
+    "REV_POL_LINK_ENG",
+    "APP_CHA_LINK",
+    "APP_CHA_LINK_ENG",
+]
+SERIE_EXTRA_COLUMNS = [
+    "DEFAULT_AGG_METHOD_STR",
+    "TAG",
+    "TAG_ENG",
+] + DATAGROUP_EXTRA_COLUMNS
+
+
+class EvdsMockServer:
+    """Local stand-in for the EVDS web services, answering from recorded data instead of the network.
+
+    categories, datagroups and serieList answers are built from the sheets of EVDS.xlsx, data answers from the
+    local TP.*.txt files. Urls are in the path style EvdsClient builds, under <address>/service/evds/.
+    The server runs in a background thread:
+
+        with EvdsMockServer() as server:
+            EvdsClient.set_client(EvdsClient(baseUrl=server.baseUrl))
+            ...
+
+    or as a process, the shared EvdsClient of another process then finds it through EVDS_BASE_URL:
+
+        python -m features.evdsMockServer --port 8000 --latency 0.2 --error-rate 0.05
+        EVDS_BASE_URL=http://127.0.0.1:8000/service/evds/ python main.py
+
+    Every answer can be delayed by latency (+ a random jitter) seconds, and a share of the requests (errorRate)
+    answered with errorStatus instead, to measure throughput and retries under realistic conditions. These
+    settings can be changed while the server runs.
+    """
+
+    def __init__(
+        self,
+        workbookFileName="EVDS.xlsx",
+        dataFolder=None,
+        host="127.0.0.1",
+        port=0,
+        latency=0.0,
+        jitter=0.0,
+        errorRate=0.0,
+        errorStatus=503,
+        seed=None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        workbookFileName : str
+            excel file written by Tcmb.update_evds_data (default is EVDS.xlsx)
+        dataFolder : str
+            folder of the TP.*.txt files (default is the current working directory)
+        host : str
+            address to listen on (default is 127.0.0.1)
+        port : int
+            port to listen on (default is 0, any free port)
+        latency : float
+            seconds every answer is delayed (default is 0.0)
+        jitter : float
+            maximum random seconds added to latency (default is 0.0)
+        errorRate : float
+            share of the requests answered with errorStatus, between 0 and 1 (default is 0.0)
+        errorStatus : int
+            http status of the injected errors (default is 503, retried by EvdsClient)
+        seed : int
+            seed of the random jitter and errors, for reproducible runs (default is None)
+        """
+        self.dataFolder = dataFolder
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.errorRate = errorRate
+        self.errorStatus = errorStatus
+        self.random = random.Random(seed)
+        self.server = None
+        self.thread = None
+        self.requestCount = 0
+        self.errorCount = 0
+        self.lock = threading.Lock()
+        self.serieCache = dict()
+        self.load_listings(workbookFileName)
+
+    def load_listings(self, workbookFileName):
+        sheets = pd.read_excel(workbookFileName, sheet_name=None, dtype=str)
+        categoryData = sheets["Categories"].drop("Unnamed: 0", axis="columns")
+        # unnamed categories are added by update_evds_data, EVDS doesn't list them
+        categoryData = categoryData[
+            ~categoryData["TOPIC_TITLE_ENG"].str.startswith("No Name CategoryID:")
+        ]
+        self.categoriesCsv = categoryData.to_csv(index=False).encode("utf-8")
+
+        groupData = sheets["Data Groups"].drop("Unnamed: 0", axis="columns")
+        # EVDS sends the category ids of the data groups without the '.0' suffix
+        groupData["CATEGORY_ID"] = groupData["CATEGORY_ID"].str.replace(
+            ".0", "", regex=False
+        )
+        for column in DATAGROUP_EXTRA_COLUMNS:
+            groupData[column] = ""
+        self.dataGroupsCsv = groupData.to_csv(index=False).encode("utf-8")
+
+        serieData = sheets["Data Series"].drop("Unnamed: 0", axis="columns")
+        for column in SERIE_EXTRA_COLUMNS:
+            serieData[column] = ""
+        self.serieListCsv = {
+            groupCode: rows.to_csv(index=False).encode("utf-8")
+            for groupCode, rows in serieData.groupby("DATAGROUP_CODE", sort=False)
+        }
+
+    @property
+    def baseUrl(self):
+        return "http://{0}:{1}/service/evds/".format(self.host, self.port)
+
+    def start(self):
+        """Starts answering requests in a background thread and returns the base url to give to EvdsClient"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                status, contentType, body = server.answer(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", contentType)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self.baseUrl
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def answer(self, path):
+        """Returns (status, content type, body) of a request path, after the latency and error injection"""
+        with self.lock:
+            self.requestCount += 1
+            delay = self.latency + self.random.uniform(0.0, self.jitter)
+            failing = self.random.random() < self.errorRate
+            if failing:
+                self.errorCount += 1
+        if delay > 0:
+            time.sleep(delay)
+        if failing:
+            return self.errorStatus, "text/plain", b"injected error"
+        path = unquote(path.split("?")[0])
+        prefix = "/service/evds/"
+        if not path.startswith(prefix):
+            return 404, "text/plain", b"not found"
+        path = path[len(prefix) :]
+        endpoint, _, query = path.rpartition("/")
+        params = dict(item.split("=", 1) for item in query.split("&") if "=" in item)
+        if endpoint == "categories":
+            return 200, "text/csv", self.categoriesCsv
+        if endpoint == "datagroups":
+            return 200, "text/csv", self.dataGroupsCsv
+        if endpoint == "serieList":
+            return 200, "text/csv", self.serieListCsv.get(params.get("code"), b"")
+        if endpoint == "" and "series" in params:
+            return 200, "application/json", self.get_data_answer(params)
+        return 404, "text/plain", b"not found"
+
+    def load_serie(self, dataSerieCode):
+        """Returns the rows of a local data serie file (Tarih, YEARWEEK, VALUE) with a parsed DATE column,
+        None if there is no file"""
+        if dataSerieCode not in self.serieCache:
+            filePath = get_data_file_path(dataSerieCode, self.dataFolder)
+            data = None
+            if os.path.isfile(filePath):
+                data = read_data_file(filePath)
+                data = data.rename(columns={data.columns[-1]: "VALUE"})
+                if len(data) > 0:
+                    data["DATE"] = parse_tarih_column(
+                        data["Tarih"], infer_frequency_key(data["Tarih"].iloc[0])
+                    ).to_numpy()
+            self.serieCache[dataSerieCode] = data
+        return self.serieCache[dataSerieCode]
+
+    def aggregate(data, frequency, aggMethod):
+        """Aggregates the rows of a serie (see load_serie) into a coarser frequency like EVDS does,
+        rows of a serie which is not finer than frequency are returned as they are"""
+        sourceFrequency = infer_frequency_key(data["Tarih"].iloc[0])
+        if not is_finer(sourceFrequency, frequency):
+            return data
+        serie = resample_serie(
+            pd.Series(
+                data["VALUE"].to_numpy(dtype="float64"),
+                index=pd.DatetimeIndex(data["DATE"]),
+            ),
+            sourceFrequency,
+            frequency,
+            aggMethod,
+        ).dropna()
+        return pd.DataFrame(
+            {
+                "Tarih": format_tarih_column(serie.index, frequency).to_numpy(),
+                "VALUE": serie.to_numpy(),
+                "DATE": serie.index.to_numpy(),
+            }
+        )
+
+    def get_data_answer(self, params):
+        """Builds the json answer of the data service: one item per date with a value column per serie"""
+        startDate = endDate = None
+        if params.get("startDate"):
+            startDate = pd.Timestamp(parse_evds_date(params["startDate"]))
+            endDate = startDate
+        if params.get("endDate"):
+            endDate = pd.Timestamp(parse_evds_date(params["endDate"]))
+        frequencyKeys = {str(code): key for key, code in EVDS_FREQUENCY_CODES.items()}
+        frequency = frequencyKeys.get(params.get("frequency", ""))
+        aggregationList = params.get("aggregationTypes", "").split("-")
+        merged = None
+        for i, code in enumerate(params["series"].split("-")):
+            data = self.load_serie(code)
+            if data is None or len(data) == 0:
+                continue
+            if startDate is not None:
+                data = data[(data["DATE"] >= startDate) & (data["DATE"] <= endDate)]
+            if frequency is not None and len(data) > 0:
+                aggMethod = aggregationList[i] if i < len(aggregationList) else ""
+                data = EvdsMockServer.aggregate(data, frequency, aggMethod or "avg")
+            frame = data.rename(columns={"VALUE": code.replace(".", "_")})
+            if merged is None:
+                merged = frame
+            else:
+                merged = merged.merge(
+                    frame,
+                    on=["Tarih", "DATE"]
+                    + (["YEARWEEK"] if "YEARWEEK" in frame.columns else []),
+                    how="outer",
+                )
+        items = list()
+        if merged is not None:
+            merged = merged.sort_values("DATE")
+            merged["UNIXTIME"] = [
+                {"$numberLong": str(int(date.timestamp()))} for date in merged["DATE"]
+            ]
+            merged = merged.drop(columns=["DATE"]).astype(object)
+            merged = merged.where(pd.notna(merged), None)
+            for column in merged.columns:
+                if column.startswith("TP_"):
+                    merged[column] = [
+                        None if value is None else repr(float(value))
+                        for value in merged[column]
+                    ]
+            items = merged.to_dict("records")
+        return json.dumps({"totalCount": len(items), "items": items}).encode("utf-8")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Serves recorded EVDS answers on a local address"
+    )
+    parser.add_argument("--workbook", default="EVDS.xlsx", help="default is EVDS.xlsx")
+    parser.add_argument(
+        "--data-folder",
+        dest="dataFolder",
+        help="folder of the TP.*.txt files (default is the current folder)",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="seconds")
+    parser.add_argument(
+        "--error-rate", dest="errorRate", type=float, default=0.0, help="0 to 1"
+    )
+    parser.add_argument(
+        "--error-status",
+        dest="errorStatus",
+        type=int,
+        default=503,
+        help="default is 503",
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server = EvdsMockServer(
+        args.workbook,
+        dataFolder=args.dataFolder,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        errorRate=args.errorRate,
+        errorStatus=args.errorStatus,
+        seed=args.seed,
+    )
+    baseUrl = server.start()
+    print("Serving EVDS answers on " + baseUrl)
+    print("Point the clients at it with EVDS_BASE_URL=" + baseUrl)
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(
+            "{0} requests, {1} injected errors".format(
+                server.requestCount, server.errorCount
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+class HierarchyRegistry:
+    """Dictionary indexes of the EVDS Category -> DataGroup -> DataSerie hierarchy.
+
+    Lookups of a category by id, data groups of a category and data series of a data group are
+    constant time, so building the tree is linear in the number of objects instead of
+    (groups x categories). When the same key is registered twice the first object is kept,
+    same as a top-down search of the class lists would find it.
+    """
+
+    def __init__(self) -> None:
+        self.categories = dict()  # CATEGORY_ID -> Category
+        self.dataGroups = dict()  # DATAGROUP_CODE -> DataGroup
+        self.dataGroupsByCategory = dict()  # CATEGORY_ID -> list of DataGroup
+        self.dataSeries = dict()  # SERIE_CODE -> DataSerie
+        self.dataSeriesByGroup = dict()  # DATAGROUP_CODE -> list of DataSerie
+
+    def add_category(self, category):
+        self.categories.setdefault(category.id, category)
+
+    def add_dataGroup(self, dataGroup):
+        self.dataGroups.setdefault(dataGroup.code, dataGroup)
+        self.dataGroupsByCategory.setdefault(dataGroup.categoryId, list()).append(
+            dataGroup
+        )
+
+    def add_dataSerie(self, dataSerie):
+        """Registers a DataSerie and appends it to the dataSerieList of its DataGroup if the group is known"""
+        if dataSerie.code in self.dataSeries:
+            return
+        self.dataSeries[dataSerie.code] = dataSerie
+        self.dataSeriesByGroup.setdefault(dataSerie.dataGroupCode, list()).append(
+            dataSerie
+        )
+        dataGroup = self.dataGroups.get(dataSerie.dataGroupCode)
+        if dataGroup is not None:
+            dataGroup.dataSerieList.append(dataSerie)
+
+    def get_category(self, evdsCategoryId):
+        """Returns the Category with the given id, None if not registered"""
+        return self.categories.get(evdsCategoryId)
+
+    def get_dataGroup(self, dataGroupCode):
+        """Returns the DataGroup with the given code, None if not registered"""
+        return self.dataGroups.get(dataGroupCode)
+
+    def get_dataGroups_by_category(self, evdsCategoryId):
+        """Returns the list of registered DataGroups of the given category id"""
+        return self.dataGroupsByCategory.get(evdsCategoryId, list())
+
+    def get_dataSerie(self, dataSerieCode):
+        """Returns the DataSerie with the given code, None if not registered"""
+        return self.dataSeries.get(dataSerieCode)
+
+    def get_dataSeries_by_dataGroup(self, dataGroupCode):
+        """Returns the list of registered DataSeries of the given data group code"""
+        return self.dataSeriesByGroup.get(dataGroupCode, list())
+
+    def clear(self):
+        self.categories.clear()
+        self.dataGroups.clear()
+        self.dataGroupsByCategory.clear()
+        self.dataSeries.clear()
+        self.dataSeriesByGroup.clear()
@@ -0,0 +1,212 @@
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from features.evdsClient import EvdsClient
+
+
+class PipelineMetrics:
+    """Per-stage timers and counters of one run of the update pipeline.
+
+    Each stage (ex: 'download categories', 'write') records its number of calls and total duration, counters
+    hold rows processed or any other count. The requests, bytes, 304 answers and disk cache hits of the shared
+    EvdsClient are read when the run starts and ends, so only the traffic of the run is reported. Stages and
+    counters can be recorded from several threads.
+
+        metrics = PipelineMetrics()
+        with metrics.run():
+            with metrics.stage("download"):
+                ...
+            metrics.count("rows", len(data))
+        metrics.write("metrics.prom")
+
+    With profileFileName, the run is also profiled with cProfile (written to profileFileName) and tracemalloc
+    (largest allocations written to profileFileName + ".memory.txt").
+    """
+
+    def __init__(self, profileFileName=None, memoryTopCount=25) -> None:
+        """
+        Parameters
+        ----------
+        profileFileName : str
+            file of the cProfile dump, readable with pstats or snakeviz (default is None, no profiling)
+        memoryTopCount : int
+            number of allocation sites written to the tracemalloc report (default is 25)
+        """
+        self.profileFileName = profileFileName
+        self.memoryTopCount = memoryTopCount
+        self.lock = threading.Lock()
+        self.stages = dict()  # name -> [call count, total seconds]
+        self.counters = dict()
+        self.client = dict()
+        self.elapsed = 0.0
+        self.startTime = None
+        self.startClient = None
+        self.profiler = None
+        self.catalogDiff = None  # CatalogDiff of the run, see Tcmb.update_evds_data
+
+    def get_client_counters():
+        """Returns the request, byte and cache counters of the shared EvdsClient"""
+        client = EvdsClient.get_client()
+        counters = {
+            "requests": client.requestCount,
+            "bytes_received": client.bytesReceived,
+            "not_modified": client.notModifiedCount,
+            "cache_hits": 0,
+            "cache_misses": 0,
+        }
+        if client.cache is not None:
+            counters["cache_hits"] = client.cache.hits
+            counters["cache_misses"] = client.cache.misses
+        return counters
+
+    def start(self):
+        self.startClient = PipelineMetrics.get_client_counters()
+        if self.profileFileName is not None:
+            tracemalloc.start()
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.startTime = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self.startTime
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.profileFileName)
+            self.profiler = None
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            with open(self.profileFileName + ".memory.txt", "w") as f:
+                f.write("current: {0} bytes, peak: {1} bytes\n".format(current, peak))
+                for stat in snapshot.statistics("lineno")[: self.memoryTopCount]:
+                    f.write(str(stat) + "\n")
+        endClient = PipelineMetrics.get_client_counters()
+        self.client = {
+            key: endClient[key] - self.startClient[key] for key in endClient
+        }
+
+    @contextlib.contextmanager
+    def run(self):
+        """Measures the whole run, see start and stop"""
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Adds the duration of the with block to the given stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            with self.lock:
+                stage = self.stages.setdefault(name, [0, 0.0])
+                stage[0] += 1
+                stage[1] += duration
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def get_cache_hit_rate(self):
+        """Returns the share of the requests answered without a download (disk cache hits and 304 answers),
+        None if there was no request"""
+        served = self.client.get("cache_hits", 0) + self.client.get("not_modified", 0)
+        total = self.client.get("cache_hits", 0) + self.client.get("requests", 0)
+        if total == 0:
+            return None
+        return served / total
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "elapsed_seconds": self.elapsed,
+                "stages": {
+                    name: {"calls": calls, "seconds": seconds}
+                    for name, (calls, seconds) in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "client": dict(self.client),
+                "cache_hit_rate": self.get_cache_hit_rate(),
+            }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix="fonanaliz_update"):
+        """Returns the metrics in the Prometheus text exposition format (ex: for the node exporter textfile collector)"""
+
+        def label(value):
+            return value.replace("\\", "\\\\").replace('"', '\\"')
+
+        data = self.to_dict()
+        lines = [
+            "# TYPE {0}_elapsed_seconds gauge".format(prefix),
+            "{0}_elapsed_seconds {1}".format(prefix, data["elapsed_seconds"]),
+            "# TYPE {0}_stage_seconds gauge".format(prefix),
+        ]
+        for name, stage in data["stages"].items():
+            lines.append(
+                '{0}_stage_seconds{{stage="{1}"}} {2}'.format(
+                    prefix, label(name), stage["seconds"]
+                )
+            )
+        lines.append("# TYPE {0}_stage_calls gauge".format(prefix))
+        for name, stage in data["stages"].items():
+            lines.append(
+                '{0}_stage_calls{{stage="{1}"}} {2}'.format(
+                    prefix, label(name), stage["calls"]
+                )
+            )
+        lines.append("# TYPE {0}_count gauge".format(prefix))
+        for name, value in data["counters"].items():
+            lines.append(
+                '{0}_count{{name="{1}"}} {2}'.format(prefix, label(name), value)
+            )
+        for name, value in data["client"].items():
+            lines.append("# TYPE {0}_{1} gauge".format(prefix, name))
+            lines.append("{0}_{1} {2}".format(prefix, name, value))
+        if data["cache_hit_rate"] is not None:
+            lines.append("# TYPE {0}_cache_hit_rate gauge".format(prefix))
+            lines.append(
+                "{0}_cache_hit_rate {1}".format(prefix, data["cache_hit_rate"])
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self, fileName):
+        """Writes the metrics into fileName, in the Prometheus text format if it ends with .prom, as json otherwise.
+        The file is replaced atomically, so a collector never reads half written metrics."""
+        if fileName.endswith(".prom"):
+            content = self.to_prometheus()
+        else:
+            content = self.to_json()
+        with open(fileName + ".tmp", "w") as f:
+            f.write(content)
+        os.replace(fileName + ".tmp", fileName)
+
+    def __str__(self):
+        data = self.to_dict()
+        lines = ["Total: {0:.2f} s".format(data["elapsed_seconds"])]
+        for name, stage in data["stages"].items():
+            lines.append(
+                "    {0:30} {1:>8.3f} s ({2} calls)".format(
+                    name, stage["seconds"], stage["calls"]
+                )
+            )
+        for name, value in list(data["counters"].items()) + list(
+            data["client"].items()
+        ):
+            lines.append("    {0:30} {1}".format(name, value))
+        if data["cache_hit_rate"] is not None:
+            lines.append(
+                "    {0:30} {1:.1%}".format("cache_hit_rate", data["cache_hit_rate"])
+            )
+        return "\n".join(lines)
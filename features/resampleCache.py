@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+
+import pandas as pd
+
+from features.seriesFiles import (
+    format_tarih_column,
+    get_data_file_path,
+    parse_tarih_column,
+    read_data_file,
+)
+from features.seriesPanel import resample_serie
+
+
+class ResampleCache:
+    """On-disk cache of data series converted locally into another frequency.
+
+    EVDS aggregates a serie into a coarser frequency on the server (see get_data_from_evds_with_dataSerie_code),
+    but it can't produce a finer one (ex: a monthly serie on a daily index). Such conversions, and the ones of
+    series which were already downloaded at their own frequency, are done once with resample_serie and kept in
+    cacheFolder/<frequency>/<code>.<aggregation>[.<fill>].txt in the layout of the data serie files.
+    index.json keeps the signature (modification time, size) of the file each one was built from, a converted
+    serie is built again when its source file changes.
+    """
+
+    def __init__(self, cacheFolder="Resampled Series") -> None:
+        """
+        Parameters
+        ----------
+        cacheFolder : str
+            folder of the converted series (default is 'Resampled Series')
+        """
+        self.cacheFolder = cacheFolder
+        self.indexPath = os.path.join(cacheFolder, "index.json")
+        self.lock = threading.Lock()
+        self.index = dict()
+        os.makedirs(cacheFolder, exist_ok=True)
+        if os.path.exists(self.indexPath):
+            with open(self.indexPath, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def file_signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def save_index(self):
+        tempPath = self.indexPath + "." + str(threading.get_ident()) + ".tmp"
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tempPath, self.indexPath)
+
+    def get_entry_name(dataSerieCode, frequency, aggMethod, fill=None):
+        name = dataSerieCode + "." + aggMethod
+        if fill is not None:
+            name += "." + fill
+        return frequency + "/" + name + ".txt"
+
+    def get_serie(self, panel, dataSerieCode, frequency, fill=None):
+        """Returns a data serie of a SeriesPanel converted into the given frequency with its DEFAULT_AGG_METHOD,
+        from the cache if its source file hasn't changed since it was converted
+
+        Parameters
+        ----------
+        panel : SeriesPanel
+            panel the serie is read from when it is not cached
+        dataSerieCode : str
+            unique data serie code (ex: TP.DK.USD.A.YTL)
+        frequency : str
+            frequency key to convert into (see seriesFiles.get_frequency_key)
+        fill : str
+            None or 'ffill', see resample_serie
+
+        Returns
+        -------
+        serie : pandas.Series
+            float64 values with a DatetimeIndex named Tarih
+        """
+        sourceFrequency = panel.get_frequency(dataSerieCode)
+        if sourceFrequency == frequency:
+            return panel.get_serie(dataSerieCode)
+        aggMethod = panel.get_aggregation_method(dataSerieCode)
+        entryName = ResampleCache.get_entry_name(
+            dataSerieCode, frequency, aggMethod, fill
+        )
+        entryPath = os.path.join(self.cacheFolder, *entryName.split("/"))
+        signature = ResampleCache.file_signature(
+            get_data_file_path(dataSerieCode, panel.dataFolder)
+        )
+        with self.lock:
+            cached = self.index.get(entryName) == signature
+        if cached and os.path.exists(entryPath):
+            data = read_data_file(entryPath)
+            return pd.Series(
+                data[data.columns[-1]].to_numpy(dtype="float64"),
+                index=pd.DatetimeIndex(
+                    parse_tarih_column(data["Tarih"], frequency), name="Tarih"
+                ),
+                name=dataSerieCode,
+            )
+
+        serie = resample_serie(
+            panel.get_serie(dataSerieCode), sourceFrequency, frequency, aggMethod, fill
+        )
+        serie.index.name = "Tarih"
+        data = pd.DataFrame(
+            {
+                "Tarih": format_tarih_column(serie.index, frequency).to_numpy(),
+                dataSerieCode.replace(".", "_"): serie.to_numpy(),
+            }
+        )
+        os.makedirs(os.path.dirname(entryPath), exist_ok=True)
+        tempPath = entryPath + "." + str(threading.get_ident()) + ".tmp"
+        data.to_csv(tempPath, sep=";", encoding="utf-8")
+        os.replace(tempPath, entryPath)
+        with self.lock:
+            self.index[entryName] = signature
+            self.save_index()
+        return serie.rename(dataSerieCode)
+
+    def clear(self):
+        with self.lock:
+            for entryName in self.index:
+                entryPath = os.path.join(self.cacheFolder, *entryName.split("/"))
+                if os.path.exists(entryPath):
+                    os.remove(entryPath)
+            self.index = dict()
+            self.save_index()
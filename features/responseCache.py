@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# seconds a cached answer stays fresh for each EVDS web service ("" is the data service)
+DEFAULT_TTLS = {
+    "categories": 7 * 24 * 3600,
+    "datagroups": 24 * 3600,
+    "serieList": 24 * 3600,
+    "": 0,
+}
+
+
+class CacheMissError(Exception):
+    pass
+
+
+class ResponseCache:
+    """On-disk, content-addressed cache of EVDS web service answers.
+
+    Each answer is stored under the sha256 of its endpoint and request parameters. The api key is not a
+    request parameter (EvdsClient passes it separately), so it never takes part in the key or the stored files.
+    Answers are fresh for a time to live chosen per endpoint. When the total size of the cache goes above
+    maxBytes, the least recently used answers are deleted. In offline mode answers are served from the cache
+    whatever their age, and a missing answer raises CacheMissError instead of going to the network.
+    Answers of endpoints with a time to live of 0 (the data service by default) are never served online, they
+    are stored only in offline or record mode, so they don't push the other answers out of the cache.
+    """
+
+    def __init__(
+        self,
+        cacheFolder="EVDS Cache",
+        ttls=None,
+        defaultTtl=0,
+        maxBytes=256 * 1024 * 1024,
+        offline=False,
+        record=False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        cacheFolder : str
+            folder of the cached answers (default is 'EVDS Cache')
+        ttls : dict
+            endpoint -> time to live in seconds, None means never expires (default is DEFAULT_TTLS)
+        defaultTtl : float
+            time to live of the endpoints which are not in ttls (default is 0, always refreshed)
+        maxBytes : int
+            maximum total size of the cached answers (default is 256 MB)
+        offline : boolean
+            serves only from the cache when True (default is False)
+        record : boolean
+            stores the answers of the endpoints with a time to live of 0 too, ex: to replay a run offline later
+            (default is False)
+        """
+        self.cacheFolder = cacheFolder
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.defaultTtl = defaultTtl
+        self.maxBytes = maxBytes
+        self.offline = offline
+        self.record = record
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cacheFolder, exist_ok=True)
+        self.totalBytes = sum(size for path, size, used in self.list_entries())
+
+    def get_key(endpoint, params):
+        """Returns the cache key of a request, params should not contain the api key"""
+        text = json.dumps(
+            {
+                "endpoint": endpoint,
+                "params": {str(k): str(v) for k, v in params.items()},
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_paths(self, key):
+        return (
+            os.path.join(self.cacheFolder, key + ".bin"),
+            os.path.join(self.cacheFolder, key + ".json"),
+        )
+
+    def list_entries(self):
+        """Returns (body path, size, last use time) of every cached answer"""
+        entries = list()
+        for entry in os.scandir(self.cacheFolder):
+            if entry.name.endswith(".bin"):
+                stat = entry.stat()
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def get(self, endpoint, params):
+        """Returns the cached answer of a request, None if it is not cached or it is expired.
+        In offline mode expired answers are returned and a missing answer raises CacheMissError.
+        """
+        bodyPath, infoPath = self.get_paths(ResponseCache.get_key(endpoint, params))
+        try:
+            with open(infoPath, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            with open(bodyPath, "rb") as f:
+                content = f.read()
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            if self.offline:
+                raise CacheMissError(
+                    "No cached answer for " + endpoint + " " + str(params)
+                )
+            return None
+
+        ttl = self.ttls.get(endpoint, self.defaultTtl)
+        if not self.offline and ttl is not None:
+            if time.time() - info["storedAt"] > ttl:
+                with self.lock:
+                    self.misses += 1
+                return None
+        # modification time is used as the last use time for LRU eviction
+        os.utime(bodyPath)
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def is_stored(self, endpoint):
+        """Returns True if the answers of endpoint are kept, see record"""
+        if self.offline or self.record:
+            return True
+        return self.ttls.get(endpoint, self.defaultTtl) != 0
+
+    def put(self, endpoint, params, content):
+        """Stores the answer of a request and evicts least recently used answers if the cache is too big"""
+        key = ResponseCache.get_key(endpoint, params)
+        bodyPath, infoPath = self.get_paths(key)
+        info = {"endpoint": endpoint, "params": params, "storedAt": time.time()}
+        oldSize = os.path.getsize(bodyPath) if os.path.exists(bodyPath) else 0
+        # temp file and rename, so a crash never leaves half written answers
+        for path, data, mode in (
+            (bodyPath, content, "wb"),
+            (infoPath, json.dumps(info, default=str).encode("utf-8"), "wb"),
+        ):
+            tempPath = path + "." + str(threading.get_ident()) + ".tmp"
+            with open(tempPath, mode) as f:
+                f.write(data)
+            os.replace(tempPath, path)
+        with self.lock:
+            self.totalBytes += len(content) - oldSize
+            if self.totalBytes > self.maxBytes:
+                self.evict()
+
+    def evict(self):
+        entries = sorted(self.list_entries(), key=lambda entry: entry[2])
+        totalBytes = sum(size for path, size, used in entries)
+        for path, size, used in entries:
+            if totalBytes <= self.maxBytes:
+                break
+            for removedPath in (path, path[: -len(".bin")] + ".json"):
+                try:
+                    os.remove(removedPath)
+                except OSError:
+                    pass
+            totalBytes -= size
+        self.totalBytes = totalBytes
+
+    def clear(self):
+        for entry in os.scandir(self.cacheFolder):
+            if entry.name.endswith((".bin", ".json")):
+                os.remove(entry.path)
+        self.totalBytes = 0
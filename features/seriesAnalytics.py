@@ -0,0 +1,248 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from features.seriesMmap import MmapSeriesStore
+
+# number of periods in a year for each frequency key, used to annualize volatility
+PERIODS_PER_YEAR = {
+    "daily": 365,
+    "business": 252,
+    "weekly": 52,
+    "biweekly": 24,
+    "monthly": 12,
+    "quarterly": 4,
+    "semiannual": 2,
+    "annual": 1,
+}
+
+
+def summary(serie, frequencyKey):
+    """Number of observations, first and last dates, mean, min and max of a serie"""
+    serie = serie.dropna()
+    if len(serie) == 0:
+        return {"count": 0}
+    return {
+        "count": len(serie),
+        "first_date": serie.index[0],
+        "last_date": serie.index[-1],
+        "mean": float(serie.mean()),
+        "min": float(serie.min()),
+        "max": float(serie.max()),
+    }
+
+
+def growth(serie, frequencyKey):
+    """Total growth between the first and the last observation and its annual rate (compounded)"""
+    serie = serie.dropna()
+    if len(serie) < 2 or serie.iloc[0] <= 0 or serie.iloc[-1] <= 0:
+        return {"total_growth": np.nan, "annual_growth": np.nan}
+    ratio = serie.iloc[-1] / serie.iloc[0]
+    years = (serie.index[-1] - serie.index[0]).days / 365.25
+    return {
+        "total_growth": float(ratio - 1),
+        "annual_growth": float(ratio ** (1 / years) - 1) if years > 0 else np.nan,
+    }
+
+
+def yoy(serie, frequencyKey):
+    """Year over year change of each observation against the last observation at least one year before it
+    (ex: annual inflation of a CPI serie like TP.01TKFE). Returns the last, mean and max change"""
+    serie = serie.dropna()
+    dates = serie.index.to_numpy(dtype="datetime64[ns]")
+    yearBefore = (serie.index - pd.DateOffset(years=1)).to_numpy(
+        dtype="datetime64[ns]"
+    )
+    previous = np.searchsorted(dates, yearBefore, "right") - 1
+    valid = previous >= 0
+    if not valid.any():
+        return {"yoy_last": np.nan, "yoy_mean": np.nan, "yoy_max": np.nan}
+    values = serie.to_numpy(dtype="float64")
+    changes = values[valid] / values[previous[valid]] - 1
+    return {
+        "yoy_last": float(changes[-1]),
+        "yoy_mean": float(np.nanmean(changes)),
+        "yoy_max": float(np.nanmax(changes)),
+    }
+
+
+def volatility(serie, frequencyKey):
+    """Annualized standard deviation of the period to period changes of a serie"""
+    changes = serie.dropna().pct_change().dropna()
+    changes = changes[np.isfinite(changes)]
+    if len(changes) < 2:
+        return {"volatility": np.nan}
+    return {
+        "volatility": float(
+            changes.std() * np.sqrt(PERIODS_PER_YEAR.get(frequencyKey, 1))
+        )
+    }
+
+
+BUILTIN_FUNCTIONS = {
+    "summary": summary,
+    "growth": growth,
+    "yoy": yoy,
+    "volatility": volatility,
+}
+
+# MmapSeriesStore opened once by each worker process, see open_worker_store
+workerStore = None
+
+
+def open_worker_store(storeFolder, catalogFileName, dataFolder):
+    global workerStore
+    workerStore = MmapSeriesStore(
+        storeFolder, catalogFileName, dataFolder, checkFiles=False
+    )
+
+
+def analyze_series(dataSerieCodeList, functions, startDate=None, endDate=None):
+    """Applies the functions to the given series of the worker's store and returns one result row per serie.
+    Series are read as views of the mapped store files, only the result rows go back to the parent process."""
+    rows = list()
+    for code in dataSerieCodeList:
+        row = {"SERIE_CODE": code}
+        try:
+            serie = workerStore.read_serie(code, startDate, endDate)
+            frequencyKey = workerStore.get_entry(code)["frequency"]
+            for name, function in functions.items():
+                result = function(serie, frequencyKey)
+                if isinstance(result, dict):
+                    row.update(result)
+                else:
+                    row[name] = result
+        except Exception as e:
+            row["error"] = repr(e)
+        rows.append(row)
+    return rows
+
+
+class SeriesAnalytics:
+    """Maps per-serie functions over the local data series with a pool of worker processes.
+
+    Series are read from a MmapSeriesStore: each worker maps the store files once and slices its series out of
+    them, so no DataFrame is pickled between the processes, only the code lists going in and the result rows
+    coming back. A function takes (pandas.Series with a DatetimeIndex, frequency key) and returns a value or a
+    dict of values. It must be defined at module level so worker processes can import it. Built-in functions
+    are summary, growth, yoy and volatility (see BUILTIN_FUNCTIONS).
+
+        analytics = SeriesAnalytics()
+        table = analytics.run(["yoy", "volatility"])
+    """
+
+    def __init__(
+        self,
+        storeFolder="Series Mmap",
+        catalogFileName="initialSeries.txt",
+        dataFolder=None,
+        workerCount=None,
+        chunkSize=16,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        storeFolder : str
+            folder of the MmapSeriesStore, built or refreshed before each run (default is 'Series Mmap')
+        catalogFileName : str
+            data serie catalog (default is initialSeries.txt)
+        dataFolder : str
+            folder of the TP.*.txt files (default is the current working directory)
+        workerCount : int
+            number of worker processes (default is None, the number of cpus). 1 runs in the calling process
+        chunkSize : int
+            number of series sent to a worker at once (default is 16)
+        """
+        self.storeFolder = storeFolder
+        self.catalogFileName = catalogFileName
+        self.dataFolder = dataFolder
+        self.workerCount = workerCount or os.cpu_count() or 1
+        self.chunkSize = max(1, chunkSize)
+
+    def get_functions(functions):
+        """Returns name -> function of the given function names, functions, or dict of them"""
+        if functions is None:
+            return dict(BUILTIN_FUNCTIONS)
+        if isinstance(functions, dict):
+            items = functions.items()
+        else:
+            items = [
+                (function, function)
+                if isinstance(function, str)
+                else (function.__name__, function)
+                for function in functions
+            ]
+        result = dict()
+        for name, function in items:
+            if isinstance(function, str):
+                if function not in BUILTIN_FUNCTIONS:
+                    raise Exception(
+                        function
+                        + " is not a built-in function, use one of "
+                        + ", ".join(BUILTIN_FUNCTIONS)
+                    )
+                function = BUILTIN_FUNCTIONS[function]
+            result[name] = function
+        return result
+
+    def run(
+        self, functions=None, dataSerieCodeList=None, startDate=None, endDate=None
+    ):
+        """Applies the functions to every serie and returns the results as one table
+
+        Parameters
+        ----------
+        functions : list or dict
+            names of built-in functions and / or functions, or a dict of name -> function (default is every built-in)
+        dataSerieCodeList : list of str
+            series to analyze (default is every serie of the store)
+        startDate : str or datetime
+            first date of the analyzed range (default is the first observation)
+        endDate : str or datetime
+            last date of the analyzed range (default is the last observation)
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            one row per serie indexed by SERIE_CODE, one column per result value (the function name for plain
+            values, the keys for dict results), and an error column for series whose functions failed
+        """
+        functions = SeriesAnalytics.get_functions(functions)
+        store = MmapSeriesStore(
+            self.storeFolder, self.catalogFileName, self.dataFolder, checkFiles=False
+        )
+        if len(store.get_codes()) == 0:
+            store.build()
+        else:
+            store.refresh()
+        if dataSerieCodeList is None:
+            dataSerieCodeList = store.get_codes()
+        chunks = [
+            dataSerieCodeList[i : i + self.chunkSize]
+            for i in range(0, len(dataSerieCodeList), self.chunkSize)
+        ]
+
+        rows = list()
+        if self.workerCount == 1:
+            open_worker_store(self.storeFolder, self.catalogFileName, self.dataFolder)
+            for chunk in chunks:
+                rows.extend(analyze_series(chunk, functions, startDate, endDate))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.workerCount,
+                initializer=open_worker_store,
+                initargs=(self.storeFolder, self.catalogFileName, self.dataFolder),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        analyze_series, chunk, functions, startDate, endDate
+                    )
+                    for chunk in chunks
+                ]
+                for future in futures:
+                    rows.extend(future.result())
+        if len(rows) == 0:
+            return pd.DataFrame(index=pd.Index([], name="SERIE_CODE"))
+        return pd.DataFrame(rows).set_index("SERIE_CODE")
@@ -0,0 +1,130 @@
+import os
+import threading
+
+import pandas as pd
+
+
+class SeriesCatalog:
+    """Data Serie metadata (rows of Series.txt) loaded once and indexed in memory.
+
+    Rows are kept in a dictionary keyed by SERIE_CODE, so a lookup is a single hash access
+    instead of a full csv parse and a linear scan. DATAGROUP_CODE and FREQUENCY_STR have
+    secondary indexes which map to the list of SERIE_CODEs they contain.
+    The catalog reloads itself whenever the modification time or size of the source file changes.
+    """
+
+    catalogs = dict()  # one catalog per source file, shared by all the callers
+    catalogsLock = threading.Lock()
+
+    def __init__(self, fileName="Series.txt", sep=";") -> None:
+        """
+        Parameters
+        ----------
+        fileName : str
+            csv file which holds the data serie infos (default is Series.txt)
+        sep : str
+            column separator of the csv file (default is ;)
+        """
+        self.fileName = fileName
+        self.sep = sep
+        self.chunkSize = 10000
+        self.signature = None
+        self.columns = list()
+        self.codeIndex = dict()
+        self.dataGroupIndex = dict()
+        self.frequencyIndex = dict()
+        self.lock = threading.Lock()
+
+    def get_catalog(fileName="Series.txt"):
+        """Returns the shared SeriesCatalog of the given file, creates it on first use
+
+        Parameters
+        ----------
+        fileName : str
+            csv file which holds the data serie infos (default is Series.txt)
+
+        Returns
+        -------
+        catalog : SeriesCatalog
+        """
+        key = os.path.abspath(fileName)
+        with SeriesCatalog.catalogsLock:
+            catalog = SeriesCatalog.catalogs.get(key)
+            if catalog is None:
+                catalog = SeriesCatalog(fileName)
+                SeriesCatalog.catalogs[key] = catalog
+        return catalog
+
+    def file_signature(self):
+        stat = os.stat(self.fileName)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """Reloads the catalog if the source file has changed since the last load"""
+        signature = self.file_signature()
+        if signature != self.signature:
+            with self.lock:
+                if signature != self.signature:
+                    self.load(signature)
+
+    def load(self, signature):
+        # read in chunks, so the whole file is never held as a DataFrame next to the indexes
+        columns = list()
+        codeIndex = dict()
+        dataGroupIndex = dict()
+        frequencyIndex = dict()
+        for data in pd.read_csv(
+            self.fileName, sep=self.sep, dtype=str, chunksize=self.chunkSize
+        ):
+            columns = data.columns.values.tolist()
+            for row in data.to_dict("records"):
+                code = row["SERIE_CODE"]
+                if code in codeIndex:
+                    continue  # first occurrence wins, same as a top-down scan of the file
+                codeIndex[code] = row
+                dataGroupIndex.setdefault(row.get("DATAGROUP_CODE"), list()).append(
+                    code
+                )
+                frequencyIndex.setdefault(row.get("FREQUENCY_STR"), list()).append(
+                    code
+                )
+        self.columns = columns
+        self.codeIndex = codeIndex
+        self.dataGroupIndex = dataGroupIndex
+        self.frequencyIndex = frequencyIndex
+        self.signature = signature
+
+    def get_row(self, dataSerieCode):
+        """Returns the row of the given data serie code as a dict (column name -> value), None if not found"""
+        self.refresh()
+        return self.codeIndex.get(dataSerieCode)
+
+    def get_rows(self, dataSerieCodeList):
+        """Returns the rows of the given data serie codes, None for the codes which are not found.
+        The source file is checked for changes only once for the whole list."""
+        self.refresh()
+        codeIndex = self.codeIndex
+        return [codeIndex.get(code) for code in dataSerieCodeList]
+
+    def get_codes(self):
+        """Returns all the data serie codes in the catalog, in file order"""
+        self.refresh()
+        return list(self.codeIndex)
+
+    def get_codes_by_dataGroup(self, dataGroupCode):
+        """Returns the list of data serie codes which belong to the given data group code"""
+        self.refresh()
+        return list(self.dataGroupIndex.get(dataGroupCode, ()))
+
+    def get_codes_by_frequency(self, frqStr):
+        """Returns the list of data serie codes with the given FREQUENCY_STR"""
+        self.refresh()
+        return list(self.frequencyIndex.get(frqStr, ()))
+
+    def __contains__(self, dataSerieCode):
+        self.refresh()
+        return dataSerieCode in self.codeIndex
+
+    def __len__(self):
+        self.refresh()
+        return len(self.codeIndex)
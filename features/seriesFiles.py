@@ -0,0 +1,274 @@
+"""Helpers for the local data serie files (TP.*.txt).
+
+Each file is a semicolon separated csv written by pandas.DataFrame.to_csv with a leading index column:
+;Tarih;TP_01TKFE
+0;2010-1;96.92
+Tarih column format depends on the frequency of the data serie:
+    daily, business day and weekly series: 07-01-2011 (day-month-year)
+    monthly series: 2010-1 (year-month, month is not zero padded)
+    quarterly series: 2010-Q1
+    annual series: 2010
+"""
+
+import datetime
+import os
+
+import pandas as pd
+
+# FREQUENCY_STR values of EVDS. Some of the local catalog files (ex: initialSeries.txt) were saved through
+# a wrong code page, so the garbled forms of the Turkish labels are listed too.
+FREQUENCY_KEYS = {
+    "GÜNLÜK": "daily",
+    "G\u0161NL\u0161K": "daily",
+    "İŞ GÜNÜ": "business",
+    "\u02dc\x9e G\u0161N\u0161": "business",
+    "HAFTALIK": "weekly",
+    "HAFTALIK(CUMA)": "weekly",
+    "İKİ HAFTALIK": "biweekly",
+    "AYDA 2 KEZ": "biweekly",
+    "AYLIK": "monthly",
+    "ÜÇ AYLIK": "quarterly",
+    "\u0161\u20ac AYLIK": "quarterly",
+    "ALTI AYLIK": "semiannual",
+    "YILLIK": "annual",
+}
+
+# frequency parameter of the EVDS data service for each frequency key
+EVDS_FREQUENCY_CODES = {
+    "daily": 1,
+    "business": 2,
+    "weekly": 3,
+    "biweekly": 4,
+    "monthly": 5,
+    "quarterly": 6,
+    "semiannual": 7,
+    "annual": 8,
+}
+
+# aggregationTypes values accepted by the EVDS data service (also the DEFAULT_AGG_METHOD values of the catalog)
+EVDS_AGGREGATION_METHODS = ("avg", "min", "max", "first", "last", "sum")
+
+
+def get_frequency_key(frqStr):
+    """Returns the frequency key (daily, business, weekly, biweekly, monthly, quarterly, semiannual, annual)
+    of the given EVDS FREQUENCY_STR, None if the label is unknown"""
+    if not isinstance(frqStr, str):
+        return None
+    frqStr = frqStr.strip()
+    if frqStr in FREQUENCY_KEYS:
+        return FREQUENCY_KEYS[frqStr]
+    if frqStr.startswith("HAFTALIK"):
+        return "weekly"
+    return None
+
+
+def parse_tarih(tarih):
+    """Turns a Tarih value of a data serie file into a datetime.date.
+    Periods (month, quarter, year) are represented by their first day.
+
+    Parameters
+    ----------
+    tarih : str
+        ex: 07-01-2011, 2010-1, 2010-Q1, 2010
+
+    Returns
+    -------
+    date : datetime.date
+    """
+    tarih = tarih.strip()
+    if len(tarih) == 10 and tarih[2] == "-":
+        return datetime.date(int(tarih[6:10]), int(tarih[3:5]), int(tarih[0:2]))
+    if len(tarih) == 4:
+        return datetime.date(int(tarih), 1, 1)
+    year, period = tarih.split("-")
+    if period[0] == "Q":
+        return datetime.date(int(year), (int(period[1:]) - 1) * 3 + 1, 1)
+    if period[0] == "S":
+        return datetime.date(int(year), (int(period[1:]) - 1) * 6 + 1, 1)
+    return datetime.date(int(year), int(period), 1)
+
+
+def infer_frequency_key(tarih):
+    """Guesses the frequency key of a data serie from the shape of one of its Tarih values.
+    Day-month-year values can't be told apart, they are reported as daily."""
+    tarih = tarih.strip()
+    if len(tarih) == 10 and tarih[2] == "-":
+        return "daily"
+    if len(tarih) == 4:
+        return "annual"
+    period = tarih.split("-")[1]
+    if period[0] == "Q":
+        return "quarterly"
+    if period[0] == "S":
+        return "semiannual"
+    return "monthly"
+
+
+def parse_tarih_column(tarihColumn, frequencyKey):
+    """Vectorized version of parse_tarih, turns a column of Tarih strings into datetime64 values
+    with an explicit format for the given frequency key (no format inference).
+
+    Parameters
+    ----------
+    tarihColumn : pandas.Series
+        Tarih values as str
+    frequencyKey : str
+        frequency key of the data serie (see get_frequency_key)
+
+    Returns
+    -------
+    dates : pandas.Series
+        datetime64[ns] values, periods are represented by their first day
+    """
+    if frequencyKey in ("quarterly", "semiannual"):
+        monthsPerPeriod = 3 if frequencyKey == "quarterly" else 6
+        year = tarihColumn.str.slice(0, 4).astype("int64")
+        period = tarihColumn.str.slice(6).astype("int64")
+        return pd.to_datetime(
+            pd.DataFrame(
+                {"year": year, "month": (period - 1) * monthsPerPeriod + 1, "day": 1}
+            )
+        )
+    if frequencyKey == "monthly":
+        return pd.to_datetime(tarihColumn, format="%Y-%m")
+    if frequencyKey == "annual":
+        return pd.to_datetime(tarihColumn, format="%Y")
+    return pd.to_datetime(tarihColumn, format="%d-%m-%Y")
+
+
+def format_tarih_column(dates, frequencyKey):
+    """Turns datetime64 values back into the Tarih strings used in the data serie files
+    (inverse of parse_tarih_column)
+
+    Parameters
+    ----------
+    dates : pandas.Series or pandas.DatetimeIndex
+        datetime64 values
+    frequencyKey : str
+        frequency key of the data serie (see get_frequency_key)
+
+    Returns
+    -------
+    tarihColumn : pandas.Series
+        Tarih values as str
+    """
+    dates = pd.Series(dates)
+    year = dates.dt.year.astype(str)
+    if frequencyKey == "quarterly":
+        return year + "-Q" + ((dates.dt.month - 1) // 3 + 1).astype(str)
+    if frequencyKey == "semiannual":
+        return year + "-S" + ((dates.dt.month - 1) // 6 + 1).astype(str)
+    if frequencyKey == "monthly":
+        return year + "-" + dates.dt.month.astype(str)
+    if frequencyKey == "annual":
+        return year
+    return dates.dt.strftime("%d-%m-%Y")
+
+
+def parse_evds_date(evdsDate):
+    """Turns an EVDS catalog date (START_DATE, END_DATE ex: 01-10-2023) into a datetime.date"""
+    return datetime.date(int(evdsDate[6:10]), int(evdsDate[3:5]), int(evdsDate[0:2]))
+
+
+def next_period_start(tarih):
+    """Returns the first day of the period following the given Tarih value as datetime.date
+
+    Parameters
+    ----------
+    tarih : str
+        ex: 07-01-2011 -> 08-01-2011, 2010-1 -> 01-02-2010, 2010-Q4 -> 01-01-2011, 2010 -> 01-01-2011
+    """
+    tarih = tarih.strip()
+    date = parse_tarih(tarih)
+    if len(tarih) == 10 and tarih[2] == "-":
+        return date + datetime.timedelta(days=1)
+    if len(tarih) == 4:
+        return datetime.date(date.year + 1, 1, 1)
+    period = tarih.split("-")[1]
+    if period[0] == "Q":
+        months = 3
+    elif period[0] == "S":
+        months = 6
+    else:
+        months = 1
+    month = date.month - 1 + months
+    return datetime.date(date.year + month // 12, month % 12 + 1, 1)
+
+
+def get_data_file_path(code, folder=None):
+    """Returns the path of the local file of the given data serie code"""
+    if folder is None:
+        folder = os.getcwd()
+    return os.path.join(folder, code + ".txt")
+
+
+def read_header(filePath, sep=";"):
+    """Returns column labels of a data serie file (first label is the empty index label)"""
+    with open(filePath, "r", encoding="utf-8") as f:
+        return f.readline().rstrip("\r\n").split(sep)
+
+
+def read_last_row(filePath, sep=";", blockSize=4096):
+    """Returns the fields of the last line of a data serie file without reading the whole file.
+    Returns None if the file has no data rows."""
+    with open(filePath, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        position = end
+        tail = b""
+        while position > 0:
+            step = min(blockSize, position)
+            position -= step
+            f.seek(position)
+            tail = f.read(step) + tail
+            if tail.rstrip(b"\r\n").count(b"\n") >= 1:
+                break
+    lines = tail.rstrip(b"\r\n").split(b"\n")
+    if len(lines) < 2 and position == 0:
+        return None  # only the header line exists
+    return lines[-1].decode("utf-8").rstrip("\r").split(sep)
+
+
+def read_data_file(filePath, sep=";"):
+    """Reads a data serie file without the redundant index column.
+    Tarih (and YEARWEEK) are kept as str, value columns are parsed as float64.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+    """
+    columns = read_header(filePath, sep)
+    dtypes = {column: "float64" for column in columns[1:]}
+    dtypes["Tarih"] = str
+    if "YEARWEEK" in dtypes:
+        dtypes["YEARWEEK"] = str
+    return pd.read_csv(
+        filePath, sep=sep, usecols=columns[1:], dtype=dtypes, encoding="utf-8"
+    )
+
+
+def append_rows(filePath, data, sep=";"):
+    """Appends the rows of data to the end of an existing data serie file.
+    Columns are put in the order of the file header and the index continues from the last row of the file.
+
+    Parameters
+    ----------
+    filePath : str
+        path of the data serie file
+    data : pandas.DataFrame
+        rows to append, should have the same columns as the file (Tarih, YEARWEEK...)
+
+    Returns
+    -------
+    rowCount : int
+        number of appended rows
+    """
+    if len(data) == 0:
+        return 0
+    columns = read_header(filePath, sep)[1:]
+    lastRow = read_last_row(filePath, sep)
+    firstIndex = 0 if lastRow is None else int(lastRow[0]) + 1
+    data = data[columns]
+    data.index = range(firstIndex, firstIndex + len(data))
+    data.to_csv(filePath, sep=sep, header=False, mode="a")
+    return len(data)
@@ -0,0 +1,290 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from features.seriesFiles import get_data_file_path, parse_tarih_column, read_data_file
+from features.seriesPanel import SeriesPanel
+
+
+class MmapSeriesStore:
+    """Memory-mapped binary copy of the local data serie files for fast random access.
+
+    The observations of all the series are kept in two flat files in the store folder:
+        values.f64 : float64 values
+        dates.i64  : int64 dates (nanoseconds since epoch, same as datetime64[ns])
+    Each serie is one contiguous block of both files. index.json maps each data serie code to the offset and
+    length of its block, its frequency and the signature (modification time, size) of the .txt file it was
+    built from. Readers map the files once and slice them, a date range is found with a binary search on the
+    date block and returned as views of the mapped files without copying.
+
+    When the .txt file of a serie changes, its new observations are appended at the end of the files and its
+    index entry moved to them, the old block is left unused. The files are rebuilt from scratch when more
+    than half of them is unused.
+    """
+
+    def __init__(
+        self,
+        storeFolder="Series Mmap",
+        catalogFileName="initialSeries.txt",
+        dataFolder=None,
+        checkFiles=True,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        storeFolder : str
+            folder of the binary files and the index (default is 'Series Mmap')
+        catalogFileName : str
+            data serie catalog giving the codes and frequencies (default is initialSeries.txt)
+        dataFolder : str
+            folder of the TP.*.txt files (default is the current working directory)
+        checkFiles : boolean
+            when True every read checks whether the .txt file of the serie has changed and updates the store
+            (default is True)
+        """
+        self.storeFolder = storeFolder
+        self.dataFolder = dataFolder
+        self.checkFiles = checkFiles
+        self.panel = SeriesPanel(catalogFileName, dataFolder)
+        self.valuesPath = os.path.join(storeFolder, "values.f64")
+        self.datesPath = os.path.join(storeFolder, "dates.i64")
+        self.indexPath = os.path.join(storeFolder, "index.json")
+        self.lock = threading.RLock()
+        self.index = {"length": 0, "unused": 0, "series": dict()}
+        self.indexSignature = None
+        self.values = None
+        self.dates = None
+        os.makedirs(storeFolder, exist_ok=True)
+        self.load_index()
+
+    def file_signature(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load_index(self):
+        """(Re)loads index.json and maps the binary files, used also to see the updates of other processes"""
+        with self.lock:
+            signature = MmapSeriesStore.file_signature(self.indexPath)
+            if signature is None or signature == self.indexSignature:
+                return
+            with open(self.indexPath, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+            self.indexSignature = signature
+            self.open_arrays()
+
+    def save_index(self):
+        tempPath = self.indexPath + "." + str(threading.get_ident()) + ".tmp"
+        with open(tempPath, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tempPath, self.indexPath)
+        self.indexSignature = MmapSeriesStore.file_signature(self.indexPath)
+
+    def open_arrays(self):
+        length = self.index["length"]
+        if length == 0:
+            self.values = np.empty(0, dtype="float64")
+            self.dates = np.empty(0, dtype="int64")
+            return
+        self.values = np.memmap(
+            self.valuesPath, dtype="float64", mode="r", shape=(length,)
+        )
+        self.dates = np.memmap(self.datesPath, dtype="int64", mode="r", shape=(length,))
+
+    def close_arrays(self):
+        # mapped files can not be replaced on Windows
+        self.values = None
+        self.dates = None
+
+    def parse_serie(self, dataSerieCode):
+        """Returns (int64 dates, float64 values, frequency key) of a data serie file"""
+        frequencyKey = self.panel.get_frequency(dataSerieCode)
+        data = read_data_file(get_data_file_path(dataSerieCode, self.dataFolder))
+        dates = parse_tarih_column(data["Tarih"], frequencyKey).to_numpy(
+            dtype="datetime64[ns]"
+        )
+        values = data[data.columns[-1]].to_numpy(dtype="float64")
+        return dates.view("int64"), values, frequencyKey
+
+    def build(self):
+        """Rebuilds the binary files and the index from every serie of the catalog which has a local file
+
+        Returns
+        -------
+        serieCount : int
+            number of series in the store
+        """
+        with self.lock:
+            self.close_arrays()
+            series = dict()
+            offset = 0
+            valuesTempPath = self.valuesPath + ".tmp"
+            datesTempPath = self.datesPath + ".tmp"
+            with open(valuesTempPath, "wb") as valuesFile, open(
+                datesTempPath, "wb"
+            ) as datesFile:
+                for code in self.panel.get_codes():
+                    signature = MmapSeriesStore.file_signature(
+                        get_data_file_path(code, self.dataFolder)
+                    )
+                    dates, values, frequencyKey = self.parse_serie(code)
+                    values.tofile(valuesFile)
+                    dates.tofile(datesFile)
+                    series[code] = {
+                        "offset": offset,
+                        "length": len(values),
+                        "frequency": frequencyKey,
+                        "signature": signature,
+                    }
+                    offset += len(values)
+            os.replace(valuesTempPath, self.valuesPath)
+            os.replace(datesTempPath, self.datesPath)
+            self.index = {"length": offset, "unused": 0, "series": series}
+            self.save_index()
+            self.open_arrays()
+            return len(series)
+
+    def update_series(self, dataSerieCodeList):
+        """Appends the current observations of the given series at the end of the binary files and
+        points their index entries at them
+        """
+        with self.lock:
+            self.close_arrays()
+            offset = self.index["length"]
+            with open(self.valuesPath, "ab") as valuesFile, open(
+                self.datesPath, "ab"
+            ) as datesFile:
+                # drops what an interrupted update may have written after the indexed data
+                valuesFile.truncate(offset * 8)
+                datesFile.truncate(offset * 8)
+                for code in dataSerieCodeList:
+                    signature = MmapSeriesStore.file_signature(
+                        get_data_file_path(code, self.dataFolder)
+                    )
+                    dates, values, frequencyKey = self.parse_serie(code)
+                    values.tofile(valuesFile)
+                    dates.tofile(datesFile)
+                    oldEntry = self.index["series"].get(code)
+                    if oldEntry is not None:
+                        self.index["unused"] += oldEntry["length"]
+                    self.index["series"][code] = {
+                        "offset": offset,
+                        "length": len(values),
+                        "frequency": frequencyKey,
+                        "signature": signature,
+                    }
+                    offset += len(values)
+            # data is written before the index, so readers of the old index still see valid blocks
+            self.index["length"] = offset
+            self.save_index()
+            self.open_arrays()
+
+    def get_changed_codes(self):
+        """Returns the codes of the catalog whose .txt file is new or changed since it was put into the store"""
+        changedCodeList = list()
+        for code in self.panel.get_codes():
+            entry = self.index["series"].get(code)
+            signature = MmapSeriesStore.file_signature(
+                get_data_file_path(code, self.dataFolder)
+            )
+            if entry is None or entry["signature"] != signature:
+                changedCodeList.append(code)
+        return changedCodeList
+
+    def refresh(self):
+        """Brings the store up to date with the .txt files
+
+        Returns
+        -------
+        changedCount : int
+            number of series which were new or changed
+        """
+        with self.lock:
+            self.load_index()
+            changedCodeList = self.get_changed_codes()
+            if len(changedCodeList) == 0:
+                return 0
+            changedLength = sum(
+                self.index["series"].get(code, {"length": 0})["length"]
+                for code in changedCodeList
+            )
+            if (self.index["unused"] + changedLength) * 2 > self.index["length"]:
+                self.build()
+            else:
+                self.update_series(changedCodeList)
+            return len(changedCodeList)
+
+    def get_codes(self):
+        """Returns the data serie codes held in the store"""
+        return list(self.index["series"])
+
+    def __contains__(self, dataSerieCode):
+        return dataSerieCode in self.index["series"]
+
+    def get_entry(self, dataSerieCode):
+        entry = self.index["series"].get(dataSerieCode)
+        if self.checkFiles:
+            signature = MmapSeriesStore.file_signature(
+                get_data_file_path(dataSerieCode, self.dataFolder)
+            )
+            if signature is not None and (
+                entry is None or entry["signature"] != signature
+            ):
+                self.update_series([dataSerieCode])
+                entry = self.index["series"][dataSerieCode]
+        if entry is None:
+            raise Exception(dataSerieCode + " is not in the store!")
+        return entry
+
+    def get_arrays(self, dataSerieCode, startDate=None, endDate=None):
+        """Returns the dates and values of a data serie between two dates (both included).
+        The arrays are read-only views of the mapped files, nothing is copied.
+
+        Parameters
+        ----------
+        dataSerieCode : str
+            unique data serie code (ex: TP.01TKFE)
+        startDate : str or datetime
+            first date of the range (default is the first observation)
+        endDate : str or datetime
+            last date of the range (default is the last observation)
+
+        Returns
+        -------
+        dates : numpy.ndarray of datetime64[ns]
+        values : numpy.ndarray of float64
+        """
+        with self.lock:
+            entry = self.get_entry(dataSerieCode)
+            dates = self.dates
+            values = self.values
+        start = entry["offset"]
+        end = start + entry["length"]
+        serieDates = dates[start:end]
+        first = 0
+        last = entry["length"]
+        if startDate is not None:
+            first = np.searchsorted(serieDates, pd.Timestamp(startDate).value, "left")
+        if endDate is not None:
+            last = np.searchsorted(serieDates, pd.Timestamp(endDate).value, "right")
+        return (
+            serieDates[first:last].view("datetime64[ns]"),
+            values[start + first : start + last],
+        )
+
+    def read_serie(self, dataSerieCode, startDate=None, endDate=None):
+        """Returns a data serie (or a date range of it) as pandas.Series with a DatetimeIndex named Tarih,
+        backed by the mapped files
+        """
+        dates, values = self.get_arrays(dataSerieCode, startDate, endDate)
+        return pd.Series(
+            values,
+            index=pd.DatetimeIndex(dates, name="Tarih"),
+            name=dataSerieCode,
+            copy=False,
+        )
@@ -0,0 +1,288 @@
+import os
+
+import pandas as pd
+
+from features.seriesCatalog import SeriesCatalog
+from features.seriesFiles import (
+    format_tarih_column,
+    get_data_file_path,
+    get_frequency_key,
+    infer_frequency_key,
+    parse_tarih_column,
+    read_data_file,
+)
+
+# pandas offset alias of each frequency key, periods are labelled by their first day like parse_tarih_column does
+PANDAS_FREQUENCIES = {
+    "daily": "D",
+    "business": "B",
+    "weekly": "W-FRI",
+    "biweekly": "SMS",
+    "monthly": "MS",
+    "quarterly": "QS",
+    "semiannual": "6MS",
+    "annual": "YS",
+}
+
+# from the finest to the coarsest frequency
+FREQUENCY_ORDER = [
+    "daily",
+    "business",
+    "weekly",
+    "biweekly",
+    "monthly",
+    "quarterly",
+    "semiannual",
+    "annual",
+]
+
+# DEFAULT_AGG_METHOD values of EVDS -> pandas aggregation
+AGGREGATION_METHODS = {
+    "avg": "mean",
+    "last": "last",
+    "first": "first",
+    "sum": "sum",
+    "min": "min",
+    "max": "max",
+}
+
+
+def resample_serie(serie, sourceFrequency, targetFrequency, aggMethod="avg", fill=None):
+    """Changes the frequency of a datetime indexed serie.
+    Going to a coarser frequency aggregates the observations of each period with aggMethod,
+    going to a finer frequency puts the observations at the start of their period and leaves the rest empty
+    (or fills them with fill='ffill').
+
+    Parameters
+    ----------
+    serie : pandas.Series
+        float64 values with a DatetimeIndex
+    sourceFrequency : str
+        frequency key of serie (see seriesFiles.get_frequency_key)
+    targetFrequency : str
+        frequency key to convert into
+    aggMethod : str
+        EVDS aggregation method (avg, last, first, sum, min, max), default is avg
+    fill : str
+        None or 'ffill', used only when going to a finer frequency
+
+    Returns
+    -------
+    serie : pandas.Series
+    """
+    if sourceFrequency == targetFrequency:
+        return serie
+    resampler = serie.resample(PANDAS_FREQUENCIES[targetFrequency])
+    if FREQUENCY_ORDER.index(sourceFrequency) < FREQUENCY_ORDER.index(targetFrequency):
+        return resampler.agg(AGGREGATION_METHODS.get(aggMethod, "mean"))
+    if fill == "ffill":
+        return resampler.ffill()
+    return resampler.asfreq()
+
+
+def is_finer(frequencyKey, otherFrequencyKey):
+    """Returns True if frequencyKey has more periods in a year than otherFrequencyKey (ex: daily and monthly)"""
+    return FREQUENCY_ORDER.index(frequencyKey) < FREQUENCY_ORDER.index(
+        otherFrequencyKey
+    )
+
+
+def resample_data(data, sourceFrequency, targetFrequency, aggMethod="avg", fill=None):
+    """resample_serie for a DataFrame in the layout of the EVDS answers and the data serie files
+    (Tarih, optional YEARWEEK, one value column per serie).
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Tarih values as str, value columns as float
+    sourceFrequency : str
+        frequency key of data
+    targetFrequency : str
+        frequency key to convert into
+    aggMethod : str
+        EVDS aggregation method used for every value column, default is avg
+    fill : str
+        None or 'ffill', see resample_serie
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Tarih in the format of targetFrequency and the value columns, YEARWEEK is dropped
+    """
+    if sourceFrequency == targetFrequency or len(data) == 0:
+        return data
+    valueColumns = [
+        column for column in data.columns if column not in ("Tarih", "YEARWEEK")
+    ]
+    dates = pd.DatetimeIndex(parse_tarih_column(data["Tarih"], sourceFrequency))
+    resampled = pd.concat(
+        {
+            column: resample_serie(
+                pd.Series(data[column].to_numpy(dtype="float64"), index=dates),
+                sourceFrequency,
+                targetFrequency,
+                aggMethod,
+                fill,
+            )
+            for column in valueColumns
+        },
+        axis=1,
+    )
+    result = pd.DataFrame(
+        {"Tarih": format_tarih_column(resampled.index, targetFrequency).to_numpy()}
+    )
+    for column in valueColumns:
+        result[column] = resampled[column].to_numpy()
+    return result
+
+
+class SeriesPanel:
+    """Typed, lazily loaded view of the local data serie files keyed by SERIE_CODE.
+
+    The catalog (initialSeries.txt) gives FREQUENCY_STR and DEFAULT_AGG_METHOD of each serie. A serie is parsed
+    only when it is first asked for, with the explicit Tarih format of its frequency, and then kept in memory as a
+    float64 pandas.Series with a DatetimeIndex. to_frame aligns any set of series on a common date index,
+    converting their frequencies when needed.
+    """
+
+    def __init__(
+        self,
+        catalogFileName="initialSeries.txt",
+        dataFolder=None,
+        store=None,
+        frequency=None,
+        resampleCache=None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        catalogFileName : str
+            data serie catalog (default is initialSeries.txt)
+        dataFolder : str
+            folder of the TP.*.txt files (default is the current working directory)
+        store : ColumnarSeriesStore, optional
+            series are read from this store instead of the .txt files when given
+        frequency : str
+            frequency key the files of dataFolder were downloaded at (see DataGetter.initalizeDataSerie).
+            Series whose own frequency is coarser keep it. Default is None, files are at the catalog frequencies
+        resampleCache : ResampleCache, optional
+            to_frame reads converted series from this cache instead of resampling them again
+        """
+        self.catalog = SeriesCatalog.get_catalog(catalogFileName)
+        self.dataFolder = dataFolder
+        self.store = store
+        self.frequency = frequency
+        self.resampleCache = resampleCache
+        self.series = dict()
+        self.frequencies = dict()
+
+    def get_codes(self, frequencyKey=None):
+        """Returns the data serie codes of the catalog which have a local file, optionally only those of one frequency"""
+        codeList = list()
+        for code in self.catalog.get_codes():
+            if not os.path.isfile(get_data_file_path(code, self.dataFolder)):
+                continue
+            if frequencyKey is None or self.get_frequency(code) == frequencyKey:
+                codeList.append(code)
+        return codeList
+
+    def get_frequency(self, dataSerieCode):
+        """Returns the frequency key of a data serie, read from the catalog or guessed from its file"""
+        if dataSerieCode not in self.frequencies:
+            row = self.catalog.get_row(dataSerieCode)
+            frequencyKey = (
+                None if row is None else get_frequency_key(row["FREQUENCY_STR"])
+            )
+            if frequencyKey is None:
+                with open(get_data_file_path(dataSerieCode, self.dataFolder), "r") as f:
+                    f.readline()
+                    firstRow = f.readline().split(";")
+                frequencyKey = (
+                    infer_frequency_key(firstRow[1]) if len(firstRow) > 1 else "daily"
+                )
+            if self.frequency is not None and is_finer(frequencyKey, self.frequency):
+                frequencyKey = self.frequency
+            self.frequencies[dataSerieCode] = frequencyKey
+        return self.frequencies[dataSerieCode]
+
+    def get_aggregation_method(self, dataSerieCode):
+        row = self.catalog.get_row(dataSerieCode)
+        if row is None or not isinstance(row.get("DEFAULT_AGG_METHOD"), str):
+            return "avg"
+        return row["DEFAULT_AGG_METHOD"]
+
+    def get_serie(self, dataSerieCode):
+        """Returns a data serie as float64 pandas.Series with a DatetimeIndex named Tarih, parsing its file on first use"""
+        if dataSerieCode not in self.series:
+            if (
+                self.store is not None
+                and dataSerieCode in self.store.manifest["series"]
+            ):
+                serie = self.store.read_serie(dataSerieCode)
+            else:
+                data = read_data_file(
+                    get_data_file_path(dataSerieCode, self.dataFolder)
+                )
+                serie = pd.Series(
+                    data[data.columns[-1]].to_numpy(dtype="float64"),
+                    index=pd.DatetimeIndex(
+                        parse_tarih_column(
+                            data["Tarih"], self.get_frequency(dataSerieCode)
+                        ),
+                        name="Tarih",
+                    ),
+                    name=dataSerieCode,
+                )
+            self.series[dataSerieCode] = serie
+        return self.series[dataSerieCode]
+
+    def __getitem__(self, dataSerieCode):
+        return self.get_serie(dataSerieCode)
+
+    def get_series(self, dataSerieCodeList):
+        """Returns a dict of data serie code -> pandas.Series, loading only the given series"""
+        return {code: self.get_serie(code) for code in dataSerieCodeList}
+
+    def to_frame(self, dataSerieCodeList=None, frequency=None, fill=None):
+        """Aligns data series on a common date index and returns them as the columns of one DataFrame
+
+        Parameters
+        ----------
+        dataSerieCodeList : list of str
+            series to put in the frame (default is every serie with a local file)
+        frequency : str
+            frequency key of the frame (daily, business, weekly, biweekly, monthly, quarterly, semiannual, annual).
+            Each serie is converted into it with its DEFAULT_AGG_METHOD (see resample_serie), through the
+            resampleCache of the panel if it has one. Default is None, series are joined on their own dates
+        fill : str
+            None or 'ffill', see resample_serie
+
+        Returns
+        -------
+        data : pandas.DataFrame
+            one float64 column per serie, indexed by Tarih
+        """
+        if dataSerieCodeList is None:
+            dataSerieCodeList = self.get_codes()
+        columns = dict()
+        for code in dataSerieCodeList:
+            if frequency is not None and self.resampleCache is not None:
+                serie = self.resampleCache.get_serie(self, code, frequency, fill)
+            elif frequency is not None:
+                serie = resample_serie(
+                    self.get_serie(code),
+                    self.get_frequency(code),
+                    frequency,
+                    self.get_aggregation_method(code),
+                    fill,
+                )
+            else:
+                serie = self.get_serie(code)
+            columns[code] = serie
+        data = pd.concat(columns, axis=1, sort=True)
+        data.index.name = "Tarih"
+        return data
+
+    def clear(self):
+        """Drops the loaded series from memory"""
+        self.series.clear()
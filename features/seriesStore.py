@@ -0,0 +1,228 @@
+import json
+import os
+
+import pandas as pd
+
+from features.seriesCatalog import SeriesCatalog
+from features.seriesFiles import (
+    format_tarih_column,
+    get_data_file_path,
+    get_frequency_key,
+    infer_frequency_key,
+    parse_tarih_column,
+    read_data_file,
+)
+
+
+class ColumnarSeriesStore:
+    """Typed, columnar copy of the local data serie files (TP.*.txt).
+
+    Series are kept in long format partitions (one Parquet or Feather file per frequency or per data group)
+    with the columns:
+        SERIE_CODE (category), DATE (datetime64), VALUE (float64) and YEARWEEK (str, weekly series only)
+    A manifest.json file in the store folder maps each data serie code to its partition and keeps what is needed
+    to write the serie back in the old csv layout (value column label, frequency).
+    Loading every serie is a scan of a few columnar files instead of one csv parse per serie.
+    Parquet and Feather support comes from the optional pyarrow package.
+    """
+
+    def __init__(
+        self, storeFolder="Series Store", fileFormat="parquet", partitionBy="frequency"
+    ) -> None:
+        """
+        Parameters
+        ----------
+        storeFolder : str
+            folder of the partition files and the manifest (default is 'Series Store')
+        fileFormat : str
+            'parquet' or 'feather' (default is 'parquet'). Ignored if the store already exists
+        partitionBy : str
+            'frequency' or 'dataGroup' (default is 'frequency'). Ignored if the store already exists
+        """
+        if fileFormat not in ("parquet", "feather"):
+            raise Exception("fileFormat should be 'parquet' or 'feather'!")
+        if partitionBy not in ("frequency", "dataGroup"):
+            raise Exception("partitionBy should be 'frequency' or 'dataGroup'!")
+        self.storeFolder = storeFolder
+        self.manifestPath = os.path.join(storeFolder, "manifest.json")
+        if os.path.exists(self.manifestPath):
+            with open(self.manifestPath, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {
+                "fileFormat": fileFormat,
+                "partitionBy": partitionBy,
+                "series": dict(),
+            }
+        self.partitions = dict()
+        self.partitionIndexes = dict()
+
+    def get_partition_path(self, partition):
+        return os.path.join(
+            self.storeFolder, partition + "." + self.manifest["fileFormat"]
+        )
+
+    def get_codes(self):
+        """Returns the data serie codes held in the store"""
+        return list(self.manifest["series"])
+
+    def migrate_from_txt(self, catalogFileName="initialSeries.txt", dataFolder=None):
+        """One-shot migration of the local data serie files into the store.
+        Every serie in the catalog which has a local .txt file is parsed once with explicit date formats
+        and written into its partition. Existing partitions are overwritten.
+
+        Parameters
+        ----------
+        catalogFileName : str
+            data serie catalog giving FREQUENCY_STR and DATAGROUP_CODE of each serie (default is initialSeries.txt)
+        dataFolder : str
+            folder of the TP.*.txt files (default is the current working directory)
+
+        Returns
+        -------
+        serieCount : int
+            number of migrated series
+        """
+        catalog = SeriesCatalog.get_catalog(catalogFileName)
+        partitionFrames = dict()
+        series = dict()
+        for code in catalog.get_codes():
+            filePath = get_data_file_path(code, dataFolder)
+            if not os.path.isfile(filePath):
+                continue
+            row = catalog.get_row(code)
+            data = read_data_file(filePath)
+            valueColumn = data.columns[-1]
+            frequencyKey = get_frequency_key(row["FREQUENCY_STR"])
+            if frequencyKey is None:
+                if len(data) == 0:
+                    continue
+                frequencyKey = infer_frequency_key(data["Tarih"].iloc[0])
+            if self.manifest["partitionBy"] == "frequency":
+                partition = frequencyKey
+            else:
+                partition = str(row["DATAGROUP_CODE"])
+            frame = pd.DataFrame(
+                {
+                    "SERIE_CODE": code,
+                    "DATE": parse_tarih_column(data["Tarih"], frequencyKey),
+                    "VALUE": data[valueColumn].astype("float64"),
+                }
+            )
+            if "YEARWEEK" in data.columns:
+                frame["YEARWEEK"] = data["YEARWEEK"]
+            partitionFrames.setdefault(partition, list()).append(frame)
+            series[code] = {
+                "partition": partition,
+                "frequency": frequencyKey,
+                "valueColumn": valueColumn,
+                "yearWeek": "YEARWEEK" in data.columns,
+            }
+
+        os.makedirs(self.storeFolder, exist_ok=True)
+        for partition, frames in partitionFrames.items():
+            self.write_partition(partition, pd.concat(frames, ignore_index=True))
+        self.manifest["series"] = series
+        with open(self.manifestPath, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1)
+        self.partitions = dict()
+        self.partitionIndexes = dict()
+        return len(series)
+
+    def write_partition(self, partition, frame):
+        frame["SERIE_CODE"] = frame["SERIE_CODE"].astype("category")
+        if "YEARWEEK" in frame.columns:
+            frame["YEARWEEK"] = frame["YEARWEEK"].astype("string")
+        path = self.get_partition_path(partition)
+        if self.manifest["fileFormat"] == "parquet":
+            frame.to_parquet(path, index=False)
+        else:
+            frame.to_feather(path)
+
+    def load_partition(self, partition):
+        """Returns the long format DataFrame of a partition, reading it from disk only once"""
+        if partition not in self.partitions:
+            path = self.get_partition_path(partition)
+            if self.manifest["fileFormat"] == "parquet":
+                frame = pd.read_parquet(path)
+            else:
+                frame = pd.read_feather(path)
+            self.partitions[partition] = frame
+            self.partitionIndexes[partition] = frame.groupby(
+                "SERIE_CODE", observed=True, sort=False
+            ).indices
+        return self.partitions[partition]
+
+    def load_all(self):
+        """Returns every serie in the store as one long format DataFrame (SERIE_CODE, DATE, VALUE, YEARWEEK)"""
+        partitionList = sorted(
+            set(info["partition"] for info in self.manifest["series"].values())
+        )
+        frames = [self.load_partition(partition) for partition in partitionList]
+        if len(frames) == 0:
+            return pd.DataFrame(columns=["SERIE_CODE", "DATE", "VALUE"])
+        data = pd.concat(frames, ignore_index=True)
+        data["SERIE_CODE"] = data["SERIE_CODE"].astype(str).astype("category")
+        return data
+
+    def get_serie_rows(self, dataSerieCode):
+        info = self.manifest["series"].get(dataSerieCode)
+        if info is None:
+            return None, None
+        frame = self.load_partition(info["partition"])
+        positions = self.partitionIndexes[info["partition"]][dataSerieCode]
+        return frame.iloc[positions], info
+
+    def read_serie(self, dataSerieCode):
+        """Returns the observations of a data serie with a real datetime index
+
+        Parameters
+        ----------
+        dataSerieCode : str
+            unique data serie code (ex: TP.01TKFE)
+
+        Returns
+        -------
+        serie : pandas.Series or None
+            float64 values indexed by a DatetimeIndex named Tarih, None if the code is not in the store
+        """
+        rows, info = self.get_serie_rows(dataSerieCode)
+        if rows is None:
+            return None
+        return pd.Series(
+            rows["VALUE"].to_numpy(),
+            index=pd.DatetimeIndex(rows["DATE"].to_numpy(), name="Tarih"),
+            name=dataSerieCode,
+        )
+
+    def to_csv_layout(self, dataSerieCode):
+        """Returns a data serie as a DataFrame in the layout of the old TP.*.txt files
+        (Tarih as str, YEARWEEK for weekly series, value column named like TP_01TKFE), None if not in the store
+        """
+        rows, info = self.get_serie_rows(dataSerieCode)
+        if rows is None:
+            return None
+        data = pd.DataFrame(
+            {"Tarih": format_tarih_column(rows["DATE"], info["frequency"]).to_numpy()}
+        )
+        if info["yearWeek"]:
+            data["YEARWEEK"] = rows["YEARWEEK"].astype(object).to_numpy()
+        data[info["valueColumn"]] = rows["VALUE"].to_numpy()
+        return data
+
+    def write_csv(self, dataSerieCode, filePath=None):
+        """Writes a data serie back into a semicolon separated file identical to the old TP.*.txt layout
+
+        Parameters
+        ----------
+        dataSerieCode : str
+            unique data serie code (ex: TP.01TKFE)
+        filePath : str
+            target file (default is <dataSerieCode>.txt in the current working directory)
+        """
+        data = self.to_csv_layout(dataSerieCode)
+        if data is None:
+            raise Exception(dataSerieCode + " is not in the store!")
+        if filePath is None:
+            filePath = get_data_file_path(dataSerieCode)
+        data.to_csv(filePath, sep=";")
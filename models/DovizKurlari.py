@@ -4,102 +4,268 @@
 # 2016
 # 2020 - Flask ile restful-api ekleme ve sadece python3'e dondurme
 
+import datetime
+import io
+import os
+import threading
+import time
 import xml.etree.ElementTree as ET
-from urllib.request import urlopen
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 
-class DovizKurlari():
+import pandas as pd
+import requests
 
-	def __init__(self):
-		pass
+KURLAR_URL = "http://www.tcmb.gov.tr/kurlar/"
 
-	def __veri_update(self,zaman="Bugun"):
-		try :
+# XML etiketi -> kur bilgisi adi
+KUR_ETIKETLERI = {"Unit":"Unit","Isim":"isim","CurrencyName":"CurrencyName","ForexBuying":"ForexBuying","ForexSelling":"ForexSelling","BanknoteBuying":"BanknoteBuying","BanknoteSelling":"BanknoteSelling","CrossRateUSD":"CrossRateUSD"}
+SAYI_ALANLARI = ["ForexBuying","ForexSelling","BanknoteBuying","BanknoteSelling","CrossRateUSD"]
+TABLO_SUTUNLARI = ["Tarih","Kod","Unit","isim","CurrencyName"] + SAYI_ALANLARI
+
+def xml_kurlari(kaynak):
+	# Kur XML'ini agac kurmadan, akarak okur. Her Currency icin (tarih, {Kod, isim, ... : metin}) uretir.
+	# kaynak: dosya adi ya da okunabilir bir nesne (urlopen cevabi gibi)
+	tarih = None
+	kur = {}
+	for olay, eleman in ET.iterparse(kaynak, events=("start","end")):
+		if olay == "start":
+			if eleman.tag == "Tarih_Date":
+				Gun,Ay,Yil = eleman.get("Tarih").split(".")
+				tarih = datetime.date(int(Yil),int(Ay),int(Gun))
+			elif eleman.tag == "Currency":
+				kur = {"Kod": eleman.get("Kod")}
+		elif eleman.tag == "Currency":
+			yield tarih, kur
+			# okunan kurlar bellekte birikmesin
+			eleman.clear()
+		elif eleman.tag in KUR_ETIKETLERI:
+			kur[KUR_ETIKETLERI[eleman.tag]] = eleman.text
+
+def kur_tablosu(kurlar, ondalik=False):
+	# (tarih, kur bilgileri) ikililerinden tipli bir tablo (pandas.DataFrame) olusturur, her deger bir kez cevrilir:
+	# Tarih datetime64, Kod category, Unit int, kurlar float64 (ondalik=True ise decimal.Decimal), bos kurlar NaN/None
+	sayi = Decimal if ondalik else float
+	bos = None if ondalik else float("nan")
+	sutunlar = {sutun: [] for sutun in TABLO_SUTUNLARI}
+	for tarih, kur in kurlar:
+		sutunlar["Tarih"].append(tarih)
+		sutunlar["Kod"].append(kur["Kod"])
+		sutunlar["Unit"].append(int(kur.get("Unit") or 1))
+		sutunlar["isim"].append(kur.get("isim"))
+		sutunlar["CurrencyName"].append(kur.get("CurrencyName"))
+		for alan in SAYI_ALANLARI:
+			deger = kur.get(alan)
+			sutunlar[alan].append(sayi(deger) if deger else bos)
+	tablo = pd.DataFrame(sutunlar, columns=TABLO_SUTUNLARI)
+	tablo["Tarih"] = pd.to_datetime(tablo["Tarih"])
+	tablo["Kod"] = tablo["Kod"].astype("category")
+	tablo["Unit"] = tablo["Unit"].astype("int32")
+	if not ondalik:
+		tablo[SAYI_ALANLARI] = tablo[SAYI_ALANLARI].astype("float64")
+	return tablo
+
+def xml_tablosu(kaynaklar, ondalik=False):
+	# Bir ya da bir cok kur XML'inin (dosya adi ya da okunabilir nesne) butun kurlarini tek tipli tabloda toplar
+	if isinstance(kaynaklar, str) or hasattr(kaynaklar, "read"):
+		kaynaklar = [kaynaklar]
+	return kur_tablosu((satir for kaynak in kaynaklar for satir in xml_kurlari(kaynak)), ondalik)
+
+class KurArsivi():
+	# Gunluk kurlarin yerel arsivi, tarih ve doviz koduna gore: kurlar[tarih][Kod] -> kur bilgileri
+	# Indirilen her gun dosyanin sonuna eklenir. Tatil gunleri de yazilir ki bir daha sorulmasin.
+
+	ALANLAR = ["Kod","isim","CurrencyName","Unit","ForexBuying","ForexSelling","BanknoteBuying","BanknoteSelling","CrossRateUSD"]
+
+	def __init__(self, dosyaAdi="kurArsivi.txt"):
+		self.dosyaAdi = dosyaAdi
+		self.kurlar = {}
+		self.tatiller = set()
+		self.kilit = threading.Lock()
+		self.yuklendi = False
 
-			if zaman == "Bugun":
-				self.url="http://www.tcmb.gov.tr/kurlar/today.xml"
+	def yukle(self):
+		with self.kilit:
+			if self.yuklendi:
+				return
+			if os.path.exists(self.dosyaAdi):
+				with open(self.dosyaAdi, "r", encoding="utf-8") as f:
+					f.readline()
+					for satir in f:
+						alanlar = satir.rstrip("\n").split(";")
+						tarih = datetime.date.fromisoformat(alanlar[0])
+						if alanlar[1] == "TATIL":
+							self.tatiller.add(tarih)
+						else:
+							# bos alanlar XML'deki gibi None olur
+							self.kurlar.setdefault(tarih, {})[alanlar[1]] = {alan: deger or None for alan, deger in zip(KurArsivi.ALANLAR, alanlar[1:])}
+			self.yuklendi = True
+
+	def __contains__(self, tarih):
+		self.yukle()
+		return tarih in self.kurlar or tarih in self.tatiller
+
+	def getir(self, tarih, kod=None):
+		# kod verilmezse o gunun butun kurlarini, verilirse tek dovizin kurunu dondurur. Arsivde yoksa veya tatilse None
+		self.yukle()
+		gun = self.kurlar.get(tarih)
+		if gun is None or kod is None:
+			return gun
+		return gun.get(kod)
+
+	def ekle(self, tarih, son):
+		# son None ise tarih tatil gunu olarak yazilir
+		self.yukle()
+		if son is None:
+			satirlar = [tarih.isoformat() + ";TATIL" + ";" * (len(KurArsivi.ALANLAR) - 1)]
+		else:
+			satirlar = [";".join([tarih.isoformat()] + ["" if kur[alan] is None else str(kur[alan]) for alan in KurArsivi.ALANLAR]) for kur in son.values()]
+		with self.kilit:
+			yeniDosya = not os.path.exists(self.dosyaAdi)
+			with open(self.dosyaAdi, "a", encoding="utf-8") as f:
+				if yeniDosya:
+					f.write(";".join(["Tarih"] + KurArsivi.ALANLAR) + "\n")
+				f.write("\n".join(satirlar) + "\n")
+			if son is None:
+				self.tatiller.add(tarih)
 			else:
-				self.url=zaman
-
-			tree = ET.parse(urlopen(self.url))
-			
-			root = tree.getroot()
-			self.son={}
-			self.Kur_Liste=[]
-			i = 0 
-			for kurlars in root.findall('Currency'):
-				Kod= kurlars.get('Kod')
-				Unit = kurlars.find('Unit').text #    <Unit>1</Unit>
-				isim = kurlars.find('Isim').text #    <Isim>ABD DOLARI</Isim>
-				CurrencyName = kurlars.find('CurrencyName').text #    <CurrencyName>US DOLLAR</CurrencyName>
-				ForexBuying = kurlars.find('ForexBuying').text #    <ForexBuying>2.9587</ForexBuying>
-				ForexSelling = kurlars.find('ForexSelling').text #    <ForexSelling>2.964</ForexSelling>
-				BanknoteBuying = kurlars.find('BanknoteBuying').text #    <BanknoteBuying>2.9566</BanknoteBuying>
-				BanknoteSelling = kurlars.find('BanknoteSelling').text #    <BanknoteSelling>2.9684</BanknoteSelling>
-				CrossRateUSD = kurlars.find('CrossRateUSD').text #    <CrossRateUSD>1</CrossRateUSD>
-				self.Kur_Liste.append(Kod)
-				#self.son [Kod] = [Kod,isim,CurrencyName,Unit,ForexBuying,ForexSelling,BanknoteBuying,BanknoteSelling,CrossRateUSD]
-				self.son [Kod] = { 
-            "Kod":Kod,
-            "isim":isim,
-            "CurrencyName":CurrencyName,
-            "Unit":Unit,
-            "ForexBuying":ForexBuying,
-            "ForexSelling":ForexSelling,
-            "BanknoteBuying":BanknoteBuying,
-            "BanknoteSelling":BanknoteSelling,
-            "CrossRateUSD":CrossRateUSD
-            }
-          
-			return self.son
-
-		except :
+				self.kurlar[tarih] = son
 
-			return "HATA"
 
+class DovizKurlari():
+	# Bir nesne ayni anda bir cok is parcacigindan kullanilabilir: sorgular sonuclarini dondurur, nesnenin uzerine yazmaz.
+	# Istekler tek bir baglanti havuzundan (requests.Session) gider. today.xml bugunSuresi saniye boyunca bellekte tutulur,
+	# bu surede ayni anda gelen butun sorgulara tek bir indirme cevap verir.
+
+	def __init__(self, arsivDosyasi="kurArsivi.txt", bugunSuresi=60, havuzBoyutu=16, zamanAsimi=(10, 30)):
+		self.arsiv = KurArsivi(arsivDosyasi)
+		self.bugunSuresi = bugunSuresi
+		self.zamanAsimi = zamanAsimi
+		self.oturum = requests.Session()
+		adaptor = requests.adapters.HTTPAdapter(pool_connections=havuzBoyutu, pool_maxsize=havuzBoyutu)
+		self.oturum.mount("http://", adaptor)
+		self.oturum.mount("https://", adaptor)
+		self.bugunKilit = threading.Lock()
+		self.bugun = None # (indirilme zamani, kurlar)
+		self.gunKilit = threading.Lock()
+		self.gunKilitleri = {} # tarih -> o gunu indiren sorgunun kilidi
 
-	def DegerSor (self,*sor):
-		self.__veri_update()
+	def __xml_oku(self, url):
+		# self uzerinde hicbir seyi degistirmez. HTTP hatalari requests.HTTPError olarak firlatilir
+		cevap = self.oturum.get(url, timeout=self.zamanAsimi)
+		cevap.raise_for_status()
+		son={}
+		for tarih, kur in xml_kurlari(io.BytesIO(cevap.content)):
+			son[kur["Kod"]] = {alan: kur.get(alan) for alan in KurArsivi.ALANLAR}
+		return son
+
+	def __bugun_getir(self):
+		# kilidi bekleyen sorgular, kilidi alan sorgunun indirdigi kurlari kullanir
+		with self.bugunKilit:
+			if self.bugun is None or time.monotonic() - self.bugun[0] > self.bugunSuresi:
+				self.bugun = (time.monotonic(), self.__xml_oku(KURLAR_URL+"today.xml"))
+			return self.bugun[1]
+
+	def __sonuc(self,son,sor,tatil):
+		if son is None:
+			return tatil
 		if not(any(sor)):
-				return self.son
-		else:
-				return self.son.get(sor[0]).get(sor[1])
+			return son
+		return son.get(sor[0]).get(sor[1])
+
+	def DegerSor (self,*sor):
+		try :
+			son = self.__bugun_getir()
+		except (requests.RequestException, ET.ParseError):
+			return "HATA"
+		return self.__sonuc(son,sor,None)
+
+	def __gun_getir(self,tarih):
+		# once yerel arsive bakar, gun arsivde yoksa indirip arsive ekler.
+		# Tatil gunlerinde None doner, indirme hatalari yukari firlatilir
+		if tarih in self.arsiv:
+			return self.arsiv.getir(tarih)
+		# ayni gunu ayni anda soranlardan sadece biri indirir
+		with self.gunKilit:
+			kilit = self.gunKilitleri.setdefault(tarih, threading.Lock())
+		try :
+			with kilit:
+				if tarih in self.arsiv:
+					return self.arsiv.getir(tarih)
+				try :
+					son = self.__xml_oku(self.__Url_Olustur(tarih.day,tarih.month,tarih.year))
+				except requests.HTTPError as hata:
+					# bugunun ve ilerideki gunlerin kurlari henuz yayinlanmamis olabilir, tatil sayilmaz
+					if hata.response.status_code != 404 or tarih >= datetime.date.today():
+						raise
+					son = None
+				self.arsiv.ekle(tarih,son)
+		finally :
+			# gunun kilidi erken donuste ve hatada da birakilir, sozluk buyumez
+			with self.gunKilit:
+				self.gunKilitleri.pop(tarih, None)
+		return son
+
+	def Arsiv_aralik (self,Baslangic,Bitis,*kodlar,isciSayisi=8):
+		# Baslangic ve Bitis (dahil) arasindaki her is gununun kurlarini ayni anda isciSayisi kadar istekle indirir.
+		# Hafta sonlari hic sorulmaz, arsivdeki gunler ve tatiller tekrar indirilmez.
+		# Tarihler "gg.aa.yyyy" ya da datetime.date olabilir. {tarih: {Kod: kur bilgileri}} doner, tatiller yer almaz.
+		# kodlar verilirse sadece o dovizler doner (ornek: Arsiv_aralik("01.01.2020","31.12.2020","USD","EUR"))
+		tarihler = []
+		for tarih in (Baslangic,Bitis):
+			if isinstance(tarih,str):
+				Gun,Ay,Yil = tarih.split(".")
+				tarih = datetime.date(int(Yil),int(Ay),int(Gun))
+			tarihler.append(tarih)
+		gunler = []
+		tarih = tarihler[0]
+		while tarih <= tarihler[1]:
+			if tarih.weekday() < 5:
+				gunler.append(tarih)
+			tarih += datetime.timedelta(days=1)
+
+		sonuc = {}
+		with ThreadPoolExecutor(max_workers=isciSayisi) as havuz:
+			isler = {tarih: havuz.submit(self.__gun_getir,tarih) for tarih in gunler}
+			for tarih, gorev in isler.items():
+				try :
+					son = gorev.result()
+				except Exception as hata:
+					print(tarih.strftime("%d.%m.%Y") + " indirilemedi: " + str(hata))
+					continue
+				if son is None:
+					continue
+				if any(kodlar):
+					son = {kod: son[kod] for kod in kodlar if kod in son}
+				sonuc[tarih] = son
+		return sonuc
+
+	def Tablo (self,Baslangic,Bitis=None,*kodlar,ondalik=False):
+		# Baslangic ile Bitis (verilmezse sadece Baslangic) arasindaki gunlerin kurlarini tipli bir tablo olarak dondurur
+		# (bkz. kur_tablosu). Gunler arsivden okunur, arsivde olmayanlar indirilir.
+		if Bitis is None:
+			Bitis = Baslangic
+		gunler = self.Arsiv_aralik(Baslangic,Bitis,*kodlar)
+		return kur_tablosu(((tarih, kur) for tarih, son in gunler.items() for kur in son.values()), ondalik)
 
 	def Arsiv (self,Gun,Ay,Yil,*sor):
-		a=self.__veri_update(self.__Url_Yap(Gun,Ay,Yil))
-		if not(any(sor)):
-			if a == "HATA":
-				return {"Hata":"TATIL GUNU"}
-			return self.son
-		else :
-			if a == "HATA":
-				return "Tatil Gunu"
-			else:
-				return self.son.get(sor[0]).get(sor[1])
+		son = self.__gun_getir(datetime.date(int(Yil),int(Ay),int(Gun)))
+		return self.__sonuc(son,sor,"Tatil Gunu" if any(sor) else {"Hata":"TATIL GUNU"})
 
 	def Arsiv_tarih (self,Tarih="",*sor):
 		takvim = Tarih.split(".")
 		Gun = takvim[0]
 		Ay = takvim[1]
 		Yil = takvim[2]
-		a=self.__veri_update(self.__Url_Yap(Gun,Ay,Yil))
-		if not(any(sor)):
-			if a == "HATA":
-				return {"Hata":"TATIL GUNU"}
-			return self.son
-		else :
-			if a == "HATA":
-				return "Tatil Gunu"
-			else:
-				return self.son.get(sor[0]).get(sor[1])
+		return self.Arsiv(Gun,Ay,Yil,*sor)
 
-	def __Url_Yap (self,Gun,Ay,Yil):
+	def __Url_Olustur (self,Gun,Ay,Yil):
 		if len (str(Gun)) == 1 :
 			Gun="0"+str(Gun)
 		if len (str(Ay)) == 1 :
 			Ay="0"+str(Ay)
 
-		self.url = ("http://www.tcmb.gov.tr/kurlar/"+str(Yil)+str(Ay)+"/"+str(Gun)+str(Ay)+str(Yil)+".xml")
-		return self.url
+		return (KURLAR_URL+str(Yil)+str(Ay)+"/"+str(Gun)+str(Ay)+str(Yil)+".xml")
 
 #Ornek Kullanım için
 #from DovizKurlari import DovizKurlari
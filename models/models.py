@@ -1,5 +1,6 @@
 class Instrument:
-    
+    __slots__ = ("name", "shortForm", "symbol")
+
     def __init__(self, name,  shortForm, symbol=None):
         """All instrument types (fund, currency etc.) will inherited from this class
         
@@ -21,7 +22,8 @@ class Instrument:
         self.symbol = symbol
     
 class Fund(Instrument):
-    
+    __slots__ = ("price", "category", "subCategory", "organisation", "id", "priceHistory")
+
     fundId = 0 #id of the fund will be incremented by 1 on each fund creation
     fundList = list() # each created fund will be appended to the fundList()
 
@@ -55,6 +57,11 @@ class Fund(Instrument):
         self.priceHistory = dict()
         Fund.fundList.append(self)
 
+    def clear_fundList():
+        """Releases every Fund kept by Fund.fundList and restarts the fund ids"""
+        Fund.fundList.clear()
+        Fund.fundId = 0
+
     def __str__(self):
         return f'Fund ID: {self.id} Name: {self.name} Fund Category: {self.category} Managing Organisation: {self.organisation} Current Price: {self.currentPrice/100} Symbol: {self.symbol}'
     
@@ -74,7 +81,9 @@ class Fund(Instrument):
         YZG = Fund("Yapı Kredi Portföy Gümüş Fon Sepeti Fonu", 320, "YZG", "Fon Sepeti Fonları", "", "Yapı Kredi Portföy")
 
 class Currency(Instrument):
-    id = 0
+    __slots__ = ("buyingPrice", "sellingPrice", "code", "valueHistory", "id")
+
+    currencyId = 0 #id of the currency will be incremented by 1 on each currency creation
     currencyList = list()
 
     def __init__(self, name, shortForm, buyingPrice, sellingPrice, symbol = None):
@@ -90,16 +99,49 @@ class Currency(Instrument):
         symbol : str, optional
             symbol of the Currency
         """
-        super().__init__(name, shortForm, symbol = "",  buyingPrice = None, sellingPrice = None)
-        Currency.id += 1
+        super().__init__(name, shortForm, symbol)
+        Currency.currencyId += 1
         self.name = name
         self.buyingPrice = buyingPrice
         self.sellingPrice = sellingPrice
         self.code = shortForm
         self.symbol = symbol
         self.valueHistory = dict()
-        self.id = Currency.id
+        self.id = Currency.currencyId
         Currency.currencyList.append(self)
+    def clear_currencyList():
+        """Releases every Currency kept by Currency.currencyList and restarts the currency ids"""
+        Currency.currencyList.clear()
+        Currency.currencyId = 0
+
+    def loadRateTable(rateTable, valueColumn="ForexBuying"):
+        """Creates or updates Currency objects from a typed rate table of DovizKurlari (see DovizKurlari.kur_tablosu)
+        Parameters
+        ----------
+        rateTable : pandas.DataFrame
+            rate table with Tarih, Kod, Unit, CurrencyName and rate columns, for one or many dates
+        valueColumn : str, optional
+            rate column written into valueHistory as the value of one unit of the currency (default is ForexBuying)
+
+        Returns
+        -------
+        currencies : list
+            created or updated Currency objects
+        """
+        currencies = {currency.code: currency for currency in Currency.currencyList}
+        updatedCurrencies = list()
+        for code, rows in rateTable.sort_values("Tarih").groupby("Kod", observed=True, sort=False):
+            latest = rows.iloc[-1]
+            currency = currencies.get(code)
+            if currency is None:
+                currency = Currency(latest["CurrencyName"], code, latest["BanknoteBuying"], latest["BanknoteSelling"])
+            else:
+                currency.buyingPrice = latest["BanknoteBuying"]
+                currency.sellingPrice = latest["BanknoteSelling"]
+            currency.valueHistory.update(zip(rows["Tarih"].dt.date, rows[valueColumn] / rows["Unit"]))
+            updatedCurrencies.append(currency)
+        return updatedCurrencies
+
     def initializeCurrencyTypes():
         pass
     
@@ -133,5 +175,23 @@ class Portfolio:
         self.valueHistory = list()
         self.currentValue = 0
         self.valueHistory = dict()
+        self.holdings = dict() # shortForm of the instrument -> piece held
+
+    def add_instrument(self, instrument, piece):
+        """Adds pieces of an instrument into the portfolio
+        Parameters
+        ----------
+        instrument : Instrument
+            Fund, Currency etc.
+        piece : float
+            number of pieces bought
+        """
+        if instrument not in self.instrumentList:
+            self.instrumentList.append(instrument)
+        self.holdings[instrument.shortForm] = self.holdings.get(instrument.shortForm, 0) + piece
+
+    def valuate(self, engine, currencyShortForm=None):
+        """Returns the daily value, return and drawdown of the portfolio computed by a ValuationEngine"""
+        return engine.valuate([self], currencyShortForm)
 
 
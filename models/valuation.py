@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+
+class ValuationEngine:
+    """Vectorized valuation of portfolios.
+
+    Price histories of the instruments (Fund.priceHistory, Currency.valueHistory or any date indexed serie)
+    are aligned once on a common date index and kept as one (dates x instruments) float64 matrix. Holdings
+    of the portfolios are one (portfolios x instruments) matrix, so the daily values of every portfolio are
+    a single matrix product and returns, drawdowns and currency conversions are whole-array operations.
+    A price is carried forward over the days it is not quoted, an instrument is worth nothing before its first price.
+    """
+
+    def __init__(self, startDate=None, endDate=None, frequency="D"):
+        """
+        Parameters
+        ----------
+        startDate : str or datetime, optional
+            first valuation date (default is the first date of the price histories)
+        endDate : str or datetime, optional
+            last valuation date (default is the last date of the price histories)
+        frequency : str
+            pandas frequency of the valuation dates (default is D, every day)
+        """
+        self.startDate = startDate
+        self.endDate = endDate
+        self.frequency = frequency
+        self.histories = dict()  # shortForm -> pandas.Series
+        self.dates = None
+        self.prices = None
+        self.columnIndex = dict()  # shortForm -> column of self.prices
+
+    def add_price_history(self, shortForm, history):
+        """Adds the price history of an instrument
+
+        Parameters
+        ----------
+        shortForm : str
+            short form of the instrument, holdings of the portfolios refer to it (ex: AFA, USD)
+        history : dict or pandas.Series
+            date -> price
+        """
+        if isinstance(history, dict):
+            history = pd.Series(history, dtype="float64")
+        serie = history.astype("float64")
+        serie.index = pd.to_datetime(serie.index)
+        self.histories[shortForm] = serie.sort_index()
+        self.prices = None
+
+    def add_instruments(self, instrumentList):
+        """Adds the price histories of Fund (priceHistory) and Currency (valueHistory) objects"""
+        for instrument in instrumentList:
+            history = getattr(instrument, "priceHistory", None)
+            if history is None:
+                history = instrument.valueHistory
+            self.add_price_history(instrument.shortForm, history)
+
+    def build(self):
+        """Aligns the price histories into the price matrix, done once before the first valuation"""
+        if len(self.histories) == 0:
+            raise Exception("There is no price history to valuate with!")
+        data = pd.concat(self.histories, axis=1, sort=True)
+        data = data[~data.index.duplicated(keep="last")]
+        startDate = data.index[0] if self.startDate is None else self.startDate
+        endDate = data.index[-1] if self.endDate is None else self.endDate
+        self.dates = pd.date_range(startDate, endDate, freq=self.frequency, name="Tarih")
+        # prices quoted before the start date must still be carried into it
+        data = data.reindex(data.index.union(self.dates)).ffill().reindex(self.dates)
+        self.prices = data.to_numpy(dtype="float64")
+        self.columnIndex = {shortForm: i for i, shortForm in enumerate(data.columns)}
+
+    def get_price_matrix(self):
+        if self.prices is None:
+            self.build()
+        return self.prices
+
+    def get_holdings_matrix(self, portfolioList):
+        """Returns the (portfolios x instruments) matrix of the pieces held by each portfolio"""
+        self.get_price_matrix()
+        holdings = np.zeros((len(portfolioList), len(self.columnIndex)), dtype="float64")
+        for row, portfolio in enumerate(portfolioList):
+            for shortForm, piece in portfolio.holdings.items():
+                column = self.columnIndex.get(shortForm)
+                if column is None:
+                    raise Exception("There is no price history for " + shortForm + "!")
+                holdings[row, column] = piece
+        return holdings
+
+    def get_values(self, portfolioList):
+        """Returns the (dates x portfolios) array of the daily portfolio values"""
+        prices = np.nan_to_num(self.get_price_matrix(), nan=0.0)
+        return prices @ self.get_holdings_matrix(portfolioList).T
+
+    def get_returns(values):
+        """Returns the daily simple returns of a (dates x portfolios) value array, first row is NaN"""
+        returns = np.full(values.shape, np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns[1:] = values[1:] / values[:-1] - 1
+        returns[1:][values[:-1] == 0] = np.nan
+        return returns
+
+    def get_drawdowns(values):
+        """Returns the drawdown (distance to the highest value so far, 0 or negative) of a (dates x portfolios) value array"""
+        peaks = np.maximum.accumulate(values, axis=0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drawdowns = values / peaks - 1
+        drawdowns[peaks == 0] = 0.0
+        return drawdowns
+
+    def convert(self, values, currencyShortForm):
+        """Converts a (dates x portfolios) value array into a currency, using the price history of the currency
+        (value of one unit of it) added with add_price_history or add_instruments
+        """
+        self.get_price_matrix()
+        column = self.columnIndex.get(currencyShortForm)
+        if column is None:
+            raise Exception("There is no price history for " + currencyShortForm + "!")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return values / self.prices[:, column][:, None]
+
+    def valuate(self, portfolioList, currencyShortForm=None):
+        """Valuates the portfolios over every valuation date
+
+        Parameters
+        ----------
+        portfolioList : list of Portfolio
+            portfolios with holdings (shortForm -> piece)
+        currencyShortForm : str, optional
+            currency to convert the values into (ex: USD)
+
+        Returns
+        -------
+        results : dict of pandas.DataFrame
+            'value', 'return' and 'drawdown' (plus 'convertedValue' if a currency is given),
+            each with one column per portfolio name, indexed by the valuation dates
+        """
+        values = self.get_values(portfolioList)
+        arrays = {
+            "value": values,
+            "return": ValuationEngine.get_returns(values),
+            "drawdown": ValuationEngine.get_drawdowns(values),
+        }
+        if currencyShortForm is not None:
+            arrays["convertedValue"] = self.convert(values, currencyShortForm)
+        columns = [portfolio.name for portfolio in portfolioList]
+        return {name: pd.DataFrame(array, index=self.dates, columns=columns) for name, array in arrays.items()}
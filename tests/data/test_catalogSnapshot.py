@@ -0,0 +1,203 @@
+import pandas as pd
+import pytest
+
+from dataGetter import DataGetter
+from features.catalogSnapshot import CatalogSnapshot
+from features.Tcmb import DataSerie, Tcmb
+
+COLUMNS = ["SERIE_CODE", "FREQUENCY_STR", "START_DATE", "END_DATE"]
+
+
+def serie_rows(*rows):
+    return pd.DataFrame(list(rows), columns=COLUMNS)
+
+
+def snapshot_of(data, tableName="Data Series"):
+    snapshot = CatalogSnapshot()
+    snapshot.add_rows(tableName, data)
+    return snapshot
+
+
+PREVIOUS = serie_rows(
+    ["TP.A", "AYLIK", "01-01-2010", "01-01-2024"],
+    ["TP.B", "AYLIK", "01-01-2010", "01-01-2024"],
+    ["TP.C", "YILLIK", "01-01-2000", "01-01-2023"],
+)
+CURRENT = serie_rows(
+    ["TP.A", "AYLIK", "01-01-2010", "01-02-2024"],
+    ["TP.B", "AYLIK", "01-01-2005", "01-02-2024"],
+    ["TP.D", "AYLIK", "01-01-2020", "01-02-2024"],
+)
+
+
+def test_compare_added_removed_and_changed_rows():
+    diff = snapshot_of(CURRENT).compare(snapshot_of(PREVIOUS))
+
+    assert diff.added == {"Data Series": ["TP.D"]}
+    assert diff.removed == {"Data Series": ["TP.C"]}
+    assert diff.changed == {
+        "Data Series": {"TP.A": ["END_DATE"], "TP.B": ["START_DATE", "END_DATE"]}
+    }
+    assert diff.get_changed_tables() == ["Data Series"]
+    assert diff.get_codes_to_download() == ["TP.D", "TP.A", "TP.B"]
+    assert diff.get_codes_with_changed_columns(["START_DATE"]) == ["TP.B"]
+
+
+def test_compare_ignores_reordered_columns_and_rows():
+    reordered = PREVIOUS[list(reversed(COLUMNS))].iloc[::-1]
+    diff = snapshot_of(reordered).compare(snapshot_of(PREVIOUS))
+
+    assert diff.changed == {"Data Series": dict()}
+    assert diff.get_changed_tables() == list()
+
+
+def test_compare_reports_a_new_column():
+    current = PREVIOUS.assign(DEFAULT_AGG_METHOD="avg")
+    diff = snapshot_of(current).compare(snapshot_of(PREVIOUS))
+
+    assert diff.changed["Data Series"] == {
+        code: ["DEFAULT_AGG_METHOD"] for code in ["TP.A", "TP.B", "TP.C"]
+    }
+
+
+def test_compare_with_an_empty_snapshot_adds_every_row():
+    diff = snapshot_of(CURRENT).compare(CatalogSnapshot())
+
+    assert diff.added == {"Data Series": ["TP.A", "TP.B", "TP.D"]}
+
+
+def test_chunks_give_the_same_snapshot_and_first_key_wins():
+    data = pd.concat([CURRENT, CURRENT.assign(END_DATE="01-01-1900")])
+    snapshot = CatalogSnapshot()
+    for i in range(0, len(data), 2):
+        snapshot.add_rows("Data Series", data.iloc[i : i + 2])
+
+    assert snapshot.tables == snapshot_of(CURRENT).tables
+    assert snapshot.rowCounts == {"Data Series": 6}
+
+
+def test_save_and_load(tmp_path):
+    fileName = str(tmp_path / "snapshot.json")
+    snapshot = snapshot_of(CURRENT)
+    snapshot.save(fileName)
+
+    assert CatalogSnapshot.load(fileName).tables == snapshot.tables
+    assert CatalogSnapshot.load(str(tmp_path / "missing.json")).tables == dict()
+
+
+def test_commit_keeps_pending_rows_for_the_next_comparison(tmp_path):
+    fileName = str(tmp_path / "snapshot.json")
+    snapshot_of(PREVIOUS).save(fileName)
+    current = snapshot_of(CURRENT)
+    diff = current.compare(CatalogSnapshot.load(fileName))
+    diff.snapshotFileName = fileName
+
+    diff.commit(pendingKeys=["TP.B", "TP.D"])
+
+    saved = CatalogSnapshot.load(fileName)
+    rows = saved.tables["Data Series"]["rows"]
+    # a pending changed row keeps its previous fingerprints, a pending added row is left out
+    assert rows["TP.B"] == snapshot_of(PREVIOUS).tables["Data Series"]["rows"]["TP.B"]
+    assert "TP.D" not in rows
+    assert rows["TP.A"] == current.tables["Data Series"]["rows"]["TP.A"]
+    nextDiff = current.compare(saved)
+    assert nextDiff.added == {"Data Series": ["TP.D"]}
+    assert nextDiff.changed == {"Data Series": {"TP.B": ["START_DATE", "END_DATE"]}}
+    # the snapshot of the diff itself is not modified
+    assert "TP.D" in current.tables["Data Series"]["rows"]
+
+
+def test_commit_without_pending_rows(tmp_path):
+    fileName = str(tmp_path / "snapshot.json")
+    current = snapshot_of(CURRENT)
+    diff = current.compare(snapshot_of(PREVIOUS))
+
+    diff.commit(fileName=fileName)
+
+    assert current.compare(CatalogSnapshot.load(fileName)).get_changed_tables() == []
+
+
+@pytest.fixture
+def localSeries(tmp_path, monkeypatch):
+    """Local files of TP.A, TP.B and TP.C in tmp_path, TP.D is listed in initialSeries.txt without a file"""
+    monkeypatch.chdir(tmp_path)
+    CURRENT.assign(
+        DATAGROUP_CODE="bie_test",
+        SERIE_NAME="name",
+        SERIE_NAME_ENG="name",
+        DEFAULT_AGG_METHOD="avg",
+    ).to_csv(tmp_path / "Series.txt", sep=";", index=False)
+    pd.DataFrame({"SERIE_CODE": ["TP.A", "TP.B", "TP.C", "TP.D"]}).to_csv(
+        tmp_path / "initialSeries.txt", sep=";", index=False
+    )
+    for code in ["TP.A", "TP.B", "TP.C"]:
+        (tmp_path / (code + ".txt")).write_text(
+            ";Tarih;{0}\n0;2024-1;1.0\n".format(code.replace(".", "_"))
+        )
+    return tmp_path
+
+
+def run_updateChangedSeries(tmp_path, monkeypatch, answers):
+    fileName = str(tmp_path / "snapshot.json")
+    snapshot_of(PREVIOUS).save(fileName)
+    diff = snapshot_of(CURRENT).compare(CatalogSnapshot.load(fileName))
+    diff.snapshotFileName = fileName
+    calls = list()
+
+    def fetch(apiKey, code, **kwargs):
+        calls.append(code)
+        answer = answers[code]
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    monkeypatch.setattr(DataSerie, "get_data_from_evds_with_dataSerie_code", fetch)
+    reports = DataGetter.updateChangedSeries(
+        Tcmb("key"), diff, requestsPerSecond=0, maxRetries=0, backoffFactor=0
+    )
+    return reports, calls, CatalogSnapshot.load(fileName)
+
+
+def test_updateChangedSeries_replaces_a_revised_serie(localSeries, monkeypatch):
+    answers = {
+        "TP.A": pd.DataFrame({"Tarih": ["2024-2"], "TP_A": [2.0]}),
+        "TP.B": pd.DataFrame({"Tarih": ["2005-1", "2005-2"], "TP_B": [5.0, 6.0]}),
+        "TP.D": pd.DataFrame({"Tarih": ["2020-1"], "TP_D": [7.0]}),
+    }
+
+    reports, calls, saved = run_updateChangedSeries(localSeries, monkeypatch, answers)
+
+    initializeReport, revisedReport, updateReport = reports
+    assert initializeReport.downloaded == ["TP.D"]
+    assert revisedReport.downloaded == ["TP.B"]
+    assert updateReport.downloaded == ["TP.A"]
+    assert sorted(calls) == ["TP.A", "TP.B", "TP.D"]
+    assert (localSeries / "TP.B.txt").read_text().splitlines()[1:] == [
+        "0;2005-1;5.0",
+        "1;2005-2;6.0",
+    ]
+    assert not (localSeries / "TP.B.txt.tmp").exists()
+    assert snapshot_of(CURRENT).compare(saved).get_changed_tables() == []
+
+
+def test_updateChangedSeries_keeps_files_and_pending_rows_of_failures(
+    localSeries, monkeypatch
+):
+    content = (localSeries / "TP.B.txt").read_text()
+    answers = {
+        "TP.A": ConnectionError("EVDS is down"),
+        "TP.B": pd.DataFrame(),
+        "TP.D": pd.DataFrame({"Tarih": ["2020-1"], "TP_D": [7.0]}),
+    }
+
+    reports, calls, saved = run_updateChangedSeries(localSeries, monkeypatch, answers)
+
+    initializeReport, revisedReport, updateReport = reports
+    assert revisedReport.empty == ["TP.B"]
+    assert list(updateReport.failed) == ["TP.A"]
+    assert (localSeries / "TP.B.txt").read_text() == content
+    nextDiff = snapshot_of(CURRENT).compare(saved)
+    assert nextDiff.added == {"Data Series": list()}
+    assert nextDiff.changed == {
+        "Data Series": {"TP.A": ["END_DATE"], "TP.B": ["START_DATE", "END_DATE"]}
+    }
@@ -0,0 +1,208 @@
+import pandas as pd
+import pytest
+
+from dataGetter import DataGetter
+from features.seriesFiles import read_data_file, read_last_row
+from features.Tcmb import DataSerie, Tcmb
+
+CATALOG_COLUMNS = [
+    "SERIE_CODE",
+    "DATAGROUP_CODE",
+    "SERIE_NAME",
+    "SERIE_NAME_ENG",
+    "FREQUENCY_STR",
+    "DEFAULT_AGG_METHOD",
+    "START_DATE",
+    "END_DATE",
+]
+
+
+def write_catalog(tmp_path, rows, fileName="Series.txt"):
+    """Writes a data serie catalog and an initialSeries.txt of (code, FREQUENCY_STR, END_DATE) rows"""
+    pd.DataFrame(
+        [
+            [code, "bie_test", code, code, frequency, "avg", "01-01-2010", endDate]
+            for code, frequency, endDate in rows
+        ],
+        columns=CATALOG_COLUMNS,
+    ).to_csv(tmp_path / fileName, sep=";", index=False)
+    pd.DataFrame({"SERIE_CODE": [row[0] for row in rows]}).to_csv(
+        tmp_path / "initialSeries.txt", sep=";", index=False
+    )
+
+
+@pytest.fixture
+def evds(monkeypatch, tmp_path):
+    """Runs in tmp_path and answers the EVDS requests from evds.answers, the requests are kept in evds.calls"""
+    monkeypatch.chdir(tmp_path)
+
+    class FakeEvds:
+        answers = dict()
+        calls = list()
+
+    def fetch(apiKey, code, **kwargs):
+        FakeEvds.calls.append((code, kwargs))
+        return FakeEvds.answers[code]
+
+    monkeypatch.setattr(DataSerie, "get_data_from_evds_with_dataSerie_code", fetch)
+    return FakeEvds
+
+
+def update(catalogFileName="Series.txt"):
+    return DataGetter.updateDataSerie(
+        Tcmb("key"), catalogFileName, requestsPerSecond=0, backoffFactor=0
+    )
+
+
+def test_updateDataSerie_appends_only_new_periods(tmp_path, evds):
+    path = tmp_path / "TP.01TKFE.txt"
+    path.write_text(";Tarih;TP_01TKFE\n0;2010-1;96.92\n1;2010-2;97.22\n")
+    write_catalog(tmp_path, [("TP.01TKFE", "AYLIK", "01-04-2010")], "catalog.txt")
+    # EVDS answers with the last local period again and its own column order
+    evds.answers["TP.01TKFE"] = pd.DataFrame(
+        {"TP_01TKFE": [97.22, 97.5, 98.0], "Tarih": ["2010-2", "2010-3", "2010-4"]}
+    )
+
+    report = update("catalog.txt")
+
+    assert report.downloaded == ["TP.01TKFE"]
+    assert evds.calls == [
+        (
+            "TP.01TKFE",
+            {
+                "startDay": "01",
+                "startMonth": "03",
+                "startYear": "2010",
+                "fileName": "catalog.txt",
+            },
+        )
+    ]
+    data = read_data_file(str(path))
+    assert data["Tarih"].tolist() == ["2010-1", "2010-2", "2010-3", "2010-4"]
+    assert read_last_row(str(path)) == ["3", "2010-4", "98.0"]
+
+
+def test_updateDataSerie_weekly_serie_with_yearweek(tmp_path, evds):
+    path = tmp_path / "TP.BS01.CARI.txt"
+    path.write_text(
+        ";Tarih;YEARWEEK;TP_BS01_CARI\n"
+        "0;30-12-2011;2011-52;50110.9\n"
+        "1;06-01-2012;2012-1;49303.0\n"
+    )
+    write_catalog(tmp_path, [("TP.BS01.CARI", "HAFTALIK(CUMA)", "13-01-2012")])
+    evds.answers["TP.BS01.CARI"] = pd.DataFrame(
+        {
+            "Tarih": ["06-01-2012", "13-01-2012"],
+            "TP_BS01_CARI": [49303.0, 49500.0],
+            "YEARWEEK": ["2012-1", "2012-2"],
+        }
+    )
+
+    update()
+
+    assert evds.calls[0][1]["startDay"] == "07"
+    assert evds.calls[0][1]["startMonth"] == "01"
+    assert read_last_row(str(path)) == ["2", "13-01-2012", "2012-2", "49500.0"]
+
+
+def test_updateDataSerie_skips_up_to_date_series(tmp_path, evds):
+    (tmp_path / "TP.DB.B01.txt").write_text(
+        ";Tarih;TP_DB_B01\n0;1989-Q4;43910.0\n1;1990-Q1;45056.0\n"
+    )
+    (tmp_path / "TP.ODEMGZS.txt").write_text(";Tarih;TP_ODEMGZS\n0;2021;12.5\n")
+    write_catalog(
+        tmp_path,
+        [
+            ("TP.DB.B01", "ÜÇ AYLIK", "01-01-1990"),
+            ("TP.ODEMGZS", "YILLIK", "01-01-2021"),
+            ("TP.MISSING", "AYLIK", "01-01-2024"),
+        ],
+    )
+
+    report = update()
+
+    assert evds.calls == list()
+    assert sorted(report.skipped) == ["TP.DB.B01", "TP.MISSING", "TP.ODEMGZS"]
+
+
+def test_updateDataSerie_reports_a_failed_append_and_keeps_the_file(tmp_path, evds):
+    content = ";Tarih;TP_DB_B01\n0;1989-Q4;43910.0\n1;1990-Q1;45056.0\n"
+    path = tmp_path / "TP.DB.B01.txt"
+    path.write_text(content)
+    write_catalog(tmp_path, [("TP.DB.B01", "ÜÇ AYLIK", "01-04-1990")])
+    evds.answers["TP.DB.B01"] = pd.DataFrame(
+        {"Tarih": ["1990-Q2"], "TP_DB_B01_NEW": [46000.0]}
+    )
+
+    report = update()
+
+    assert list(report.failed) == ["TP.DB.B01"]
+    assert evds.calls[0][1]["startMonth"] == "04"
+    assert path.read_text() == content
+
+
+def test_initalizeDataSerie_reports_batches_per_serie(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write_catalog(
+        tmp_path,
+        [
+            ("TP.A", "AYLIK", "01-03-2010"),
+            ("TP.B", "AYLIK", "01-03-2010"),
+            ("TP.C", "AYLIK", "01-03-2010"),
+            ("TP.D", "AYLIK", "01-03-2010"),
+        ],
+    )
+    (tmp_path / "TP.D.txt").write_text(";Tarih;TP_D\n0;2010-1;1.0\n")
+    codeList = ["TP.A", "TP.B", "TP.C", "TP.D", "TP.UNKNOWN"]
+    pd.DataFrame({"SERIE_CODE": codeList}).to_csv(
+        tmp_path / "initialSeries.txt", sep=";", index=False
+    )
+
+    def fetch_batch(apiKey, batch, **kwargs):
+        return {
+            dataSerie.code: pd.DataFrame(
+                {"Tarih": ["2010-1"], dataSerie.code.replace(".", "_"): [1.0]}
+            )
+            if dataSerie.code != "TP.B"
+            else pd.DataFrame()
+            for dataSerie in batch
+        }
+
+    monkeypatch.setattr(DataSerie, "get_data_of_dataSerie_batch", fetch_batch)
+
+    report = DataGetter.initalizeDataSerie(
+        Tcmb("key"), requestsPerSecond=0, backoffFactor=0, maxSeriesPerRequest=3
+    )
+
+    assert report.total == 5
+    assert sorted(report.downloaded) == ["TP.A", "TP.C"]
+    assert report.skipped == ["TP.D"]
+    assert sorted(report.empty) == ["TP.B", "TP.UNKNOWN"]
+    assert report.failed == dict()
+    assert (tmp_path / "TP.A.txt").exists() and not (tmp_path / "TP.B.txt").exists()
+
+
+def test_initalizeDataSerie_reads_the_given_catalog(tmp_path, evds):
+    write_catalog(
+        tmp_path,
+        [("TP.M", "AYLIK", "01-12-2011"), ("TP.Y", "YILLIK", "01-01-2011")],
+        "catalog.txt",
+    )
+    evds.answers["TP.M"] = pd.DataFrame({"Tarih": ["2010", "2011"], "TP_M": [1.0, 2.0]})
+    evds.answers["TP.Y"] = pd.DataFrame({"Tarih": ["2010", "2011"], "TP_Y": [3.0, 4.0]})
+
+    report = DataGetter.initalizeDataSerie(
+        Tcmb("key"),
+        requestsPerSecond=0,
+        backoffFactor=0,
+        frequency="quarterly",
+        catalogFileName="catalog.txt",
+    )
+
+    assert sorted(report.downloaded) == ["TP.M", "TP.Y"]
+    calls = dict(evds.calls)
+    assert calls["TP.M"]["frequency"] == "quarterly"
+    # an annual serie can't be split into quarters, it is downloaded at its own frequency
+    assert calls["TP.Y"]["frequency"] is None
+    assert {call["fileName"] for call in calls.values()} == {"catalog.txt"}
+    assert (tmp_path / "quarterly" / "TP.Y.txt").exists()
@@ -0,0 +1,185 @@
+import os
+
+import pandas as pd
+import pytest
+
+from features.Tcmb import DataSerie
+
+
+def group_data(groupCode, serieCount=2):
+    return pd.DataFrame(
+        {
+            "SERIE_CODE": [
+                "TP." + groupCode.upper() + "." + str(i) for i in range(serieCount)
+            ],
+            "DATAGROUP_CODE": [groupCode] * serieCount,
+            "SERIE_NAME": ["name; with separator"] * serieCount,
+        }
+    )
+
+
+@pytest.fixture
+def crawl(tmp_path):
+    """Paths of Series.txt, seriesList.txt and the journal in tmp_path"""
+
+    class Crawl:
+        fileName = str(tmp_path / "Series.txt")
+        listFileName = str(tmp_path / "seriesList.txt")
+        journalFileName = fileName + ".journal"
+
+        def commit(groupCode):
+            DataSerie.commit_dataGroup_series(
+                Crawl.fileName, Crawl.listFileName, groupCode, group_data(groupCode)
+            )
+
+        def recover():
+            return DataSerie.recover_dataSerie_crawl(
+                Crawl.fileName, Crawl.listFileName
+            )
+
+        def listed():
+            with open(Crawl.listFileName, "r") as f:
+                return f.read().splitlines()
+
+        def read():
+            return pd.read_csv(Crawl.fileName, sep=";", dtype=str)
+
+    return Crawl
+
+
+def assert_consistent(crawl, serieList):
+    """Series.txt holds exactly the data groups of seriesList.txt, and a next commit appends after them"""
+    assert sorted(crawl.listed()) == sorted(serieList)
+    if len(serieList) > 0:
+        assert set(crawl.read()["DATAGROUP_CODE"]) == serieList
+    crawl.commit("next")
+    data = crawl.read()
+    assert list(data.columns) == ["SERIE_CODE", "DATAGROUP_CODE", "SERIE_NAME"]
+    assert set(data["DATAGROUP_CODE"]) == serieList | {"next"}
+    assert (data["SERIE_NAME"] == "name; with separator").all()
+
+
+def test_commits_without_crash(crawl):
+    crawl.commit("g1")
+    crawl.commit("g2")
+    serieList = crawl.recover()
+    assert serieList == {"g1", "g2"}
+    assert_consistent(crawl, serieList)
+
+
+def test_crash_after_series_append(crawl, monkeypatch):
+    crawl.commit("g1")
+    sizeAfterG1 = os.path.getsize(crawl.fileName)
+
+    def crash(*args):
+        raise OSError("crash")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(DataSerie, "write_dataSerie_journal", crash)
+        with pytest.raises(OSError):
+            crawl.commit("g2")
+    assert os.path.getsize(crawl.fileName) > sizeAfterG1
+
+    serieList = crawl.recover()
+
+    assert serieList == {"g1"}
+    assert os.path.getsize(crawl.fileName) == sizeAfterG1
+    assert_consistent(crawl, serieList)
+
+
+def test_crash_after_journal_replace(crawl):
+    crawl.commit("g1")
+    crawl.commit("g2")
+    # the journal names g2 but seriesList.txt was not written yet
+    with open(crawl.listFileName, "w") as f:
+        f.write("g1\n")
+
+    serieList = crawl.recover()
+
+    assert serieList == {"g1", "g2"}
+    assert crawl.listed() == ["g1", "g2"]
+    assert_consistent(crawl, serieList)
+
+
+def test_half_written_list_line(crawl):
+    crawl.commit("g1")
+    crawl.commit("g2")
+    with open(crawl.listFileName, "w") as f:
+        f.write("g1\ng2\ng")
+
+    serieList = crawl.recover()
+
+    assert serieList == {"g1", "g2"}
+    assert crawl.listed() == ["g1", "g2"]
+    assert_consistent(crawl, serieList)
+
+
+def test_crash_during_first_commit_without_journal(crawl):
+    content = group_data("g1").to_csv(sep=";", index=False)
+    with open(crawl.fileName, "w") as f:
+        f.write(content[: len(content) - 5])
+
+    serieList = crawl.recover()
+
+    assert serieList == set()
+    assert os.path.getsize(crawl.fileName) == 0
+    assert not os.path.exists(crawl.journalFileName)
+    crawl.commit("next")
+    assert list(crawl.read()["DATAGROUP_CODE"]) == ["next", "next"]
+
+
+def test_series_file_of_a_crawl_without_journal(crawl):
+    # g2 was appended but not listed and g3 is half written
+    content = group_data("g1").to_csv(sep=";", index=False)
+    sizeAfterG1 = len(content.encode("utf-8"))
+    content += group_data("g2").to_csv(sep=";", index=False, header=False)
+    content += group_data("g3").to_csv(sep=";", index=False, header=False)[:12]
+    with open(crawl.fileName, "w") as f:
+        f.write(content)
+    with open(crawl.listFileName, "w") as f:
+        f.write("g1\n")
+
+    serieList = crawl.recover()
+
+    assert serieList == {"g1"}
+    assert os.path.getsize(crawl.fileName) == sizeAfterG1
+    with open(crawl.journalFileName, "r") as f:
+        assert f.read() == str(sizeAfterG1) + ";g1"
+    assert_consistent(crawl, serieList)
+
+
+@pytest.mark.parametrize("deleted", [True, False])
+def test_journal_of_another_series_file(crawl, deleted):
+    crawl.commit("g1")
+    crawl.commit("g2")
+    if deleted:
+        os.remove(crawl.fileName)
+    else:
+        # Series.txt made again with g1 only, smaller than the committed size of the journal
+        with open(crawl.fileName, "w") as f:
+            f.write(group_data("g1").to_csv(sep=";", index=False))
+
+    serieList = crawl.recover()
+
+    expected = set() if deleted else {"g1"}
+    assert serieList == expected
+    assert_consistent(crawl, serieList)
+
+
+def test_truncated_journal(crawl):
+    crawl.commit("g1")
+    with open(crawl.journalFileName, "w") as f:
+        f.write("12")
+
+    serieList = crawl.recover()
+
+    assert serieList == {"g1"}
+    assert_consistent(crawl, serieList)
+
+
+def test_list_without_series_file(crawl):
+    with open(crawl.listFileName, "w") as f:
+        f.write("g1\ng2\n")
+
+    assert crawl.recover() == set()
+    assert crawl.listed() == list()
@@ -0,0 +1,115 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from features.seriesFiles import (
+    append_rows,
+    next_period_start,
+    parse_tarih,
+    read_data_file,
+    read_header,
+    read_last_row,
+)
+
+MONTHLY = ";Tarih;TP_01TKFE\n0;2010-1;96.92\n1;2010-2;97.22\n"
+DAILY = ";Tarih;TP_DK_USD_A_YTL\n0;06-01-2011;1.5400\n1;07-01-2011;1.5452\n"
+QUARTERLY = ";Tarih;TP_DB_B01\n0;1989-Q4;43910.0\n1;1990-Q1;45056.0\n"
+ANNUAL = ";Tarih;TP_ODEMGZS_NORM\n0;2021;12.5\n1;2022;13.1\n"
+WEEKLY = (
+    ";Tarih;YEARWEEK;TP_BS01_CARI\n"
+    "0;30-12-2011;2011-52;50110.9\n"
+    "1;06-01-2012;2012-1;49303.0\n"
+)
+
+
+def write_file(tmp_path, content, name="TP.TEST.txt"):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "tarih, expected",
+    [
+        ("07-01-2011", datetime.date(2011, 1, 8)),
+        ("31-12-2011", datetime.date(2012, 1, 1)),
+        ("28-02-2012", datetime.date(2012, 2, 29)),
+        ("2010-1", datetime.date(2010, 2, 1)),
+        ("2010-12", datetime.date(2011, 1, 1)),
+        ("1989-Q4", datetime.date(1990, 1, 1)),
+        ("1990-Q1", datetime.date(1990, 4, 1)),
+        ("2010-S2", datetime.date(2011, 1, 1)),
+        ("2022", datetime.date(2023, 1, 1)),
+    ],
+)
+def test_next_period_start(tarih, expected):
+    assert next_period_start(tarih) == expected
+    assert next_period_start(tarih) > parse_tarih(tarih)
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        (MONTHLY, ["1", "2010-2", "97.22"]),
+        (DAILY, ["1", "07-01-2011", "1.5452"]),
+        (QUARTERLY, ["1", "1990-Q1", "45056.0"]),
+        (ANNUAL, ["1", "2022", "13.1"]),
+        (WEEKLY, ["1", "06-01-2012", "2012-1", "49303.0"]),
+    ],
+)
+def test_read_last_row(tmp_path, content, expected):
+    assert read_last_row(write_file(tmp_path, content)) == expected
+
+
+def test_read_last_row_reads_across_blocks(tmp_path):
+    rows = "".join("{0};2010-{1};{0}.5\n".format(i, i % 12 + 1) for i in range(500))
+    path = write_file(tmp_path, ";Tarih;TP_01TKFE\n" + rows)
+    assert read_last_row(path, blockSize=16) == ["499", "2010-8", "499.5"]
+
+
+def test_read_last_row_without_data_rows(tmp_path):
+    assert read_last_row(write_file(tmp_path, ";Tarih;TP_01TKFE\n")) is None
+
+
+def test_append_rows_continues_the_index(tmp_path):
+    path = write_file(tmp_path, MONTHLY)
+    rowCount = append_rows(
+        path, pd.DataFrame({"Tarih": ["2010-3", "2010-4"], "TP_01TKFE": [97.5, 98.0]})
+    )
+    assert rowCount == 2
+    assert read_last_row(path) == ["3", "2010-4", "98.0"]
+    data = read_data_file(path)
+    assert data["Tarih"].tolist() == ["2010-1", "2010-2", "2010-3", "2010-4"]
+
+
+def test_append_rows_puts_columns_in_the_header_order(tmp_path):
+    path = write_file(tmp_path, WEEKLY)
+    append_rows(
+        path,
+        pd.DataFrame(
+            {
+                "TP_BS01_CARI": [49500.0],
+                "UNIXTIME": ["1326412800"],
+                "YEARWEEK": ["2012-2"],
+                "Tarih": ["13-01-2012"],
+            }
+        ),
+    )
+    assert read_header(path) == ["", "Tarih", "YEARWEEK", "TP_BS01_CARI"]
+    assert read_last_row(path) == ["2", "13-01-2012", "2012-2", "49500.0"]
+
+
+def test_append_rows_with_missing_column_leaves_the_file_unchanged(tmp_path):
+    path = write_file(tmp_path, WEEKLY)
+    with pytest.raises(KeyError):
+        append_rows(path, pd.DataFrame({"Tarih": ["13-01-2012"], "X": [1.0]}))
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == WEEKLY
+
+
+def test_append_rows_without_rows(tmp_path):
+    path = write_file(tmp_path, QUARTERLY)
+    assert append_rows(path, pd.DataFrame({"Tarih": [], "TP_DB_B01": []})) == 0
+    with open(path, "r", encoding="utf-8") as f:
+        assert f.read() == QUARTERLY